@@ -377,37 +377,67 @@ def _ir_calibrate(data_reader, irchn, calib_type):
     return numpy.ma.masked_array(tb_, numpy.isnan(tb_))
 
 
-def interpolate_1km_geolocation(lons_40km, lats_40km):
+def _spline_rows_per_line(values, cols_in, cols_out, order):
+    """Fit and evaluate an interpolating spline for each row of `values` separately."""
+    new_values = numpy.empty((values.shape[0], len(cols_out)), values.dtype)
+    for cnt in range(values.shape[0]):
+        tck = splrep(cols_in, values[cnt, :], k=order, s=0)
+        new_values[cnt, :] = splev(cols_out, tck, der=0)
+    return new_values
+
+
+_spline_bases = {}
+
+
+def _spline_basis(cols_in, cols_out, order):
+    """Matrix mapping values at `cols_in` to the interpolating spline's values at `cols_out`.
+
+    An interpolating spline (s=0) with fixed input positions is linear in the input values so row ``i`` of the
+    matrix is the spline through the ``i``-th unit vector.
+    """
+    key = (cols_in.tobytes(), cols_out.tobytes(), order)
+    basis = _spline_bases.get(key)
+    if basis is None:
+        unit_values = numpy.eye(len(cols_in))
+        basis = _spline_bases[key] = _spline_rows_per_line(unit_values, cols_in, cols_out, order)
+    return basis
+
+
+def _spline_rows_batched(values, cols_in, cols_out, order):
+    """Interpolate every row of `values` at once with a precomputed spline basis matrix."""
+    basis = _spline_basis(cols_in, cols_out, order)
+    return numpy.dot(values, basis).astype(values.dtype, copy=False)
+
+
+SPLINE_METHODS = {
+    "per_line": _spline_rows_per_line,
+    "batched": _spline_rows_batched,
+}
+
+
+def interpolate_1km_geolocation(lons_40km, lats_40km, method="batched"):
     """Interpolate AVHRR 40km navigation to 1km.
 
     This code was extracted from the python-geotiepoints package from the PyTroll group. To avoid adding another
     dependency to this package this simple case from the geotiepoints was copied.
+
+    :param method: "batched" to interpolate every scanline with one matrix multiply or "per_line" to fit a spline
+                   for every scanline (the original implementation)
     """
     cols40km = numpy.arange(24, 2048, 40)
     cols1km = numpy.arange(2048)
-    lines = lons_40km.shape[0]
-    # row_indices = rows40km = numpy.arange(lines)
-    rows1km = numpy.arange(lines)
+    spline_rows = SPLINE_METHODS[method]
 
     lons_rad = numpy.radians(lons_40km)
     lats_rad = numpy.radians(lats_40km)
     x__ = EARTH_RADIUS * numpy.cos(lats_rad) * numpy.cos(lons_rad)
     y__ = EARTH_RADIUS * numpy.cos(lats_rad) * numpy.sin(lons_rad)
     z__ = EARTH_RADIUS * numpy.sin(lats_rad)
-    along_track_order = 1
     cross_track_order = 3
 
-    lines = len(rows1km)
-    newx = numpy.empty((len(rows1km), len(cols1km)), x__.dtype)
-    newy = numpy.empty((len(rows1km), len(cols1km)), y__.dtype)
-    newz = numpy.empty((len(rows1km), len(cols1km)), z__.dtype)
-    for cnt in range(lines):
-        tck = splrep(cols40km, x__[cnt, :], k=cross_track_order, s=0)
-        newx[cnt, :] = splev(cols1km, tck, der=0)
-        tck = splrep(cols40km, y__[cnt, :], k=cross_track_order, s=0)
-        newy[cnt, :] = splev(cols1km, tck, der=0)
-        tck = splrep(cols40km, z__[cnt, :], k=cross_track_order, s=0)
-        newz[cnt, :] = splev(cols1km, tck, der=0)
+    newx = spline_rows(x__, cols40km, cols1km, cross_track_order)
+    newy = spline_rows(y__, cols40km, cols1km, cross_track_order)
+    newz = spline_rows(z__, cols40km, cols1km, cross_track_order)
 
     lons_1km = get_lons_from_cartesian(newx, newy)
     lats_1km = get_lats_from_cartesian(newx, newy, newz)
@@ -78,9 +78,13 @@ created.
 __docformat__ = "restructuredtext en"
 
 import os
+import json
+import time
+import signal
 import logging
 import string
 import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from netCDF4 import Dataset
 
@@ -108,6 +112,10 @@ AWIPS_USES_NEGATIVES = False
 AWIPS_DATA_DTYPE = np.int16
 DEFAULT_OUTPUT_PATTERN = '{source_name}_AII_{satellite}_{instrument}_{product_name}_{sector_id}_{tile_id}_{begin_time:%Y%m%d_%H%M}.nc'
 DEFAULT_CONFIG_FILE = os.environ.get("AWIPS_CONFIG_FILE", "polar2grid.awips:scmi_backend.ini")
+TILE_WORKERS = int(os.environ.get("P2G_SCMI_TILE_WORKERS", 1))
+SCALING_CACHE = os.environ.get("P2G_SCMI_SCALING_CACHE", None)
+# number of image rows reduced at a time when computing data statistics
+STATS_ROWS = 512
 
 # misc. global attributes
 SCMI_GLOBAL_ATT = dict(
@@ -141,6 +149,107 @@ LETTERED_GRIDS = {
 }
 
 
+def data_statistics(data, invalid_mask=None, rows_per_block=STATS_ROWS):
+    """Compute the minimum, maximum, number of valid pixels, and number of NaN pixels of an image together.
+
+    The image is processed a block of rows at a time so each block is only read from memory (or disk for memory
+    mapped arrays) once for all of the statistics.
+
+    :param data: 2D image array
+    :param invalid_mask: Boolean array of pixels to ignore in addition to NaNs
+    :returns: dictionary with 'min', 'max', 'valid_count', and 'nan_count' keys. The minimum and maximum are NaN
+              if there are no valid pixels.
+    """
+    data = np.ma.getdata(data)
+    check_nan = np.issubdtype(data.dtype, np.floating)
+    data_min = np.inf
+    data_max = -np.inf
+    valid_count = 0
+    nan_count = 0
+    for row_start in range(0, data.shape[0], rows_per_block):
+        block = data[row_start:row_start + rows_per_block]
+        good_mask = np.ones(block.shape, dtype=np.bool_)
+        if check_nan:
+            np.isnan(block, out=good_mask)
+            nan_count += np.count_nonzero(good_mask)
+            np.logical_not(good_mask, out=good_mask)
+        if invalid_mask is not None:
+            good_mask &= ~invalid_mask[row_start:row_start + rows_per_block]
+        block_count = np.count_nonzero(good_mask)
+        if not block_count:
+            continue
+        valid_count += block_count
+        good_data = block if block_count == block.size else block[good_mask]
+        data_min = min(data_min, good_data.min())
+        data_max = max(data_max, good_data.max())
+    if not valid_count:
+        data_min = data_max = np.nan
+    return {"min": data_min, "max": data_max, "valid_count": valid_count, "nan_count": nan_count}
+
+
+class ScalingCache(object):
+    """Persistent JSON file of the valid range used for each satellite, instrument, product, and sector.
+
+    Products without a configured valid range have their range computed from the data. Reusing the range from
+    a previous pass keeps the scaling factors the same between passes. The stored range is widened when a later
+    pass has data outside of it so no pass has its data clipped to the range of an earlier one.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._entries = {}
+        if os.path.isfile(filename):
+            try:
+                with open(filename, "r") as cache_file:
+                    self._entries = json.load(cache_file)
+            except ValueError:
+                LOG.warning("Could not read SCMI scaling cache '%s', it will be replaced", filename)
+
+    @staticmethod
+    def _key(satellite, instrument, product_name, sector_id):
+        return "{}/{}/{}/{}".format(satellite, instrument, product_name, sector_id)
+
+    def get(self, satellite, instrument, product_name, sector_id):
+        """Get the cached (valid_min, valid_max) or None if it isn't cached."""
+        entry = self._entries.get(self._key(satellite, instrument, product_name, sector_id))
+        if entry is None:
+            return None
+        return entry["valid_min"], entry["valid_max"]
+
+    def set(self, satellite, instrument, product_name, sector_id, valid_min, valid_max):
+        """Store the valid range for this product and sector and save the cache file."""
+        self._entries[self._key(satellite, instrument, product_name, sector_id)] = {
+            "valid_min": float(valid_min),
+            "valid_max": float(valid_max),
+        }
+        tmp_fn = self.filename + ".tmp{}".format(os.getpid())
+        with open(tmp_fn, "w") as cache_file:
+            json.dump(self._entries, cache_file, indent=2, sort_keys=True)
+        os.rename(tmp_fn, self.filename)
+
+    def update(self, satellite, instrument, product_name, sector_id, data_min, data_max):
+        """Get the valid range to use for data with this minimum and maximum.
+
+        The cached range is returned if it contains the data. Otherwise the range is widened to include the data
+        and saved before being returned. Ranges are only cached for data with valid pixels (non-NaN min and max).
+        """
+        cached_range = self.get(satellite, instrument, product_name, sector_id)
+        if np.isnan(data_min) or np.isnan(data_max):
+            return cached_range or (data_min, data_max)
+        if cached_range is None:
+            self.set(satellite, instrument, product_name, sector_id, data_min, data_max)
+            return float(data_min), float(data_max)
+
+        valid_min, valid_max = cached_range
+        if data_min >= valid_min and data_max <= valid_max:
+            return valid_min, valid_max
+        LOG.warning("Data range (%f, %f) of '%s' is outside of the cached range (%f, %f) for sector '%s', "
+                    "widening the cached range", data_min, data_max, product_name, valid_min, valid_max, sector_id)
+        valid_min = min(valid_min, float(data_min))
+        valid_max = max(valid_max, float(data_max))
+        self.set(satellite, instrument, product_name, sector_id, valid_min, valid_max)
+        return valid_min, valid_max
+
+
 class NumberedTileGenerator(object):
     def __init__(self, grid_definition,
                  tile_shape=None, tile_count=None):
@@ -224,6 +333,10 @@ class NumberedTileGenerator(object):
         return "T{:03d}".format(self._tile_number(ty, tx))
 
     def _generate_tile_info(self):
+        """Generate ``(tile_row_offset, tile_column_offset, tile_id, x, y, tile_slices, data_slices)`` per tile.
+
+        Used by `tile_validity` and `iter_tile_views`. Results are cached after the first time.
+        """
         x = self.x
         y = self.y
         ts = self.tile_shape
@@ -232,6 +345,7 @@ class NumberedTileGenerator(object):
         if self._tile_cache:
             for tile_info in self._tile_cache:
                 yield tile_info
+            return
 
         for ty in range(tc[0]):
             for tx in range(tc[1]):
@@ -254,25 +368,41 @@ class NumberedTileGenerator(object):
                 self._tile_cache.append(tile_info)
                 yield tile_info
 
-    def __call__(self, data, fill_value=np.nan):
-        ts = self.tile_shape
-        tmp_tile = np.ma.zeros(ts, dtype=np.float32)
-        tmp_tile.set_fill_value(fill_value)
-        tmp_tile[:] = np.ma.masked
+    def tile_validity(self, valid_mask):
+        """Boolean array with one element per tile (in tile order) saying if that tile contains any valid data.
 
-        if self._tile_cache:
-            tile_infos = self._tile_cache
-        else:
-            tile_infos = self._generate_tile_info()
-
-        for tile_info in tile_infos:
-            tmp_tile[tile_info[-2]] = data[tile_info[-1]]
-            if tmp_tile.mask.all():
+        Tiles sharing the same rows are handled together so every row band of the image is only reduced once.
+        """
+        tile_infos = self._tile_cache or list(self._generate_tile_info())
+        has_valid = np.zeros(len(tile_infos), dtype=np.bool_)
+        band_columns = {}
+        for idx, tile_info in enumerate(tile_infos):
+            row_slice, col_slice = tile_info[-1]
+            band_key = (row_slice.start, row_slice.stop)
+            valid_columns = band_columns.get(band_key)
+            if valid_columns is None:
+                valid_columns = band_columns[band_key] = valid_mask[row_slice].any(axis=0)
+            has_valid[idx] = valid_columns[col_slice].any()
+        return has_valid
+
+    def iter_tile_views(self, data, valid_mask=None):
+        """Iterate over the tiles of `data` that contain valid data without copying any data.
+
+        Yields a view of the image for each tile and where it belongs in the tile instead of a copy padded to
+        `tile_shape`. Tiles at the edge of the image will be smaller than `tile_shape`.
+
+        :param data: Masked array for the entire image
+        :param valid_mask: Boolean array of valid pixels (default: unmasked pixels of `data`)
+        :returns: iterator of ``((tile_row_offset, tile_column_offset, tile_id, x, y), tile_slices, tile_data)``
+        """
+        if valid_mask is None:
+            valid_mask = ~np.ma.getmaskarray(data)
+        tile_infos = self._tile_cache or list(self._generate_tile_info())
+        for tile_info, has_valid in zip(tile_infos, self.tile_validity(valid_mask)):
+            if not has_valid:
                 LOG.info("Tile {} contains all masked data, skipping...".format(tile_info[2]))
                 continue
-
-            yield tile_info[:-2], tmp_tile
-            tmp_tile[:] = np.ma.masked
+            yield tile_info[:-2], tile_info[-2], data[tile_info[-1]]
 
 
 class LetteredTileGenerator(NumberedTileGenerator):
@@ -379,9 +509,14 @@ class LetteredTileGenerator(NumberedTileGenerator):
         return "T{}{:02d}".format(alpha, tile_num)
 
     def _generate_tile_info(self):
+        """Generate tile information for the lettered tiles that contain part of the image.
+
+        See `NumberedTileGenerator._generate_tile_info`.
+        """
         if self._tile_cache:
             for tile_info in self._tile_cache:
                 yield tile_info
+            return
 
         ts = self.tile_shape
         ul_xy = self.ul_xy
@@ -625,11 +760,17 @@ class SCMI_writer(object):
         self.fgf_x.standard_name = "projection_x_coordinate"
         self.fgf_x[:] = x
 
-    def set_image_data(self, data, fill_value):
+    def set_image_data(self, data, fill_value, tile_slices=None):
+        """Write the image data to the file.
+
+        If `tile_slices` is provided then `data` only fills that part of the tile and the rest is left as fill.
+        """
         LOG.info('writing image data')
         # note: autoscaling will be applied to make int16
         assert(hasattr(data, 'mask'))
-        self.image_data[:, :] = np.require(data, dtype=np.float32)
+        if tile_slices is None:
+            tile_slices = (slice(None), slice(None))
+        self.image_data[tile_slices] = np.require(data, dtype=np.float32)
 
     def set_projection_attrs(self, grid_def):
         """
@@ -705,14 +846,43 @@ class SCMI_writer(object):
         self._nc = None
 
 
+# Backend used by a tile writing process, sent once when the process starts instead of with every tile
+_worker_backend = None
+
+
+def _init_tile_worker(backend):
+    """Store the backend used by this tile writing process.
+
+    Interrupts are ignored so only the main process handles Ctrl+C.
+    """
+    global _worker_backend
+    _worker_backend = backend
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _create_tile_output_timed(tile_args, tile_kwargs, backend=None):
+    """Create one tile file and return (filename, seconds to create it, file size in bytes).
+
+    The backend given to `_init_tile_worker` is used if `backend` isn't provided.
+    """
+    backend = _worker_backend if backend is None else backend
+    start = time.perf_counter()
+    fn = backend.create_tile_output(*tile_args, **tile_kwargs)
+    elapsed = time.perf_counter() - start
+    return fn, elapsed, os.path.getsize(fn) if fn is not None else 0
+
+
 class Backend(roles.BackendRole):
     def __init__(self, backend_configs=None, rescale_configs=None,
-                 compress=False, fix_awips=False, **kwargs):
+                 compress=False, fix_awips=False, tile_workers=TILE_WORKERS, scaling_cache=SCALING_CACHE,
+                 **kwargs):
         backend_configs = backend_configs or [DEFAULT_CONFIG_FILE]
         self.awips_config_reader = SCMIConfigReader(*backend_configs, empty_ok=True)
         self.scmi_sector_reader = SCMISectorConfigReader(*backend_configs)
         self.compress = compress
         self.fix_awips = fix_awips
+        self.tile_workers = max(int(tile_workers or 1), 1)
+        self.scaling_cache = ScalingCache(scaling_cache) if scaling_cache else None
         super(Backend, self).__init__(**kwargs)
 
     @property
@@ -822,7 +992,6 @@ class Backend(roles.BackendRole):
             ds_list.append(x)
         output_filenames = []
         dtype = AWIPS_DATA_DTYPE
-        fill_value = np.nan
         for grid_name, (grid_def, ds_list) in grid_datasets.items():
             tile_gen = self._get_tile_generator(grid_def, lettered_grid, sector_id, num_subtiles, tile_size, tile_count)
             for gridded_product in ds_list:
@@ -837,12 +1006,7 @@ class Backend(roles.BackendRole):
 
                 LOG.debug("Scaling %s data to fit in netcdf file...", gridded_product["product_name"])
                 bit_depth = gridded_product.setdefault("bit_depth", 16)
-                valid_min = gridded_product.get('valid_min')
-                if valid_min is None:
-                    valid_min = np.nanmin(data)
-                valid_max = gridded_product.get('valid_max')
-                if valid_max is None:
-                    valid_max = np.nanmax(data)
+                valid_min, valid_max = self._get_valid_range(gridded_product, data, mask, sector_id)
                 pkwargs['valid_min'] = valid_min
                 pkwargs['valid_max'] = valid_max
                 pkwargs['bit_depth'] = bit_depth
@@ -863,26 +1027,118 @@ class Backend(roles.BackendRole):
                 else:
                     pkwargs['data'] = data
 
-                for (trow, tcol, tile_id, tmp_x, tmp_y), tmp_tile in tile_gen(data, fill_value=fill_value):
-                    try:
-                        fn = self.create_tile_output(
-                            gridded_product, sector_id,
-                            trow, tcol, tile_id, tmp_x, tmp_y, tmp_tile,
-                            tile_gen.tile_count, tile_gen.image_shape,
-                            tile_gen.mx, tile_gen.bx, tile_gen.my, tile_gen.by,
-                            output_pattern, **pkwargs)
-                        if fn is None:
-                            if lettered_grid:
-                                LOG.warning("Data did not fit in to any lettered tile")
-                            raise RuntimeError("No SCMI tiles were created")
-                        output_filenames.append(fn)
-                    except StandardError:
-                        LOG.error("Could not create output for '%s'", product_name)
-                        if self.exit_on_error:
-                            raise
-                        LOG.debug("Writer exception: ", exc_info=True)
-                        continue
+                tile_product = gridded_product
+                if self.tile_workers > 1:
+                    # don't send the entire image to the worker processes for every tile
+                    tile_product = gridded_product.copy()
+                    tile_product.set_persist(True)
+                    tile_product.pop("grid_data", None)
+                    pkwargs.pop("data")
+                    pkwargs['attr_helper'] = AttributeHelper(tile_product)
+                tile_views = tile_gen.iter_tile_views(data, valid_mask=~mask)
+                tile_jobs = (((tile_product, sector_id,
+                               trow, tcol, tile_id, tmp_x, tmp_y, tmp_tile,
+                               tile_gen.tile_count, tile_gen.image_shape,
+                               tile_gen.mx, tile_gen.bx, tile_gen.my, tile_gen.by,
+                               output_pattern), dict(pkwargs, tile_slices=tile_slices, tile_shape=tile_gen.tile_shape))
+                             for (trow, tcol, tile_id, tmp_x, tmp_y), tile_slices, tmp_tile in tile_views)
+                output_filenames.extend(self._write_tiles(product_name, tile_jobs, lettered_grid))
+
+        return output_filenames
+
+    def _get_valid_range(self, gridded_product, data, mask, sector_id):
+        """Get the configured valid range of a product or compute it from the data.
 
+        If a scaling cache was provided the computed range is replaced by the cached range for the same
+        satellite, instrument, product, and sector, widened to include this data when needed.
+        """
+        valid_min = gridded_product.get('valid_min')
+        valid_max = gridded_product.get('valid_max')
+        if valid_min is not None and valid_max is not None:
+            return valid_min, valid_max
+
+        product_name = gridded_product['product_name']
+        stats = data_statistics(data, mask)
+        LOG.debug("Data statistics for '%s': %r", product_name, stats)
+        data_min, data_max = stats['min'], stats['max']
+        if self.scaling_cache is not None:
+            data_min, data_max = self.scaling_cache.update(
+                gridded_product['satellite'], gridded_product['instrument'], product_name, sector_id,
+                data_min if valid_min is None else valid_min,
+                data_max if valid_max is None else valid_max)
+
+        if valid_min is None:
+            valid_min = data_min
+        if valid_max is None:
+            valid_max = data_max
+        return valid_min, valid_max
+
+    def _write_tiles(self, product_name, tile_jobs, lettered_grid=False):
+        """Create a tile file for every ``(args, kwargs)`` of `create_tile_output` in `tile_jobs`.
+
+        If more than one tile worker was requested the tiles are written by a pool of processes with no more than
+        twice as many tiles waiting to be written as there are workers. Time spent creating each tile and the overall
+        throughput of the product are logged.
+        """
+        output_filenames = []
+        total_bytes = 0
+        start = time.perf_counter()
+
+        def _tile_done(fn, elapsed, num_bytes):
+            if fn is None:
+                if lettered_grid:
+                    LOG.warning("Data did not fit in to any lettered tile")
+                raise RuntimeError("No SCMI tiles were created")
+            LOG.debug("Created tile '%s' in %0.3fs", fn, elapsed)
+            output_filenames.append(fn)
+            return num_bytes
+
+        if self.tile_workers <= 1:
+            for tile_args, tile_kwargs in tile_jobs:
+                try:
+                    total_bytes += _tile_done(*_create_tile_output_timed(tile_args, tile_kwargs, backend=self))
+                except (RuntimeError, ValueError, KeyError, OSError):
+                    LOG.error("Could not create output for '%s'", product_name)
+                    if self.exit_on_error:
+                        raise
+                    LOG.debug("Writer exception: ", exc_info=True)
+        else:
+            max_pending = self.tile_workers * 2
+            with ProcessPoolExecutor(max_workers=self.tile_workers, initializer=_init_tile_worker,
+                                     initargs=(self,)) as executor:
+                running = set()
+                tile_jobs = iter(tile_jobs)
+                jobs_left = True
+                try:
+                    while jobs_left or running:
+                        while jobs_left and len(running) < max_pending:
+                            try:
+                                tile_args, tile_kwargs = next(tile_jobs)
+                            except StopIteration:
+                                jobs_left = False
+                                break
+                            running.add(executor.submit(_create_tile_output_timed, tile_args, tile_kwargs))
+                        if not running:
+                            break
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            try:
+                                total_bytes += _tile_done(*future.result())
+                            except (RuntimeError, ValueError, KeyError, OSError):
+                                LOG.error("Could not create output for '%s'", product_name)
+                                if self.exit_on_error:
+                                    raise
+                                LOG.debug("Writer exception: ", exc_info=True)
+                except BaseException:
+                    for future in running:
+                        future.cancel()
+                    raise
+
+        elapsed = time.perf_counter() - start
+        if output_filenames:
+            LOG.info("Wrote %d tiles for '%s' in %0.2fs (%0.1f tiles/s, %0.2f MB/s)",
+                     len(output_filenames), product_name, elapsed,
+                     len(output_filenames) / max(elapsed, 1e-9), total_bytes / 1024. / 1024. / max(elapsed, 1e-9))
         return output_filenames
 
     def _get_awips_info(self, gridded_product, source_name=None):
@@ -909,7 +1165,14 @@ class Backend(roles.BackendRole):
                            mx, bx, my, by,
                            output_pattern,
                            awips_info, attr_helper,
-                           fills, factor, offset, valid_min, valid_max, bit_depth, **kwargs):
+                           fills, factor, offset, valid_min, valid_max, bit_depth,
+                           tile_slices=None, tile_shape=None, **kwargs):
+        """Create one tile file.
+
+        If `tile_slices` is provided `tmp_tile` is the part of the tile described by those slices (ex. a view of the
+        full image from `NumberedTileGenerator.iter_tile_views`) and the full tile is `tile_shape`. Otherwise
+        `tmp_tile` is the entire tile and is clipped in place.
+        """
         # Create the netcdf file
         created_files = []
         grid_def = gridded_product["grid_definition"]
@@ -941,10 +1204,12 @@ class Backend(roles.BackendRole):
 
             LOG.info("Writing tile '%s' to '%s'", tile_id, output_filename)
 
+            if tile_slices is None:
+                tile_shape = tmp_tile.shape
             nc = SCMI_writer(output_filename, helper=attr_helper,
                              compress=self.compress)
             LOG.debug("Creating dimensions...")
-            nc.create_dimensions(tmp_tile.shape[0], tmp_tile.shape[1])
+            nc.create_dimensions(tile_shape[0], tile_shape[1])
             LOG.debug("Creating variables...")
             nc.create_variables(bit_depth, fills[0], factor, offset)
             LOG.debug("Creating global attributes...")
@@ -952,12 +1217,16 @@ class Backend(roles.BackendRole):
                                 awips_info['awips_id'], sector_id,
                                 awips_info['creating_entity'],
                                 tile_count, image_shape,
-                                trow, tcol, tmp_tile.shape[0], tmp_tile.shape[1])
+                                trow, tcol, tile_shape[0], tile_shape[1])
             LOG.debug("Creating projection attributes...")
             nc.set_projection_attrs(grid_def)
             LOG.debug("Writing image data...")
-            np.clip(tmp_tile, valid_min, valid_max, out=tmp_tile)
-            nc.set_image_data(tmp_tile, fills[0])
+            if tile_slices is None:
+                np.clip(tmp_tile, valid_min, valid_max, out=tmp_tile)
+            else:
+                # don't modify the original image
+                tmp_tile = np.ma.clip(tmp_tile, valid_min, valid_max)
+            nc.set_image_data(tmp_tile, fills[0], tile_slices=tile_slices)
             LOG.debug("Writing X/Y navigation data...")
             nc.set_fgf(tmp_x, mx, bx,
                        tmp_y, my, by, units='meters')
@@ -965,7 +1234,7 @@ class Backend(roles.BackendRole):
 
             if self.fix_awips:
                 self._fix_awips_file(output_filename)
-        except StandardError:
+        except Exception:
             last_fn = created_files[-1] if created_files else "N/A"
             LOG.error("Error while filling in NC file with data: %s", last_fn)
             for fn in created_files:
@@ -1104,6 +1373,12 @@ def add_backend_argument_groups(parser):
                        help="zlib compress each netcdf file")
     group.add_argument("--fix-awips", action="store_true",
                        help="modify NetCDF output to work with the old/broken AWIPS NetCDF library")
+    group.add_argument("--tile-workers", type=int, default=TILE_WORKERS,
+                       help="number of processes to write tile files with (default: 1)")
+    group.add_argument("--scaling-cache", default=SCALING_CACHE,
+                       help="JSON file to store the valid range of products without a configured range in so "
+                            "later passes over the same sector use the same scaling (widened when new data falls "
+                            "outside of it)")
     group = parser.add_argument_group(title="Backend Output Creation")
     group.add_argument("--tiles", dest="tile_count", nargs=2, type=int, default=[1, 1],
                        help="Number of tiles to produce in Y (rows) and X (cols) direction respectively")
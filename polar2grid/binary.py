@@ -40,7 +40,7 @@ import os
 import shutil
 
 from polar2grid.core import roles
-from polar2grid.core.dtype import str_to_dtype, clip_to_data_type
+from polar2grid.core.dtype import str_to_dtype
 from polar2grid.core.rescale import Rescaler, DEFAULT_RCONFIG
 
 LOG = logging.getLogger(__name__)
@@ -93,7 +93,11 @@ class Backend(roles.BackendRole):
         # if we have a floating point data type, then scaling doesn't make much sense
         if data_type == gridded_product["data_type"] and same_fill:
             LOG.info("Saving product %s to binary file %s", gridded_product["product_name"], output_filename)
-            shutil.copyfile(gridded_product["grid_data"], output_filename)
+            if isinstance(gridded_product["grid_data"], str):
+                shutil.copyfile(gridded_product["grid_data"], output_filename)
+            else:
+                # in-memory or scene package array
+                gridded_product.get_data_array().tofile(output_filename)
             return output_filename
         elif numpy.issubclass_(data_type, numpy.floating):
             # we didn't rescale any data, but we need to convert it
@@ -101,9 +105,9 @@ class Backend(roles.BackendRole):
         else:
             try:
                 LOG.debug("Scaling %s data to fit data type", gridded_product["product_name"])
-                data = self.rescaler.rescale_product(gridded_product, data_type,
-                                                     inc_by_one=inc_by_one, fill_value=fill_value)
-                data = clip_to_data_type(data, data_type)
+                rescale_plan = self.rescaler.get_rescale_plan(gridded_product, data_type,
+                                                              inc_by_one=inc_by_one, fill_value=fill_value)
+                data = rescale_plan.apply(gridded_product)
             except ValueError:
                 if not self.keep_intermediate and os.path.isfile(output_filename):
                     os.remove(output_filename)
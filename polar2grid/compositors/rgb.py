@@ -90,6 +90,48 @@ from polar2grid.core import roles
 
 LOG = logging.getLogger(__name__)
 
+# Default number of grid rows processed at a time when creating composites
+STRIP_ROWS = 512
+
+
+def iter_row_strips(num_rows, rows_per_strip=STRIP_ROWS):
+    """Iterate over slices of `rows_per_strip` rows covering `num_rows` rows."""
+    for row_start in range(0, num_rows, rows_per_strip):
+        yield slice(row_start, min(row_start + rows_per_strip, num_rows))
+
+
+def strip_shared_mask(mask_sources, row_slice):
+    """Mask of pixels in the rows `row_slice` that are invalid in any of the (data, fill_value) pairs."""
+    shared_mask = None
+    for data, fill in mask_sources:
+        data = data[row_slice]
+        invalid = np.isnan(data) if np.isnan(fill) else data == fill
+        if shared_mask is None:
+            shared_mask = invalid
+        else:
+            shared_mask |= invalid
+    return shared_mask
+
+
+def _lookup_scale_strip(data, invalid_mask, max_clip, quantized=False):
+    """Apply the crefl non-linear scaling in place to the valid pixels of a strip of data.
+
+    If `quantized` is True the faster, approximate `quantized_lookup_scale` is used instead of `lookup_scale`.
+    """
+    from polar2grid.core.rescale import lookup_scale, quantized_lookup_scale
+    scale_func = quantized_lookup_scale if quantized else lookup_scale
+    try:
+        valid_data = data if invalid_mask is None else data[~invalid_mask]
+        np.clip(valid_data, -0.01, max_clip, valid_data)
+        valid_data = scale_func(valid_data, 0., 1., -0.01, 1.1)
+        if invalid_mask is None:
+            data[:] = valid_data
+        else:
+            data[~invalid_mask] = valid_data
+    except ValueError:
+        LOG.error("Could not apply ratio-sharpened non-linear scaling")
+        raise
+
 
 class CreflRGBSharpenCompositor(roles.CompositorRole):
     """Compositor filter that sharpens all other products based on the ratio of a high resolution product to a low
@@ -101,6 +143,9 @@ class CreflRGBSharpenCompositor(roles.CompositorRole):
         self.share_mask = kwargs.get("share_mask", True)
         self.remove_lores = kwargs.get("remove_lores", True)
         self.apply_scale = kwargs.get("apply_scale", False)
+        # use the approximate quantized lookup table when applying the non-linear scaling
+        self.quantized_lookup = kwargs.get("quantized_lookup", False)
+        self.rows_per_strip = int(kwargs.get("rows_per_strip", STRIP_ROWS))
         self.lores_products = lores_products if not isinstance(lores_products, str) else lores_products.split(",")
         self.hires_products = lores_products if not isinstance(hires_products, str) else hires_products.split(",")
 
@@ -127,68 +172,46 @@ class CreflRGBSharpenCompositor(roles.CompositorRole):
         try:
             lores_data = gridded_scene[lores_product_name].get_data_array(mode="r+")
             hires_data = gridded_scene[hires_product_name].get_data_array(mode="r+")
-            ratio = hires_data / lores_data
-
+            # opening in this mode will do inplace modifications (flushed on object deletion)
+            other_data = [gridded_scene[pname].get_data_array(mode="r+") for pname in other_product_names]
             if self.share_mask:
                 LOG.debug("Sharing missing value mask between bands and using fill value %r", fill_value)
-                shared_mask = self.shared_mask(gridded_scene, gridded_scene.keys())
-                # mask the hires product then update the product
-                lores_data[shared_mask] = fill_value
-                hires_data[shared_mask] = fill_value
-            else:
-                shared_mask = None
-
-            # For each of the other products mask them accordingly
-            for pname in other_product_names:
-                # opening in this mode will do inplace modifications (flushed on object deletion)
-                other_data = gridded_scene[pname].get_data_array(mode="r+")
-                other_data *= ratio
-                if shared_mask is not None:
-                    other_data[shared_mask] = fill_value
-                gridded_scene[pname]["sharpened"] = True
+                all_data = dict(zip(other_product_names, other_data))
+                all_data[lores_product_name] = lores_data
+                all_data[hires_product_name] = hires_data
+                mask_sources = [(all_data[pname], gridded_scene[pname]["fill_value"]) for pname in gridded_scene.keys()]
+            if self.apply_scale:
+                LOG.debug("Applying ratio-sharpened non-linear scaling...")
+
+            for row_slice in iter_row_strips(lores_data.shape[0], self.rows_per_strip):
+                ratio = hires_data[row_slice] / lores_data[row_slice]
+                if self.share_mask:
+                    shared_mask = strip_shared_mask(mask_sources, row_slice)
+                    # mask the hires product then update the product
+                    lores_data[row_slice][shared_mask] = fill_value
+                    hires_data[row_slice][shared_mask] = fill_value
+                else:
+                    shared_mask = None
+
+                # For each of the other products mask them accordingly
+                for data in other_data:
+                    data = data[row_slice]
+                    data *= ratio
+                    if shared_mask is not None:
+                        data[shared_mask] = fill_value
+                    if self.apply_scale:
+                        _lookup_scale_strip(data, shared_mask, 1.1, self.quantized_lookup)
 
                 if self.apply_scale:
-                    try:
-                        LOG.debug("Applying ratio-sharpened non-linear scaling...")
-                        from polar2grid.core.rescale import lookup_scale
-                        other_orig = other_data
-                        if shared_mask is not None:
-                            # this makes a copy
-                            other_data = other_data[~shared_mask]
-                        np.clip(other_data, -0.01, 1.1, other_data)
-                        other_data[:] = lookup_scale(other_data, 0., 1., -0.01, 1.1)
-                        if shared_mask is not None:
-                            other_orig[~shared_mask] = other_data
-                        gridded_scene[pname]["valid_min"] = 0.
-                        gridded_scene[pname]["valid_max"] = 1.
-                    except ValueError:
-                        LOG.error("Could not apply ratio-sharpened non-linear scaling")
-                        raise
+                    _lookup_scale_strip(lores_data[row_slice], shared_mask, 1.1, self.quantized_lookup)
+                    _lookup_scale_strip(hires_data[row_slice], shared_mask, 0.9, self.quantized_lookup)
 
+            for pname in other_product_names:
+                gridded_scene[pname]["sharpened"] = True
             if self.apply_scale:
-                try:
-                    LOG.debug("Applying ratio-sharpened non-linear scaling...")
-                    from polar2grid.core.rescale import lookup_scale
-                    lores_orig = lores_data
-                    hires_orig = hires_data
-                    if shared_mask is not None:
-                        # this makes a copy
-                        lores_data = lores_data[~shared_mask]
-                        hires_data = hires_data[~shared_mask]
-                    np.clip(lores_data, -0.01, 1.1, lores_data)
-                    np.clip(hires_data, -0.01, 0.9, hires_data)
-                    lores_data[:] = lookup_scale(lores_data, 0., 1., -0.01, 1.1)
-                    hires_data[:] = lookup_scale(hires_data, 0., 1., -0.01, 1.1)
-                    if shared_mask is not None:
-                        hires_orig[~shared_mask] = hires_data
-                        lores_orig[~shared_mask] = lores_data
-                    gridded_scene[lores_product_name]["valid_min"] = 0.
-                    gridded_scene[lores_product_name]["valid_max"] = 1.
-                    gridded_scene[hires_product_name]["valid_min"] = 0.
-                    gridded_scene[hires_product_name]["valid_max"] = 1.
-                except ValueError:
-                    LOG.error("Could not apply ratio-sharpened non-linear scaling")
-                    raise
+                for pname in other_product_names + [lores_product_name, hires_product_name]:
+                    gridded_scene[pname]["valid_min"] = 0.
+                    gridded_scene[pname]["valid_max"] = 1.
 
             if self.remove_lores:
                 del gridded_scene[lores_product_name]
@@ -204,6 +227,7 @@ class RGBCompositor(roles.CompositorRole):
         self.composite_name = kwargs.get("composite_name", "rgb_composite")
         self.composite_data_kind = kwargs.get("composite_data_kind", "rgb")
         self.share_mask = kwargs.get("share_mask", True)
+        self.rows_per_strip = int(kwargs.get("rows_per_strip", STRIP_ROWS))
         self.composite_products = kwargs.get("composite_products", "")
         if isinstance(self.composite_products, str):
             self.composite_products = self.composite_products.split(",")
@@ -215,6 +239,31 @@ class RGBCompositor(roles.CompositorRole):
     def joined_array(self, gridded_scene, product_names):
         return np.array([gridded_scene[pname].get_data_array() for pname in product_names])
 
+    def write_composite(self, gridded_scene, filename, product_names, mask_products=None, fill_value=None,
+                        strip_func=None):
+        """Write the products as bands of a (bands, rows, columns) flat binary file one strip of rows at a time.
+
+        :param mask_products: Pixels invalid in any of these products are set to `fill_value` in every band
+        :param strip_func: Function called as ``strip_func(strip_data, row_slice)`` to modify each
+                           (bands, strip rows, columns) strip in place before masking
+        """
+        band_data = [gridded_scene[pname].get_data_array() for pname in product_names]
+        mask_sources = [(gridded_scene[pname].get_data_array(), gridded_scene[pname]["fill_value"])
+                        for pname in (mask_products or [])]
+        rows, cols = band_data[0].shape
+        comp_data = np.memmap(filename, dtype=np.result_type(*band_data), mode="w+",
+                              shape=(len(band_data), rows, cols))
+        for row_slice in iter_row_strips(rows, self.rows_per_strip):
+            strip_data = comp_data[:, row_slice]
+            for band_idx, data in enumerate(band_data):
+                strip_data[band_idx] = data[row_slice]
+            if strip_func is not None:
+                strip_func(strip_data, row_slice)
+            if mask_sources:
+                strip_data[:, strip_shared_mask(mask_sources, row_slice)] = fill_value
+        comp_data.flush()
+        LOG.debug("Composite array has shape %r", comp_data.shape)
+
     def modify_scene(self, gridded_scene, fill_value=None, **kwargs):
         if self.composite_name in gridded_scene:
             LOG.error("Cannot create composite product '%s', it already exists." % (self.composite_name,))
@@ -234,12 +283,8 @@ class RGBCompositor(roles.CompositorRole):
         fn = "grid_{}_{}.dat".format(grid_name, self.composite_name)
 
         try:
-            comp_data = self.joined_array(gridded_scene, self.composite_products)
-
-            if self.share_mask:
-                comp_data[:, self.shared_mask(gridded_scene, self.composite_products)] = fill_value
-
-            comp_data.tofile(fn)
+            mask_products = self.composite_products if self.share_mask else None
+            self.write_composite(gridded_scene, fn, self.composite_products, mask_products, fill_value)
             gridded_scene[self.composite_name] = self._create_gridded_product(self.composite_name, fn, base_product=base_product,
                                                                               data_kind=self.composite_data_kind)
         except (ValueError, KeyError):
@@ -298,6 +343,12 @@ class TrueColorCompositor(RGBCompositor):
         for idx in lowres_band_indexes:
             rgb_data[idx, :] *= ratio
 
+    def _ratio_sharpen_func(self, lowres_data, compare_index=None):
+        """Function for `write_composite` that ratio sharpens each strip using the same rows of `lowres_data`."""
+        def _sharpen_strip(strip_data, row_slice):
+            self.ratio_sharpen(lowres_data[row_slice], strip_data, compare_index=compare_index)
+        return _sharpen_strip
+
     def modify_scene(self, gridded_scene, fill_value=None, **kwargs):
         if self.composite_name in gridded_scene:
             LOG.error("Cannot create composite product '%s', it already exists." % (self.composite_name,))
@@ -323,20 +374,20 @@ class TrueColorCompositor(RGBCompositor):
             if sharp_red_product and self.sharpen_rgb:
                 all_products.append(sharp_red_product)
                 LOG.debug("Will attempt to create a true color image using: %s", ",".join(all_products))
-                comp_data = self.joined_array(gridded_scene, (sharp_red_product, green_product, blue_product))
-                self.ratio_sharpen(gridded_scene[red_product].get_data_array(), comp_data)
+                band_products = (sharp_red_product, green_product, blue_product)
+                strip_func = self._ratio_sharpen_func(gridded_scene[red_product].get_data_array())
             else:
                 LOG.info("No high resolution products were found so true color sharpening will not be done")
                 LOG.debug("Will attempt to create a true color image using: %s", ",".join(all_products))
-                comp_data = self.joined_array(gridded_scene, all_products)
+                band_products = all_products
+                strip_func = None
 
             if self.share_mask:
                 LOG.debug("Sharing missing value mask between bands and using fill value %r", fill_value)
-                comp_data[:, self.shared_mask(gridded_scene, all_products)] = fill_value
+            mask_products = all_products if self.share_mask else None
 
-            LOG.debug("True color array has shape %r", comp_data.shape)
             LOG.info("Saving true color image to filename '%s'", fn)
-            comp_data.tofile(fn)
+            self.write_composite(gridded_scene, fn, band_products, mask_products, fill_value, strip_func=strip_func)
             gridded_scene[self.composite_name] = self._create_gridded_product(self.composite_name, fn,
                                                                               base_product=base_product,
                                                                               data_kind=self.composite_data_kind)
@@ -384,22 +435,20 @@ class FalseColorCompositor(TrueColorCompositor):
             all_products = [red_product, green_product, blue_product]
             sharp_green_product = self._get_first_available_product(gridded_scene, self.hires_products)
 
-            if self.sharpen_rgb and not sharp_green_product:
-                LOG.info("No high resolution products were found so false color sharpening will not be done")
-                LOG.debug("Will attempt to create a false color image using: %s", ",".join(all_products))
-                comp_data = self.joined_array(gridded_scene, all_products)
-            elif self.sharpen_rgb:
+            if sharp_green_product and self.sharpen_rgb:
                 all_products.append(sharp_green_product)
                 LOG.debug("Will attempt to create a false color image using: %s", ",".join(all_products))
-                comp_data = self.joined_array(gridded_scene, (red_product, sharp_green_product, blue_product))
-                self.ratio_sharpen(gridded_scene[green_product].get_data_array(), comp_data)
-
-            if self.share_mask:
-                comp_data[:, self.shared_mask(gridded_scene, all_products)] = fill_value
+                band_products = (red_product, sharp_green_product, blue_product)
+                strip_func = self._ratio_sharpen_func(gridded_scene[green_product].get_data_array())
+            else:
+                LOG.info("No high resolution products were found so false color sharpening will not be done")
+                LOG.debug("Will attempt to create a false color image using: %s", ",".join(all_products))
+                band_products = all_products
+                strip_func = None
 
-            LOG.debug("False color array has shape %r", comp_data.shape)
+            mask_products = all_products if self.share_mask else None
             LOG.info("Saving false color image to filename '%s'", fn)
-            comp_data.tofile(fn)
+            self.write_composite(gridded_scene, fn, band_products, mask_products, fill_value, strip_func=strip_func)
             gridded_scene[self.composite_name] = self._create_gridded_product(self.composite_name, fn,
                                                                               base_product=base_product,
                                                                               data_kind=self.composite_data_kind)
@@ -44,6 +44,9 @@ import sys
 import json
 import shutil
 import logging
+import weakref
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
 import numpy
@@ -55,6 +58,10 @@ from polar2grid.core.proj import Proj
 
 LOG = logging.getLogger(__name__)
 
+# Memory used by cached data masks and number of read-only memory maps kept open
+DATA_CACHE_BYTES = int(float(os.environ.get("P2G_DATA_CACHE_MB", 256)) * 1024 * 1024)
+MEMMAP_HANDLES = int(os.environ.get("P2G_MEMMAP_HANDLES", 64))
+
 
 # FUTURE: Add a register function to register custom P2G objects so no imports and short __class__ names
 # FUTURE: Handling duplicate sub-objects better (ex. geolocation)
@@ -233,6 +240,17 @@ class BaseP2GObject(dict):
     def __del__(self):
         self.cleanup()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # instance level list of loadable keys is only needed when loading from JSON
+        state.pop("loadable_kwargs", None)
+        return state
+
+    def __setstate__(self, state):
+        # unpickled copies (ex. sent to another process) don't have the 'right' to delete any files on disk
+        self.__dict__.update(state)
+        self.persist = True
+
     def cleanup(self):
         """Delete any files associated with this object.
         """
@@ -243,6 +261,9 @@ class BaseP2GObject(dict):
                     try:
                         # LOG.debug("Removing associated file that is no longer needed: '%s'", self[kw])
                         os.remove(self[kw])
+                        if DATA_CACHE is not None:
+                            # module globals may already be gone during interpreter shutdown
+                            DATA_CACHE.invalidate(self[kw])
                     except OSError as e:
                         # if hasattr(e, "errno") and e.errno == 2:
                         #     LOG.debug("Unable to remove file because it doesn't exist: '%s'", self[kw])
@@ -281,12 +302,29 @@ class BaseP2GObject(dict):
 
     @classmethod
     def load(cls, filename, object_class=None):
-        """Open a JSON file representing a Polar2Grid object.
+        """Open a JSON file or scene package file representing a Polar2Grid object.
+
+        JSON objects are converted to `object_class` (this class by default) if needed. Scene packages store the
+        object itself so a `ValueError` is raised if the package doesn't hold an instance of `object_class`.
+
+        .. seealso::
+
+            `polar2grid.core.scene_package` for the single file package format.
+
         """
         # Allow the caller to specify the preferred object class if one is not specified in the JSON
         if object_class is None:
             object_class = cls
         if isinstance(filename, str):
+            from polar2grid.core.scene_package import is_package_file, load_package
+            if is_package_file(filename):
+                inst = load_package(filename)
+                if not isinstance(inst, object_class):
+                    LOG.error("Package '%s' holds a %s, not a %s", filename, inst.__class__.__name__,
+                              object_class.__name__)
+                    raise ValueError("Package '%s' holds a %s, not a %s" % (filename, inst.__class__.__name__,
+                                                                             object_class.__name__))
+                return inst
             # we are dealing with a string filename
             file_obj = open(filename, "r")
         else:
@@ -318,7 +356,16 @@ class BaseP2GObject(dict):
 
     def save(self, filename):
         """Write the JSON representation of this class to a file.
+
+        If `filename` ends with the scene package extension (".p2g") the object and all of its arrays are written to
+        a single package file instead (see `polar2grid.core.scene_package`). The package doesn't refer to the
+        original binary files so they are still removed when this object is garbage collected.
         """
+        from polar2grid.core.scene_package import is_package_filename, save_package
+        if is_package_filename(filename):
+            save_package(self, filename)
+            return
+
         f = open(filename, "w")
         try:
             json.dump(self, f, cls=P2GJSONEncoder, indent=4, sort_keys=True)
@@ -352,6 +399,116 @@ class BaseP2GObject(dict):
             return self.__class__(dict.copy(self))
 
 
+class DataCache(object):
+    """Least recently used cache of read-only memory maps and invalid data masks for flat binary files.
+
+    Entries are keyed by the absolute path of the file and are dropped if the file is replaced (different inode,
+    size, or modification time). Writes through a memory map can't be detected this way so any file opened with a
+    writable mode through `BaseProduct.get_data_array` is not cached until every writable array for it has been
+    garbage collected. Masks are stored bit-packed and count against a byte budget, memory maps count against a
+    maximum number of open handles.
+
+    """
+    def __init__(self, max_bytes=DATA_CACHE_BYTES, max_handles=MEMMAP_HANDLES):
+        self.max_bytes = max_bytes
+        self.max_handles = max_handles
+        self._memmaps = OrderedDict()
+        self._masks = OrderedDict()
+        self._mask_bytes = 0
+        self._writers = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _file_stamp(filename):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _get(self, entries, key, filename):
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        if filename in self._writers or entry[0] != self._file_stamp(filename):
+            self.invalidate(filename)
+            return None
+        entries.move_to_end(key)
+        return entry
+
+    def get_memmap(self, filename, key, open_func):
+        """Get the cached memory map for `filename` or open and cache it with `open_func()`."""
+        filename = os.path.abspath(filename)
+        key = (filename,) + key
+        with self._lock:
+            entry = self._get(self._memmaps, key, filename)
+            if entry is not None:
+                return entry[1]
+            data = open_func()
+            if filename not in self._writers and self.max_handles > 0:
+                self._memmaps[key] = (self._file_stamp(filename), data)
+                while len(self._memmaps) > self.max_handles:
+                    self._memmaps.popitem(last=False)
+            return data
+
+    def get_mask(self, filename, key, mask_func):
+        """Get the cached mask for `filename` or compute and cache it with `mask_func()`.
+
+        A new boolean array is returned every time so callers are free to modify it.
+        """
+        filename = os.path.abspath(filename)
+        key = (filename,) + key
+        with self._lock:
+            entry = self._get(self._masks, key, filename)
+            if entry is not None:
+                _, packed, shape = entry
+                return numpy.unpackbits(packed, count=int(numpy.prod(shape))).view(numpy.bool_).reshape(shape)
+            stamp = self._file_stamp(filename)
+            mask = mask_func()
+            if filename in self._writers:
+                return mask
+            packed = numpy.packbits(mask)
+            if packed.nbytes > self.max_bytes:
+                return mask
+            self._masks[key] = (stamp, packed, mask.shape)
+            self._mask_bytes += packed.nbytes
+            while self._mask_bytes > self.max_bytes:
+                self._mask_bytes -= self._masks.popitem(last=False)[1][1].nbytes
+            return mask
+
+    def add_writer(self, filename, data):
+        """Stop caching `filename` until the writable array `data` has been garbage collected."""
+        filename = os.path.abspath(filename)
+        with self._lock:
+            self.invalidate(filename)
+            self._writers[filename] = self._writers.get(filename, 0) + 1
+        weakref.finalize(data, self._remove_writer, filename)
+
+    def _remove_writer(self, filename):
+        with self._lock:
+            count = self._writers.pop(filename, 0) - 1
+            if count > 0:
+                self._writers[filename] = count
+            self.invalidate(filename)
+
+    def invalidate(self, filename=None):
+        """Remove cached entries for `filename` or every cached entry if it is None."""
+        with self._lock:
+            if filename is None:
+                self._memmaps.clear()
+                self._masks.clear()
+                self._mask_bytes = 0
+                return
+            filename = os.path.abspath(filename)
+            for key in [k for k in self._memmaps if k[0] == filename]:
+                del self._memmaps[key]
+            for key in [k for k in self._masks if k[0] == filename]:
+                self._mask_bytes -= self._masks.pop(key)[1].nbytes
+
+
+DATA_CACHE = DataCache()
+
+
 class GeographicDefinition(BaseP2GObject):
     """Base class for objects that define a geographic area.
     """
@@ -373,26 +530,47 @@ class BaseProduct(BaseP2GObject):
     def get_data_array(self, item, rows, cols, dtype, mode="r"):
         """Get FBF item as a numpy array.
 
-        File is loaded from disk as a memory mapped file if needed.
+        File is loaded from disk as a memory mapped file if needed. Read-only memory maps are reused from
+        `DATA_CACHE`. Writable memory maps are never cached and cached information for the file is not used until
+        the writable array is garbage collected. Lazy (dask) arrays are computed once and the computed array replaces
+        the lazy one so later calls (and any changes made through a writable request) reuse it.
         """
         data = self[item]
         if isinstance(data, str):
-            data = self._memmap(data, dtype, rows, cols, mode)
+            fn = data
+            if mode == "r":
+                data = DATA_CACHE.get_memmap(fn, (numpy.dtype(dtype).str, rows, cols),
+                                             lambda: self._memmap(fn, dtype, rows, cols, mode))
+            else:
+                data = self._memmap(fn, dtype, rows, cols, mode)
+                if mode != "c":
+                    DATA_CACHE.add_writer(fn, data)
+        elif hasattr(data, "compute"):
+            data = numpy.asarray(data)
+            self[item] = data
 
         return data
 
     def get_data_mask(self, item, fill=numpy.nan, fill_key=None):
         """Return a boolean mask where the data for `item` is invalid/bad.
+
+        Masks for data stored in files are cached in `DATA_CACHE`.
         """
         data = self.get_data_array(item)
 
         if fill_key is not None:
             fill = self[fill_key]
 
-        if numpy.isnan(fill):
-            return numpy.isnan(data)
-        else:
-            return data == fill
+        def _mask():
+            if numpy.isnan(fill):
+                return numpy.isnan(data)
+            else:
+                return data == fill
+
+        if isinstance(self[item], str):
+            fill_str = "nan" if numpy.isnan(fill) else repr(float(fill))
+            return DATA_CACHE.get_mask(self[item], (data.dtype.str, data.shape, fill_str), _mask)
+        return _mask()
 
     def copy_array(self, item, rows, cols, dtype, filename=None, read_only=True):
         """Copy the array item of this swath.
@@ -417,9 +595,10 @@ class BaseProduct(BaseP2GObject):
             else:
                 return self._memmap(data, dtype, rows, cols, "r").copy()
         else:
+            data = numpy.asarray(data)
             if filename:
                 data.tofile(filename)
-                return self._memmap(data, dtype, rows, cols, mode)
+                return self._memmap(filename, dtype, rows, cols, mode)
             return data.copy()
 
 
@@ -556,6 +735,12 @@ class GridDefinition(GeographicDefinition):
             kwargs["proj4_definition"] = str(kwargs["proj4_definition"])
         super(GridDefinition, self).__init__(*args, **kwargs)
 
+    def __getstate__(self):
+        # pyproj objects are recreated when needed
+        state = super(GridDefinition, self).__getstate__()
+        state["p"] = None
+        return state
+
     def __str__(self):
         keys = sorted(self.keys())
         keys.insert(0, keys.pop(keys.index("height")))
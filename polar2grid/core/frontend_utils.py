@@ -440,6 +440,20 @@ class BaseFileReader(object):
         """
         raise NotImplementedError("Frontend has not implemented this method yet")
 
+    def get_swath_shape(self, item):
+        """Shape of the swath data for `item` if it can be found without loading the data, otherwise `None`.
+
+        Readers that implement this and `iter_swath_data` can be streamed in to a preallocated output file.
+        """
+        return None
+
+    def iter_swath_data(self, item):
+        """Yield the swath data for `item` in blocks of rows (ex. one granule at a time).
+
+        The default yields the entire result of `get_swath_data` as one block.
+        """
+        yield self.get_swath_data(item)
+
     def _compare(self, other, method):
         try:
             return method(self.begin_time, other.begin_time)
@@ -580,7 +594,9 @@ class BaseMultiFileReader(object):
     def write_var_to_flat_binary(self, item, filename, dtype=numpy.float32):
         """Write multiple variables to disk as one concatenated flat binary file.
 
-        Data is written incrementally to reduce memory usage.
+        Data is written incrementally to reduce memory usage. If the file readers can provide the shape of the
+        data before loading it (see `get_swath_shape`) the output file is preallocated and filled one block
+        (usually one granule) at a time from `iter_swath_data` so only one block is in memory at a time.
 
         :param item: Variable name to retrieve from these files
         :param filename: Filename to write to
@@ -590,6 +606,40 @@ class BaseMultiFileReader(object):
             LOG.error("Can't extract swath data, file reader is empty")
             raise RuntimeError("Empty file reader")
 
+        shape = self.get_swath_shape(item)
+        if shape is None:
+            return self._append_var_to_flat_binary(item, filename, dtype)
+
+        LOG.debug("Streaming binary data for '%s' to file '%s' with shape %r", item, filename, shape)
+        try:
+            output_array = numpy.memmap(filename, dtype=dtype, mode="w+", shape=shape)
+            row_idx = 0
+            for file_reader in self.file_readers:
+                for block in file_reader.iter_swath_data(item):
+                    if row_idx + block.shape[0] > shape[0]:
+                        raise ValueError("More rows of '%s' data than expected (%d)" % (item, shape[0]))
+                    output_array[row_idx:row_idx + block.shape[0]] = block
+                    row_idx += block.shape[0]
+            if row_idx != shape[0]:
+                raise ValueError("Expected %d rows of '%s' data, got %d" % (shape[0], item, row_idx))
+            output_array.flush()
+            del output_array
+        except (IOError, ValueError, TypeError):
+            if os.path.isfile(filename):
+                os.remove(filename)
+            raise
+
+        return shape
+
+    def get_swath_shape(self, item):
+        """Shape of the concatenated swath data for `item` or `None` if any file reader can't tell without loading.
+        """
+        shapes = [fr.get_swath_shape(item) for fr in self.file_readers]
+        if not shapes or any(s is None for s in shapes):
+            return None
+        return (sum(s[0] for s in shapes),) + tuple(shapes[0][1:])
+
+    def _append_var_to_flat_binary(self, item, filename, dtype):
         LOG.debug("Writing binary data for '%s' to file '%s'", item, filename)
         try:
             with open(filename, "w") as file_obj:
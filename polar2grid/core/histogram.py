@@ -106,24 +106,21 @@ def local_histogram_equalization (data, mask_to_equalize, valid_data_mask=None,
     total_rows = data.shape[0]
     total_cols = data.shape[1]
     tile_size = int((local_radius_px * 2.0) + 1.0)
-    row_tiles = int(total_rows / tile_size) if (total_rows % tile_size is 0) else int(total_rows / tile_size) + 1
-    col_tiles = int(total_cols / tile_size) if (total_cols % tile_size is 0) else int(total_cols / tile_size) + 1
+    row_tiles = int(total_rows / tile_size) if (total_rows % tile_size == 0) else int(total_rows / tile_size) + 1
+    col_tiles = int(total_cols / tile_size) if (total_cols % tile_size == 0) else int(total_cols / tile_size) + 1
     
-    # an array of our distribution functions for equalization
-    all_cumulative_dist_functions = [ [ ] ]
-    # an array of our bin information for equalization
-    all_bin_information           = [ [ ] ]
+    # calculate the histogram equalization for every tile in one pass
+    cumulative_dist_functions, bin_information, has_equalization = _tile_equalizations(
+        data, valid_data_mask, tile_size, row_tiles, col_tiles, number_of_bins,
+        std_mult_cutoff=std_mult_cutoff, do_log_scale=do_log_scale, log_offset=log_offset,
+        clip_limit=clip_limit, slope_limit=slope_limit)
     
-    # loop through our tiles and create the histogram equalizations for each one
+    # get the tile weight array so we can use it to interpolate our data
+    tile_weights = _calculate_weights(tile_size)
+    flat_tile_weights = tile_weights.reshape((9, tile_size * tile_size))
+    
+    # now loop through our tiles and bilinearly interpolate the equalized versions of the data
     for num_row_tile in range(row_tiles) :
-        
-        # make sure we have enough rows available to store info on this next row of tiles
-        if len(all_cumulative_dist_functions) <= num_row_tile :
-            all_cumulative_dist_functions.append( [ ] )
-        if len(all_bin_information)           <= num_row_tile :
-            all_bin_information          .append( [ ] )
-        
-        # go through each tile in this row and calculate the equalization
         for num_col_tile in range(col_tiles) :
             
             # calculate the range for this tile (min is inclusive, max is exclusive)
@@ -132,41 +129,82 @@ def local_histogram_equalization (data, mask_to_equalize, valid_data_mask=None,
             min_col = num_col_tile * tile_size
             max_col = min_col + tile_size
             
-            # for speed of calculation, pull out the mask of pixels that should be used to calculate the histogram
-            mask_valid_data_in_tile  = valid_data_mask[min_row:max_row, min_col:max_col]
+            # pull out only the pixels we need to equalize in this tile
+            temp_mask_to_equalize = mask_to_equalize[min_row:max_row, min_col:max_col]
+            rows, cols = numpy.nonzero(temp_mask_to_equalize)
+            if not rows.size:
+                continue
+            temp_data_to_equalize = data[min_row:max_row, min_col:max_col][temp_mask_to_equalize]
+            if do_log_scale:
+                temp_data_to_equalize = numpy.log(temp_data_to_equalize + log_offset)
             
-            # if we have any valid data in this tile, calculate a histogram equalization for this tile
-            # (note: even if this tile does no fall in the mask_to_equalize, it's histogram may be used by other tiles)
-            cumulative_dist_function, temp_bins = None, None
-            if mask_valid_data_in_tile.any():
-                
-                # use all valid data in the tile, so separate sections will blend cleanly
-                temp_valid_data = data[min_row:max_row, min_col:max_col][mask_valid_data_in_tile]
-                temp_valid_data = temp_valid_data[temp_valid_data >= 0] # TEMP, testing to see if negative data is messing everything up
-                # limit the contrast by only considering data within a certain range of the average
-                if std_mult_cutoff is not None :
-                    avg               = numpy.mean(temp_valid_data)
-                    std               = numpy.std (temp_valid_data)
-                    # limit our range to avg +/- std_mult_cutoff*std; e.g. the default std_mult_cutoff is 4.0 so about 99.8% of the data
-                    concervative_mask = (temp_valid_data < (avg + std*std_mult_cutoff)) & (temp_valid_data > (avg - std*std_mult_cutoff))
-                    temp_valid_data   = temp_valid_data[concervative_mask]
-                
-                # if we are taking the log of our data, do so now
-                if do_log_scale :
-                    temp_valid_data = numpy.log(temp_valid_data + log_offset)
-                
-                # do the histogram equalization and get the resulting distribution function and bin information
-                if temp_valid_data.size > 0 :
-                    cumulative_dist_function, temp_bins = _histogram_equalization_helper (temp_valid_data, number_of_bins, clip_limit=clip_limit, slope_limit=slope_limit)
+            # weights of the 9 surrounding tiles for every pixel
+            temp_tile_weights = flat_tile_weights.take(rows * tile_size + cols, axis=1)
+            
+            # a place to hold our weighted sum that represents the interpolated contributions
+            # of the histogram equalizations from the surrounding tiles
+            temp_sum = numpy.zeros_like(temp_data_to_equalize)
+            
+            # how much weight were we unable to use because those tiles fell off the edge of the image?
+            unused_weight = numpy.zeros(temp_data_to_equalize.shape, dtype=tile_weights.dtype)
+            
+            # loop through all the surrounding tiles and process their contributions to this tile
+            for weight_row in range(3):
+                for weight_col in range(3):
+                    # figure out which adjacent tile we're processing (in overall tile coordinates instead of relative to our current tile)
+                    calculated_row = num_row_tile - 1 + weight_row
+                    calculated_col = num_col_tile - 1 + weight_col
+                    tmp_tile_weights = temp_tile_weights[weight_row * 3 + weight_col]
+                    
+                    # if we're inside the tile array and the tile we're processing has a histogram equalization for us to use, process it
+                    if ( (0 <= calculated_row < row_tiles) and (0 <= calculated_col < col_tiles) and
+                         has_equalization[calculated_row, calculated_col]) :
+                        # each pixel only gets weight from at most 4 tiles, skip the pixels that get nothing from this one
+                        pixels_used = numpy.flatnonzero(tmp_tile_weights)
+                        if not pixels_used.size:
+                            continue
+                        tile_index = calculated_row * col_tiles + calculated_col
+                        
+                        # equalize our current tile using the histogram equalization from the tile we're processing
+                        temp_equalized_data = _interp_uniform_bins(temp_data_to_equalize[pixels_used],
+                                                                   bin_information[tile_index],
+                                                                   cumulative_dist_functions[tile_index])
+                        
+                        # add the contribution for the tile we're processing to our weighted sum
+                        temp_sum[pixels_used] += temp_equalized_data * tmp_tile_weights[pixels_used]
+                        
+                    else : # if the tile we're processing doesn't exist, hang onto the weight we would have used for it so we can correct that later
+                        unused_weight -= tmp_tile_weights
             
-            # hang on to our equalization related information for use later
-            all_cumulative_dist_functions[num_row_tile].append(cumulative_dist_function)
-            all_bin_information          [num_row_tile].append(temp_bins)
+            # if we have unused weights, scale our values to correct for that
+            if unused_weight.any():
+                # TODO, if the mask masks everything out this will be a zero!
+                temp_sum /= unused_weight + 1
+            
+            # now that we've calculated the weighted sum for this tile, set it in our data array
+            out[min_row:max_row, min_col:max_col][temp_mask_to_equalize] = temp_sum
     
-    # get the tile weight array so we can use it to interpolate our data
-    tile_weights = _calculate_weights(tile_size)
+    # if we were asked to, normalize our data to be between zero and one, rather than zero and number_of_bins
+    if do_zerotoone_normalization :
+        _linear_normalization_from_0to1 (out, mask_to_equalize, number_of_bins)
+    
+    return out
+
+def _tile_equalizations (data, valid_data_mask, tile_size, row_tiles, col_tiles, number_of_bins,
+                         std_mult_cutoff=3.0, do_log_scale=True, log_offset=0.00001,
+                         clip_limit=None, slope_limit=None) :
+    """
+    calculate the histogram equalization for every tile of the data
+    
+    returns a (row_tiles * col_tiles, number_of_bins) array of cumulative distribution functions,
+    a (row_tiles * col_tiles, number_of_bins) array of the lower bin edges (as doubles) for each tile
+    and a (row_tiles, col_tiles) boolean array of which tiles had enough valid data to be equalized
+    """
+    
+    cumulative_dist_functions = numpy.zeros((row_tiles * col_tiles, number_of_bins), dtype=numpy.float64)
+    bin_information           = numpy.zeros((row_tiles * col_tiles, number_of_bins), dtype=numpy.float64)
+    has_equalization          = numpy.zeros((row_tiles, col_tiles), dtype=numpy.bool_)
     
-    # now loop through our tiles and linearly interpolate the equalized versions of the data
     for num_row_tile in range(row_tiles) :
         for num_col_tile in range(col_tiles) :
             
@@ -176,76 +214,139 @@ def local_histogram_equalization (data, mask_to_equalize, valid_data_mask=None,
             min_col = num_col_tile * tile_size
             max_col = min_col + tile_size
             
-            # for convenience, pull some of these tile sized chunks out
-            temp_all_data = data[min_row:max_row, min_col:max_col].copy()
-            temp_mask_to_equalize = mask_to_equalize[min_row:max_row, min_col:max_col]
-            temp_all_valid_data_mask = valid_data_mask[min_row:max_row, min_col:max_col]
-
-            # if we have any data in this tile, calculate our weighted sum
-            if temp_mask_to_equalize.any():
-                if do_log_scale:
-                    temp_all_data[temp_all_valid_data_mask] = numpy.log(temp_all_data[temp_all_valid_data_mask] + log_offset)
-                temp_data_to_equalize = temp_all_data[temp_mask_to_equalize]
-                temp_all_valid_data = temp_all_data[temp_all_valid_data_mask]
-
-                # a place to hold our weighted sum that represents the interpolated contributions
-                # of the histogram equalizations from the surrounding tiles
-                temp_sum = numpy.zeros_like(temp_data_to_equalize)
-
-                # how much weight were we unable to use because those tiles fell off the edge of the image?
-                unused_weight = numpy.zeros(temp_data_to_equalize.shape, dtype=tile_weights.dtype)
-
-                # loop through all the surrounding tiles and process their contributions to this tile
-                for weight_row in range(3):
-                    for weight_col in range(3):
-                        # figure out which adjacent tile we're processing (in overall tile coordinates instead of relative to our current tile)
-                        calculated_row = num_row_tile - 1 + weight_row
-                        calculated_col = num_col_tile - 1 + weight_col
-                        tmp_tile_weights = tile_weights[weight_row, weight_col][numpy.where(temp_mask_to_equalize)]
-                        
-                        # if we're inside the tile array and the tile we're processing has a histogram equalization for us to use, process it
-                        if ( (calculated_row >= 0) and (calculated_row < row_tiles) and
-                             (calculated_col >= 0) and (calculated_col < col_tiles) and
-                             (all_bin_information[calculated_row][calculated_col] is not None) and
-                             (all_cumulative_dist_functions[calculated_row][calculated_col] is not None)) :
-                            
-                            # equalize our current tile using the histogram equalization from the tile we're processing
-                            temp_equalized_data = numpy.interp(temp_all_valid_data,
-                                                               all_bin_information[calculated_row][calculated_col][:-1],
-                                                               all_cumulative_dist_functions[calculated_row][calculated_col])
-                            temp_equalized_data = temp_equalized_data[numpy.where(temp_mask_to_equalize[temp_all_valid_data_mask])]
-                            
-                            # add the contribution for the tile we're processing to our weighted sum
-                            temp_sum += (temp_equalized_data * tmp_tile_weights)
-                            
-                        else : # if the tile we're processing doesn't exist, hang onto the weight we would have used for it so we can correct that later
-                            unused_weight -= tmp_tile_weights
+            # for speed of calculation, pull out the mask of pixels that should be used to calculate the histogram
+            mask_valid_data_in_tile = valid_data_mask[min_row:max_row, min_col:max_col]
+            
+            # if we have any valid data in this tile, calculate a histogram equalization for this tile
+            # (note: even if this tile does no fall in the mask_to_equalize, it's histogram may be used by other tiles)
+            if not mask_valid_data_in_tile.any():
+                continue
+            
+            # use all valid data in the tile, so separate sections will blend cleanly
+            temp_valid_data = data[min_row:max_row, min_col:max_col][mask_valid_data_in_tile]
+            temp_valid_data = temp_valid_data[temp_valid_data >= 0] # TEMP, testing to see if negative data is messing everything up
+            # limit the contrast by only considering data within a certain range of the average
+            if std_mult_cutoff is not None :
+                avg               = numpy.mean(temp_valid_data)
+                std               = numpy.std (temp_valid_data)
+                # limit our range to avg +/- std_mult_cutoff*std; e.g. the default std_mult_cutoff is 4.0 so about 99.8% of the data
+                concervative_mask = (temp_valid_data < (avg + std*std_mult_cutoff)) & (temp_valid_data > (avg - std*std_mult_cutoff))
+                temp_valid_data   = temp_valid_data[concervative_mask]
+            
+            # if we are taking the log of our data, do so now
+            if do_log_scale :
+                temp_valid_data = numpy.log(temp_valid_data + log_offset)
+            
+            # do the histogram equalization and get the resulting distribution function and bin information
+            if temp_valid_data.size > 0 :
+                tile_index = num_row_tile * col_tiles + num_col_tile
+                cumulative_dist_function, temp_bins = _histogram_equalization_helper (temp_valid_data, number_of_bins, clip_limit=clip_limit, slope_limit=slope_limit)
+                cumulative_dist_functions[tile_index] = cumulative_dist_function
+                bin_information[tile_index]           = temp_bins[:-1]
+                has_equalization[num_row_tile, num_col_tile] = True
+    
+    return cumulative_dist_functions, bin_information, has_equalization
 
-                # if we have unused weights, scale our values to correct for that
-                if unused_weight.any():
-                    # TODO, if the mask masks everything out this will be a zero!
-                    temp_sum /= unused_weight + 1
+def _interp_uniform_bins (x, xp, fp) :
+    """
+    faster version of `numpy.interp` for the evenly spaced bin edges made by `numpy.histogram`
+    
+    the bin for each value is calculated directly instead of searched for and then corrected for any floating point
+    error so the results are exactly what `numpy.interp(x, xp, fp)` returns
+    """
+    
+    x = numpy.asarray(x, dtype=numpy.float64)
+    num_points = xp.size
+    first_xp = xp[0]
+    last_xp  = xp[-1]
+    finite   = numpy.isfinite(x)
+    all_finite = finite.all()
+    
+    # guess the bin and then move any guesses that are off by floating point error
+    with numpy.errstate(invalid='ignore') :
+        j = (x - first_xp) * ((num_points - 1) / (last_xp - first_xp))
+        numpy.clip(j, 0, num_points - 2, out=j)
+    if not all_finite :
+        j[~finite] = 0
+    j = j.astype(numpy.intp)
+    for _ in range(num_points) :
+        too_high  = x < xp[j]
+        too_high &= j > 0
+        too_low   = x >= xp[j + 1]
+        too_low  &= j < num_points - 2
+        if not (too_high.any() or too_low.any()) :
+            break
+        j -= too_high
+        j += too_low
+    
+    # same calculation as numpy.interp
+    with numpy.errstate(invalid='ignore', divide='ignore') :
+        slopes = (fp[1:] - fp[:-1]) / (xp[1:] - xp[:-1])
+        result = slopes[j] * (x - xp[j]) + fp[j]
+        # if we get nan in one direction, try the other
+        is_nan = numpy.isnan(result)
+        if is_nan.any() :
+            nan_j = j[is_nan]
+            result[is_nan] = slopes[nan_j] * (x[is_nan] - xp[nan_j + 1]) + fp[nan_j + 1]
+            still_nan = numpy.isnan(result) & (fp[j] == fp[j + 1])
+            result[still_nan] = fp[j[still_nan]]
+    result[x < first_xp]  = fp[0]
+    result[x >= last_xp]  = fp[-1]
+    
+    # let numpy handle NaN and inf the way it always does
+    if not all_finite :
+        result[~finite] = numpy.interp(x[~finite], xp, fp)
+    
+    return result
 
-                # now that we've calculated the weighted sum for this tile, set it in our data array
-                out[min_row:max_row, min_col:max_col][temp_mask_to_equalize] = temp_sum
-                
-                """
-                # TEMP, test without using weights
-                data[min_row:max_row, min_col:max_col][temp_mask_to_equalize] = numpy.interp(temp_data_to_equalize,
-                                                                                             all_bin_information          [num_row_tile  ][num_col_tile][:-1],
-                                                                                             all_cumulative_dist_functions[num_row_tile  ][num_col_tile])
-                """
+def _slope_limit_cdf_loop (cumulative_dist_function, pixel_height_limit) :
+    """
+    limit how much the cdf can rise in any one bin, walking the bins one at a time
+    
+    any rise above `pixel_height_limit` is removed from that bin and every bin after it
+    """
+    
+    # clip our cdf and remember how much we removed
+    cumulative_excess_height = 0
+    
+    for pixel_index in range(1, cumulative_dist_function.size) :
+        
+        current_pixel_count = cumulative_dist_function[pixel_index]
+        
+        diff_from_acceptable      = (current_pixel_count - cumulative_dist_function[pixel_index-1] -
+                                          pixel_height_limit - cumulative_excess_height)
+        cumulative_excess_height += max( diff_from_acceptable, 0)
+        cumulative_dist_function[pixel_index] = current_pixel_count - cumulative_excess_height
+    
+    return cumulative_dist_function
 
-    # if we were asked to, normalize our data to be between zero and one, rather than zero and number_of_bins
-    if do_zerotoone_normalization :
-        _linear_normalization_from_0to1 (out, mask_to_equalize, number_of_bins)
+def _slope_limit_cdf_cumulative (cumulative_dist_function, pixel_height_limit) :
+    """
+    vectorized version of `_slope_limit_cdf_loop` with identical results
     
-    return out
+    the previous bin has already had all of the excess height removed from it in the loop version so the
+    amount a bin is over the limit only depends on its own histogram count, the excess removed from each
+    bin is then just the running total of every bin's count over the limit
+    """
+    
+    bin_excess = numpy.diff(cumulative_dist_function) - pixel_height_limit
+    numpy.maximum(bin_excess, 0, out=bin_excess)
+    cumulative_dist_function[1:] -= bin_excess.cumsum()
+    return cumulative_dist_function
 
-def _histogram_equalization_helper (valid_data, number_of_bins, clip_limit=None, slope_limit=None) :
+# available implementations of the cdf slope limiting, see `_histogram_equalization_helper`
+SLOPE_LIMIT_METHODS = {
+    "loop": _slope_limit_cdf_loop,
+    "cumulative": _slope_limit_cdf_cumulative,
+}
+
+def _histogram_equalization_helper (valid_data, number_of_bins, clip_limit=None, slope_limit=None,
+                                    slope_limit_method="cumulative") :
     """
     calculate the simplest possible histogram equalization, using only valid data
     
+    slope_limit_method chooses the implementation of the cdf slope limiting from `SLOPE_LIMIT_METHODS`
+    
     returns the cumulative distribution function and bin information
     """
     
@@ -267,24 +368,8 @@ def _histogram_equalization_helper (valid_data, number_of_bins, clip_limit=None,
     
     # if we have a clip limit and we should do our clipping after building the cumulative distribution function, clip off our cdf
     if (slope_limit is not None) :
-        
-        # clip our cdf and remember how much we removed
-        pixel_height_limit       = int(slope_limit * (valid_data.size / float(number_of_bins)))
-        cumulative_excess_height = 0
-        num_clipped_pixels       = 0
-        weight_metric            = numpy.zeros(cumulative_dist_function.shape, dtype=float)
-        
-        for pixel_index in range(1, cumulative_dist_function.size) :
-            
-            current_pixel_count = cumulative_dist_function[pixel_index]
-            
-            diff_from_acceptable      = (current_pixel_count - cumulative_dist_function[pixel_index-1] -
-                                              pixel_height_limit - cumulative_excess_height)
-            if diff_from_acceptable < 0:
-                weight_metric[pixel_index] = abs(diff_from_acceptable)
-            cumulative_excess_height += max( diff_from_acceptable, 0)
-            cumulative_dist_function[pixel_index] = current_pixel_count - cumulative_excess_height
-            num_clipped_pixels = num_clipped_pixels + cumulative_excess_height
+        pixel_height_limit = int(slope_limit * (valid_data.size / float(number_of_bins)))
+        cumulative_dist_function = SLOPE_LIMIT_METHODS[slope_limit_method](cumulative_dist_function, pixel_height_limit)
     
     # now normalize the overall distribution function
     cumulative_dist_function  = (number_of_bins - 1) * cumulative_dist_function / cumulative_dist_function[-1]
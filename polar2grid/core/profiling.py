@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Pipeline stage timing and memory instrumentation.
+
+A `PipelineProfiler` records the wall time, CPU time, memory use, and number
+of dask tasks executed for each named stage of processing. While enabled a
+dask callback is registered that also records the run time of every task
+computed by the local dask schedulers. Task timings are grouped by the task
+key's name prefix (ex. ``"resample_blocks"``) so the most expensive operations
+can be found without an external profiler. The results can be written to a
+JSON report with `PipelineProfiler.write_report`.
+
+Most of the work of a lazy (dask) pipeline happens in the stage that computes
+the results, not in the stages that build them. Results registered with
+`PipelineProfiler.add_outputs` under a label (ex. the writer and area) have
+the tasks they depend on counted and timed per label in the stage that
+computes them. Tasks needed by more than one label are counted under
+``"shared"``.
+
+Tasks are timed from when the scheduler submits them to when their result is
+received so with multiple worker threads the task times of a stage can add up
+to more than the stage's wall time.
+
+The peak memory of a stage is sampled by a background thread every
+`RSS_SAMPLE_INTERVAL` seconds so short lived peaks may be missed. The peak
+memory of the whole process so far is also recorded.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    # windows
+    resource = None
+
+from dask.base import is_dask_collection
+from dask.callbacks import Callback
+from dask.core import flatten, get_dependencies
+from dask.utils import key_split
+
+LOG = logging.getLogger(__name__)
+
+MB = 1024. * 1024.
+# seconds between memory samples while a stage is running
+RSS_SAMPLE_INTERVAL = 0.05
+# label for tasks needed by the outputs of more than one label
+SHARED_LABEL = "shared"
+
+
+def get_peak_rss():
+    """Peak resident set size of this process in bytes or None if it can't be determined."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, mac reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def get_current_rss():
+    """Current resident set size of this process in bytes or None if it can't be determined."""
+    try:
+        with open("/proc/self/statm", "r") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IOError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _to_mb(num_bytes):
+    return None if num_bytes is None else round(num_bytes / MB, 3)
+
+
+def _max_rss(*values):
+    values = [x for x in values if x is not None]
+    return max(values) if values else None
+
+
+class _RSSSampler(threading.Thread):
+    """Background thread recording the largest resident set size seen until `stop` is called."""
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        super(_RSSSampler, self).__init__(name="p2g_rss_sampler", daemon=True)
+        self.interval = interval
+        self.peak_rss = get_current_rss()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_rss = _max_rss(self.peak_rss, get_current_rss())
+
+    def stop(self):
+        """Stop sampling and return the peak resident set size in bytes (None if it can't be determined)."""
+        self._stop_event.set()
+        self.join()
+        return _max_rss(self.peak_rss, get_current_rss())
+
+
+def _label_tasks(dsk, output_labels):
+    """Map every task of graph `dsk` needed by a labeled output key to the label of that output.
+
+    :param dsk: Dask graph being computed
+    :param output_labels: Dictionary of output key -> label
+    :returns: Dictionary of task key -> label (`SHARED_LABEL` if it is needed by outputs with different labels)
+    """
+    task_labels = {}
+    for label in sorted(set(output_labels.values())):
+        stack = [key for key, key_label in output_labels.items() if key_label == label and key in dsk]
+        seen = set(stack)
+        while stack:
+            key = stack.pop()
+            current = task_labels.get(key)
+            task_labels[key] = label if current in (None, label) else SHARED_LABEL
+            for dep in get_dependencies(dsk, key):
+                if dep not in seen and dep in dsk:
+                    seen.add(dep)
+                    stack.append(dep)
+    return task_labels
+
+
+class _TaskTimingCallback(Callback):
+    """Dask callback recording the run time of every task to a `PipelineProfiler`."""
+    def __init__(self, profiler):
+        super(_TaskTimingCallback, self).__init__()
+        self.profiler = profiler
+        self._task_starts = {}
+        self._task_labels = {}
+
+    def _start(self, dsk):
+        self._task_labels = _label_tasks(dsk, self.profiler.output_labels) if self.profiler.output_labels else {}
+
+    def _pretask(self, key, dsk, state):
+        self._task_starts[key] = time.perf_counter()
+
+    def _posttask(self, key, result, dsk, state, worker_id):
+        start = self._task_starts.pop(key, None)
+        if start is not None:
+            self.profiler.add_task(key_split(key), time.perf_counter() - start, label=self._task_labels.get(key))
+
+
+class PipelineProfiler(object):
+    """Record resource usage of named processing stages.
+
+    If `enabled` is False every method is a no-op so callers don't need to
+    check whether or not profiling was requested.
+
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+        self.tasks = {}
+        # dask output key -> label of the result it belongs to
+        self.output_labels = {}
+        self._current_stage = None
+        self._callback = None
+        self._start_wall = None
+        self._start_cpu = None
+
+    def start(self):
+        """Start profiling and register the dask task callback."""
+        if not self.enabled or self._callback is not None:
+            return
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._callback = _TaskTimingCallback(self)
+        self._callback.register()
+
+    def stop(self):
+        """Stop profiling and unregister the dask task callback."""
+        if self._callback is not None:
+            self._callback.unregister()
+            self._callback = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def add_outputs(self, label, results):
+        """Count the tasks needed to compute the dask collections in `results` under `label` when computed.
+
+        :param label: Name for the results (ex. "geotiff:lcc_conus")
+        :param results: Dask collection or (nested) list or tuple of dask collections and other objects which
+                        are ignored (ex. the result of ``Scene.save_datasets(compute=False)``)
+        """
+        if not self.enabled:
+            return
+        for obj in flatten([results], container=(list, tuple)):
+            if is_dask_collection(obj):
+                for key in flatten(obj.__dask_keys__()):
+                    self.output_labels[key] = label
+
+    def add_task(self, task_name, duration, label=None):
+        """Record one executed dask task in the current stage."""
+        task_info = self.tasks.get(task_name)
+        if task_info is None:
+            task_info = self.tasks[task_name] = {"count": 0, "total_time": 0., "max_time": 0.}
+        task_info["count"] += 1
+        task_info["total_time"] += duration
+        task_info["max_time"] = max(task_info["max_time"], duration)
+        if self._current_stage is not None:
+            self._current_stage["dask_tasks"] += 1
+            if label is not None:
+                label_info = self._current_stage["outputs"].setdefault(label, {"dask_tasks": 0, "task_time": 0.})
+                label_info["dask_tasks"] += 1
+                label_info["task_time"] += duration
+
+    @contextmanager
+    def stage(self, name):
+        """Context manager recording the resources used while running the body as stage `name`.
+
+        Stages can't be nested. The stage is recorded even if the body raises an exception.
+        """
+        if not self.enabled:
+            yield None
+            return
+        if self._current_stage is not None:
+            raise RuntimeError("Can't start profiling stage '{}' while stage '{}' is running".format(
+                name, self._current_stage["name"]))
+
+        stage_info = {"name": name, "dask_tasks": 0, "outputs": {}}
+        self._current_stage = stage_info
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_rss = get_current_rss()
+        sampler = _RSSSampler()
+        sampler.start()
+        try:
+            yield stage_info
+        finally:
+            stage_info["wall_time"] = time.perf_counter() - start_wall
+            stage_info["cpu_time"] = time.process_time() - start_cpu
+            end_rss = get_current_rss()
+            stage_info["start_rss_mb"] = _to_mb(start_rss)
+            stage_info["end_rss_mb"] = _to_mb(end_rss)
+            stage_info["peak_rss_mb"] = _to_mb(_max_rss(sampler.stop(), start_rss, end_rss))
+            stage_info["process_peak_rss_mb"] = _to_mb(get_peak_rss())
+            self._current_stage = None
+            self.stages.append(stage_info)
+            LOG.debug("Stage '%s' took %0.3fs (CPU %0.3fs) and ran %d dask tasks", name,
+                      stage_info["wall_time"], stage_info["cpu_time"], stage_info["dask_tasks"])
+
+    def report(self):
+        """Dictionary of all recorded stage and task information."""
+        tasks = sorted(({"name": name, **info} for name, info in self.tasks.items()),
+                       key=lambda x: x["total_time"], reverse=True)
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "stages": self.stages,
+            "tasks": tasks,
+            "process_peak_rss_mb": _to_mb(get_peak_rss()),
+        }
+        if self._start_wall is not None:
+            report["wall_time"] = time.perf_counter() - self._start_wall
+            report["cpu_time"] = time.process_time() - self._start_cpu
+        return report
+
+    def write_report(self, filename):
+        """Write the profiling report to `filename` as JSON."""
+        if not self.enabled:
+            return
+        LOG.info("Writing profiling report to '%s'", filename)
+        with open(filename, "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
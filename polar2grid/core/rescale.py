@@ -50,15 +50,20 @@ __docformat__ = "restructuredtext en"
 
 import os
 import sys
+import copy
 
 import logging
 import numpy
 
-from polar2grid.core.dtype import dtype_to_str, dtype2range
+from polar2grid.core.dtype import dtype_to_str, dtype2range, clip_to_data_type
 from . import roles
 
 LOG = logging.getLogger(__name__)
 DEFAULT_RCONFIG = "polar2grid.core:rescale_configs/rescale.ini"
+# default number of rows rescaled at a time by a RescalePlan
+RESCALE_ROWS = 512
+# number of input values in quantized lookup tables (at most 65535 so indexes fit in 16 bits)
+LOOKUP_STEPS = int(os.environ.get("P2G_LOOKUP_STEPS", 65535))
 
 
 def mask_helper(img, fill_value):
@@ -228,6 +233,81 @@ def lookup_scale(img, min_out, max_out, min_in, max_in, table_name="crefl", **kw
     return img
 
 
+class QuantizedLookup(object):
+    """Precomputed `lookup_scale` for one set of input and output limits.
+
+    The input range is divided in to `num_steps` evenly spaced values and `lookup_scale` is run once for those
+    values. Applying the lookup rounds each pixel to the nearest of those input values and gathers the output from
+    the table instead of interpolating every pixel. Inputs outside of the input range are clipped to it like
+    `lookup_scale` does and NaNs stay NaN. The difference from `lookup_scale` is at most half an input step times the
+    largest slope of the table (~3e-5 of the output range for the default "crefl" table). For stepped tables like
+    "crefl_old" inputs within half an input step of a step edge can get the neighboring step's output.
+
+    """
+    def __init__(self, min_out, max_out, min_in, max_in, table_name="crefl", num_steps=LOOKUP_STEPS, **kwargs):
+        if min_in == max_in:
+            max_in = min_in + 1.0
+        self.min_in = min_in
+        self.num_steps = num_steps
+        self.step_scale = (num_steps - 1) / (max_in - min_in)
+        # the extra entry at the end is used for NaN inputs
+        self.table = numpy.empty((num_steps + 1,), dtype=numpy.float32)
+        self.table[:-1] = lookup_scale(numpy.linspace(min_in, max_in, num_steps),
+                                       min_out, max_out, min_in, max_in, table_name=table_name, **kwargs)
+        self.table[-1] = numpy.nan
+
+    def __call__(self, img, chunk_size=65536):
+        """Look up every pixel of `img` and return the result as a new float32 array.
+
+        Pixels are processed `chunk_size` at a time so the temporary index arrays stay in the CPU cache.
+        """
+        flat_img = numpy.ravel(img)
+        result = numpy.empty(flat_img.shape, dtype=numpy.float32)
+        step_buffer = numpy.empty((min(chunk_size, flat_img.size),), dtype=numpy.float32)
+        index_buffer = numpy.empty(step_buffer.shape, dtype=numpy.intp)
+        for start in range(0, flat_img.size, chunk_size):
+            chunk = flat_img[start:start + chunk_size]
+            steps = step_buffer[:chunk.size]
+            numpy.subtract(chunk, self.min_in, out=steps)
+            steps *= self.step_scale
+            numpy.clip(steps, 0, self.num_steps - 1, out=steps)
+            # truncating after adding 0.5 rounds to the nearest step
+            steps += 0.5
+            # NaNs are the only values fmin replaces
+            numpy.fmin(steps, self.num_steps, out=steps)
+            indexes = index_buffer[:chunk.size]
+            numpy.copyto(indexes, steps, casting="unsafe")
+            result[start:start + chunk.size] = self.table[indexes]
+        return result.reshape(numpy.shape(img))
+
+
+_quantized_lookups = {}
+
+
+def get_quantized_lookup(min_out, max_out, min_in, max_in, table_name="crefl", flip=False, offset=0,
+                         num_steps=LOOKUP_STEPS):
+    """Get the `QuantizedLookup` for these arguments, creating it the first time it is requested."""
+    key = (table_name, float(min_out), float(max_out), float(min_in), float(max_in), bool(flip), float(offset),
+           num_steps)
+    lookup = _quantized_lookups.get(key)
+    if lookup is None:
+        LOG.debug("Creating quantized lookup table for %r", key)
+        lookup = _quantized_lookups[key] = QuantizedLookup(min_out, max_out, min_in, max_in, table_name=table_name,
+                                                           num_steps=num_steps, flip=flip, offset=offset)
+    return lookup
+
+
+def quantized_lookup_scale(img, min_out, max_out, min_in, max_in, table_name="crefl", flip=False, offset=0,
+                           **kwargs):
+    """Faster version of `lookup_scale` using a cached `QuantizedLookup`.
+
+    A new array is returned instead of modifying `img`.
+    """
+    LOG.debug("Running 'quantized_lookup_scale' with LUT '%s'", table_name)
+    lookup = get_quantized_lookup(min_out, max_out, min_in, max_in, table_name=table_name, flip=flip, offset=offset)
+    return lookup(img)
+
+
 def brightness_temperature_scale(img, threshold, min_in, max_in, min_out, max_out,
                                  threshold_out=None, units="kelvin", **kwargs):
     """Brightness temperature scaling is a piecewise function with two linear sub-functions.
@@ -376,8 +456,8 @@ def palettize(img, min_out, max_out, min_in=0, max_in=1.0, colormap=None, alpha=
         xrimg.data = xrimg.data.where(good_data_mask)
         xrimg.data.attrs.pop('_FillValue', None)
         xrimg.data.attrs.pop('fill_value', None)
-        # use colormap as is
-        tmp_cmap = colormap
+        # use colormap as is (copy so setting the range doesn't change the caller's colormap)
+        tmp_cmap = copy.copy(colormap)
         # produce LA image
         xrimg = xrimg.convert(xrimg.mode + 'A')
     else:
@@ -441,6 +521,55 @@ def debug_scale(img, min_out, max_out, min_in=0, max_in=1.0, percent=0.5, **kwar
     return linear_flexible_scale(img, max_out - new_range, max_out, min_in=min_in, max_in=max_in, **kwargs)
 
 
+class RescalePlan(object):
+    """Rescaling of one kind of product resolved ahead of time.
+
+    Plans are created and cached by `Rescaler.get_rescale_plan` so the configuration only has to be searched and
+    colormaps only have to be loaded once. Applying a plan to a product writes the rescaled data directly to an
+    output array of the final data type instead of rescaling a full copy of the data and converting it afterwards.
+    """
+    def __init__(self, rescaler, rescale_options, data_type, fill_value=None, clip_zero=False,
+                 rows_per_block=RESCALE_ROWS):
+        self.rescaler = rescaler
+        self.rescale_options = rescale_options
+        self.data_type = data_type
+        self.fill_value = fill_value
+        self.clip_zero = clip_zero
+        self.rows_per_block = rows_per_block
+        self.is_blockwise = rescaler.is_blockwise(rescale_options)
+
+    def apply(self, gridded_product, output=None):
+        """Rescale the product's data and clip it to the plan's data type.
+
+        :param output: Array of the plan's data type and the data's shape to write the result to. If not provided
+                       one is created.
+        :returns: `output` or the newly created output array
+        """
+        data = gridded_product.get_data_array()
+        if not self.is_blockwise:
+            # colormaps can change the shape of the output, rescale everything at once
+            result = self.rescaler.rescale_product(gridded_product, self.data_type, fill_value=self.fill_value,
+                                                   rescale_options=self.rescale_options.copy(),
+                                                   clip_zero=self.clip_zero)
+            result = clip_to_data_type(result, self.data_type)
+            if output is None:
+                return result
+            output[:] = result
+            return output
+
+        if output is None:
+            output = numpy.empty(data.shape, dtype=self.data_type)
+        bands = [(data, output)] if data.ndim == 2 else zip(data, output)
+        for band_data, band_output in bands:
+            for row_start in range(0, band_data.shape[0], self.rows_per_block):
+                row_end = row_start + self.rows_per_block
+                block = numpy.array(band_data[row_start:row_end])
+                block = self.rescaler.rescale_block(gridded_product, block, self.rescale_options,
+                                                    fill_value=self.fill_value, clip_zero=self.clip_zero)
+                band_output[row_start:row_end] = clip_to_data_type(block, self.data_type)
+        return output
+
+
 class Rescaler(roles.INIConfigReader):
     # Fields used to match a product object to it's correct configuration
     id_fields = (
@@ -468,11 +597,18 @@ class Rescaler(roles.INIConfigReader):
         'ndvi': ndvi_scale,
         'unlinear': unlinear_scale,
         'lookup': lookup_scale,
+        'lookup_quantized': quantized_lookup_scale,
         'palettize': palettize,
         'colorize': colorize,
         'water_temp_palettize': water_temp_palettize,
         'debug': debug_scale,
     }
+    # methods where each output pixel only depends on the same input pixel
+    blockwise_methods = {
+        'linear', 'linear_basic', 'brightness_temperature', 'linear_brightness_temperature', 'sqrt',
+        'temperature_difference', 'raw', 'lst', 'ctt', 'ndvi', 'unlinear', 'lookup', 'lookup_quantized',
+        'water_temp_palettize', 'debug',
+    }
 
     def __init__(self, *rescale_configs, **kwargs):
         kwargs["section_prefix"] = kwargs.get("section_prefix", "rescale:")
@@ -484,6 +620,8 @@ class Rescaler(roles.INIConfigReader):
         kwargs["boolean_kwargs"] = self._bool_kwargs()
         LOG.debug("Loading rescale configuration files:\n\t%s", "\n\t".join(rescale_configs))
         super(Rescaler, self).__init__(*rescale_configs, **kwargs)
+        self._colormap_cache = {}
+        self._plan_cache = {}
 
     def _bool_kwargs(self):
         args = {"clip", "flip", "alpha"}
@@ -577,12 +715,9 @@ class Rescaler(roles.INIConfigReader):
         colormap = rescale_options.get('colormap')
         if colormap is not None:
             import trollimage.colormap as ticolormap
-            from polar2grid.add_colormap import load_color_table_file_to_colormap
             if isinstance(colormap, str):
-                try:
-                    colormap = load_color_table_file_to_colormap(colormap)
-                except OSError:
-                    colormap = getattr(ticolormap, colormap)
+                # copy so changing the range doesn't change the cached colormap
+                colormap = copy.copy(self._load_colormap(colormap))
             elif not isinstance(colormap, ticolormap.Colormap):
                 raise ValueError("Unknown 'colormap' type: %s", str(type(colormap)))
             if 'min_in' in rescale_options:
@@ -590,6 +725,68 @@ class Rescaler(roles.INIConfigReader):
             rescale_options['colormap'] = colormap
         return rescale_options
 
+    def _load_colormap(self, colormap_name):
+        """Load a colormap from a color table file or by its name in trollimage, only loading each one once."""
+        colormap = self._colormap_cache.get(colormap_name)
+        if colormap is None:
+            import trollimage.colormap as ticolormap
+            from polar2grid.add_colormap import load_color_table_file_to_colormap
+            try:
+                colormap = load_color_table_file_to_colormap(colormap_name)
+            except OSError:
+                colormap = copy.copy(getattr(ticolormap, colormap_name))
+            self._colormap_cache[colormap_name] = colormap
+        return colormap
+
+    def get_rescale_plan(self, gridded_product, data_type, inc_by_one=False, fill_value=None, clip_zero=False):
+        """Get a `RescalePlan` for this product, reusing the plan from a previous product with the same
+        identifying information.
+        """
+        all_meta = gridded_product["grid_definition"].copy(as_dict=True)
+        all_meta.update(**gridded_product)
+        plan_key = tuple(str(all_meta.get(k)) for k in self.id_fields if k not in ("data_type", "inc_by_one")) + \
+            (dtype_to_str(data_type), inc_by_one, str(fill_value), clip_zero)
+        plan = self._plan_cache.get(plan_key)
+        if plan is None:
+            rescale_options = self.get_rescale_options(gridded_product, data_type,
+                                                       inc_by_one=inc_by_one, fill_value=fill_value)
+            plan = self._plan_cache[plan_key] = RescalePlan(self, rescale_options, data_type,
+                                                            fill_value=fill_value, clip_zero=clip_zero)
+        else:
+            LOG.debug("Using cached rescale plan for %s", gridded_product["product_name"])
+        return plan
+
+    def is_blockwise(self, rescale_options):
+        """Can data be rescaled with these options one block at a time and get the same result.
+
+        Colormap based methods need the whole 2D image and methods that compute missing input limits from the data
+        depend on all of the data being rescaled.
+        """
+        method = rescale_options["method"]
+        if method not in self.blockwise_methods:
+            return False
+        if method in ("linear", "linear_brightness_temperature"):
+            return rescale_options.get("min_in") is not None and rescale_options.get("max_in") is not None
+        return True
+
+    def rescale_block(self, gridded_product, data, rescale_options, fill_value=None, clip_zero=False):
+        """Rescale one block of a gridded product's data in place.
+
+        The result is the same as the same region of `rescale_product` output as long as `is_blockwise` is True for
+        `rescale_options`. The options should come from `get_rescale_options` and are not modified.
+
+        :param data: Writable 2D block of the product's data in the product's data type
+        """
+        rescale_options = rescale_options.copy()
+        method = rescale_options.pop("method")
+        clip = rescale_options.pop("clip", True)
+        mask_clip = rescale_options.pop("mask_clip", None)
+        inc_by_one = rescale_options.pop("inc_by_one")
+        good_data_mask = ~mask_helper(data, gridded_product["fill_value"])
+        rescale_options['attrs'] = gridded_product
+        return self._rescale_data(method, data, good_data_mask, rescale_options, fill_value,
+                                  clip=clip, mask_clip=mask_clip, inc_by_one=inc_by_one, clip_zero=clip_zero)
+
     def rescale_product(self, gridded_product, data_type, inc_by_one=False, fill_value=None, rescale_options=None,
                         clip_zero=False):
         """Rescale a gridded product based on how the rescaler is configured.
@@ -46,6 +46,7 @@ import sys
 import logging
 import re
 from datetime import datetime
+from operator import itemgetter
 from io import StringIO
 from configparser import ConfigParser, Error as ConfigParserError
 from abc import ABCMeta, abstractmethod
@@ -57,6 +58,8 @@ except ImportError:
     from pkgutil import get_data as get_resource_string
 
 LOG = logging.getLogger(__name__)
+# characters that make an identifying field value a regular expression instead of a literal
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
 
 
 class abstractclassmethod(classmethod):
@@ -233,6 +236,55 @@ class INIConfigReader(SimpleINIConfigReader):
         # If 2 or more entries have the same number of wildcards they may not be sorted optimally
         # (i.e. specific first field highest)
         self.config.sort(key=lambda x: (x[0], next(re.finditer(r'[^\^:.*].*', x[2].pattern)).start(), x[3]))
+        self._index_config()
+
+    def _index_config(self):
+        """Index configuration sections by the values of their literal (non-wildcard, non-regex) identifying fields.
+
+        Sections are grouped by which fields are literal and then by the values of those fields. Sections with any
+        regular expression field can't be indexed and are always checked.
+        """
+        self._section_cache = {}
+        self._literal_index = {}
+        self._pattern_positions = []
+        for position, (_, _, _, section) in enumerate(self.config):
+            literal_fields = []
+            literal_values = []
+            for idx, id_field in enumerate(self.id_fields):
+                v = self.config_parser.get(section, id_field)
+                if not v or v.lower() == "none":
+                    continue
+                if self.sep_char in v or not REGEX_SPECIAL_CHARS.isdisjoint(v):
+                    self._pattern_positions.append(position)
+                    break
+                literal_fields.append(idx)
+                literal_values.append(v)
+            else:
+                field_index = self._literal_index.setdefault(tuple(literal_fields), {})
+                field_index.setdefault(tuple(literal_values), []).append(position)
+        # functions to pull the literal fields out of the identifying values
+        self._literal_getters = []
+        for literal_fields, field_index in self._literal_index.items():
+            if len(literal_fields) == 1:
+                # itemgetter returns a single item instead of a tuple
+                field_index = dict((k[0], v) for k, v in field_index.items())
+                getter = itemgetter(literal_fields[0])
+            elif literal_fields:
+                getter = itemgetter(*literal_fields)
+            else:
+                getter = lambda id_values: ()
+            self._literal_getters.append((getter, field_index))
+
+    def _candidate_positions(self, id_values, id_key):
+        """Positions in `self.config` of the sections that could match these identifying values, in order."""
+        if id_key.count(self.sep_char) != len(id_values) - 1 or "\n" in id_key:
+            # values that could line up with different fields, check everything
+            return range(len(self.config))
+        positions = list(self._pattern_positions)
+        for getter, field_index in self._literal_getters:
+            positions.extend(field_index.get(getter(id_values), ()))
+        positions.sort()
+        return positions
 
     def get_config_section(self, **kwargs):
         if len(kwargs) != len(self.id_fields):
@@ -240,13 +292,24 @@ class INIConfigReader(SimpleINIConfigReader):
             LOG.debug("Got %r; Expected %r", kwargs, self.id_fields)
             raise ValueError("Incorrect number of identifying arguments, expected %d, got %d" % (len(self.id_fields), len(kwargs)))
 
-        id_key = self.sep_char.join(str(kwargs.get(k, None)) for k in self.id_fields)
-        for num_wildcards, first_valid_idx, regex_obj, section in self.config:
+        id_values = tuple(str(kwargs.get(k, None)) for k in self.id_fields)
+        try:
+            return self._section_cache[id_values]
+        except KeyError:
+            pass
+
+        id_key = self.sep_char.join(id_values)
+        section = None
+        for position in self._candidate_positions(id_values, id_key):
+            regex_obj, candidate_section = self.config[position][2:]
             if regex_obj.match(id_key):
                 LOG.debug("Key '%s' matched config regular expression '%s'", id_key, regex_obj.pattern)
-                return section
-        LOG.debug("No match found in config for key: %s", id_key)
-        return None
+                section = candidate_section
+                break
+        else:
+            LOG.debug("No match found in config for key: %s", id_key)
+        self._section_cache[id_values] = section
+        return section
 
     def get_config_options(self, **kwargs):
         allow_default = kwargs.pop("allow_default", True)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Single file scene packages holding Polar2Grid metadata objects and their arrays.
+
+Saving a scene as JSON writes one small JSON file that refers to a separate
+flat binary file for every array. A scene package instead holds the metadata
+and every array in one file::
+
+    8 bytes   magic ``P2GPKG`` and format version
+    8 bytes   little endian offset of the metadata footer
+    ...       each array's raw bytes starting on a page boundary
+    ...       JSON metadata footer
+
+The footer is UTF-8 encoded JSON written with the same encoder as
+`BaseP2GObject.save` so it is readable without Polar2Grid. It holds the table
+of array offsets, data types, and shapes (``"arrays"``), the objects shared
+between products like swath definitions (``"objects"``), and the saved object
+itself (``"object"``). Array items are written as ``{"__array__": index}`` and
+shared objects as ``{"__object__": index}``. When a package is loaded the
+arrays are memory mapped directly from the package file so nothing is copied
+or parsed until it is used. Arrays are opened copy-on-write by default so
+in-place modifications (ex. compositors) work without changing the package.
+
+Any object is saved as a package when its filename ends with
+`PACKAGE_EXTENSION` and `BaseP2GObject.load` opens packages automatically.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import json
+import struct
+import logging
+from collections import namedtuple
+
+import numpy
+
+from polar2grid.core.containers import BaseP2GObject, BaseProduct, P2GJSONEncoder, P2GJSONDecoder
+
+LOG = logging.getLogger(__name__)
+
+PACKAGE_MAGIC = b"P2GPKG\x00\x01"
+PACKAGE_EXTENSION = ".p2g"
+# arrays start on page boundaries so they can be memory mapped efficiently
+PACKAGE_ALIGNMENT = 4096
+# bytes of each array written at a time
+WRITE_CHUNK_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct("<8sQ")
+
+ArrayReference = namedtuple("ArrayReference", ["index"])
+ObjectReference = namedtuple("ObjectReference", ["index"])
+
+
+def is_package_filename(filename):
+    return isinstance(filename, str) and filename.endswith(PACKAGE_EXTENSION)
+
+
+def is_package_file(filename):
+    """Does the file start with the scene package magic bytes."""
+    try:
+        with open(filename, "rb") as package_file:
+            return package_file.read(len(PACKAGE_MAGIC)) == PACKAGE_MAGIC
+    except (OSError, IOError):
+        return False
+
+
+def _count_objects(obj, counts):
+    counts[id(obj)] = counts.get(id(obj), 0) + 1
+    if counts[id(obj)] > 1:
+        return
+    for v in obj.values():
+        if isinstance(v, BaseP2GObject):
+            _count_objects(v, counts)
+
+
+def _package_copy(obj, arrays, objects, counts, memo):
+    """Copy of the P2G object tree with array items replaced by `ArrayReference` objects.
+
+    Objects shared between products (ex. swath definitions) are only copied once, added to `objects`, and replaced
+    by an `ObjectReference` so they and their arrays are only stored once.
+    """
+    # avoid __init__ so nothing is loaded or re-validated
+    new_obj = obj.__class__.__new__(obj.__class__)
+    new_obj.__dict__.update(obj.__getstate__())
+    new_obj.persist = True
+    for k, v in obj.items():
+        if isinstance(v, BaseP2GObject):
+            if counts[id(v)] == 1:
+                v = _package_copy(v, arrays, objects, counts, memo)
+            else:
+                if id(v) not in memo:
+                    objects.append(_package_copy(v, arrays, objects, counts, memo))
+                    memo[id(v)] = len(objects) - 1
+                v = ObjectReference(memo[id(v)])
+        elif isinstance(obj, BaseProduct) and k in obj.cleanup_kwargs and v is not None:
+            arrays.append(obj.get_data_array(k))
+            v = ArrayReference(len(arrays) - 1)
+        dict.__setitem__(new_obj, k, v)
+    return new_obj
+
+
+class PackageJSONEncoder(P2GJSONEncoder):
+    """JSON encoder for package footers writing array and shared object references as small dictionaries."""
+    def isinstance(self, obj, cls):
+        # references are namedtuples, don't let them be written as plain lists
+        if isinstance(obj, (ArrayReference, ObjectReference)):
+            return False
+        return super(PackageJSONEncoder, self).isinstance(obj, cls)
+
+    def default(self, obj):
+        if isinstance(obj, ArrayReference):
+            return {"__array__": obj.index}
+        elif isinstance(obj, ObjectReference):
+            return {"__object__": obj.index}
+        return super(PackageJSONEncoder, self).default(obj)
+
+
+def _write_array(package_file, data):
+    if data.ndim == 0 or not data.size:
+        package_file.write(numpy.ascontiguousarray(data).tobytes())
+        return
+    # write a chunk of rows at a time so memory mapped inputs aren't loaded all at once
+    rows_per_chunk = max(1, WRITE_CHUNK_BYTES // (data.nbytes // data.shape[0]))
+    for row_start in range(0, data.shape[0], rows_per_chunk):
+        package_file.write(numpy.ascontiguousarray(data[row_start:row_start + rows_per_chunk]).tobytes())
+
+
+def save_package(obj, filename):
+    """Save a P2G object (scene, product, etc.) and all of its arrays to one package file."""
+    counts = {}
+    _count_objects(obj, counts)
+    arrays = []
+    objects = []
+    package_obj = _package_copy(obj, arrays, objects, counts, {})
+    array_info = []
+    tmp_filename = filename + ".tmp"
+    try:
+        with open(tmp_filename, "wb") as package_file:
+            package_file.write(_HEADER.pack(PACKAGE_MAGIC, 0))
+            for data in arrays:
+                offset = (package_file.tell() + PACKAGE_ALIGNMENT - 1) // PACKAGE_ALIGNMENT * PACKAGE_ALIGNMENT
+                package_file.seek(offset)
+                _write_array(package_file, data)
+                array_info.append((offset, data.dtype.str, data.shape))
+            footer_offset = package_file.tell()
+            # objects are decoded in order so shared objects must come before anything referring to them
+            footer = {"arrays": array_info, "objects": objects, "object": package_obj}
+            package_file.write(json.dumps(footer, cls=PackageJSONEncoder).encode("utf-8"))
+            package_file.seek(0)
+            package_file.write(_HEADER.pack(PACKAGE_MAGIC, footer_offset))
+        os.replace(tmp_filename, filename)
+    except (OSError, IOError, TypeError, ValueError):
+        LOG.error("Could not write P2G package file: '%s'", filename)
+        if os.path.isfile(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    LOG.debug("Saved %d arrays to package '%s'", len(arrays), filename)
+
+
+def _decode(value, decoder, objects):
+    """Convert the JSON footer's dictionaries to P2G objects from the inside out like `P2GJSONDecoder` does."""
+    if isinstance(value, list):
+        return [_decode(v, decoder, objects) for v in value]
+    elif not isinstance(value, dict):
+        return value
+
+    value = dict((k, _decode(v, decoder, objects)) for k, v in value.items())
+    if "__array__" in value:
+        return ArrayReference(value["__array__"])
+    elif "__object__" in value:
+        return objects[value["__object__"]]
+    class_name = value.get("__class__", "BaseP2GObject")
+    cls = decoder._jsonclass_to_pyclass(class_name)
+    if not isinstance(cls, type) or not issubclass(cls, BaseP2GObject):
+        raise ValueError("Package object is not a P2G object: %s" % (class_name,))
+    return decoder.dict_to_object(value)
+
+
+def _resolve_arrays(obj, arrays, seen):
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    for k, v in obj.items():
+        if isinstance(v, BaseP2GObject):
+            _resolve_arrays(v, arrays, seen)
+        elif isinstance(v, ArrayReference):
+            dict.__setitem__(obj, k, arrays[v.index])
+
+
+def load_package(filename, mode="c"):
+    """Load the P2G object saved in a package file with its arrays memory mapped from the package.
+
+    :param mode: Memory map mode for the arrays, copy-on-write ("c") by default so changes aren't written back
+    """
+    with open(filename, "rb") as package_file:
+        magic, footer_offset = _HEADER.unpack(package_file.read(_HEADER.size))
+        if magic != PACKAGE_MAGIC:
+            raise ValueError("Not a P2G package file: '%s'" % (filename,))
+        package_file.seek(footer_offset)
+        footer = json.loads(package_file.read().decode("utf-8"))
+
+    arrays = []
+    for offset, dtype, shape in footer["arrays"]:
+        if int(numpy.prod(shape)) == 0:
+            arrays.append(numpy.empty(shape, dtype=dtype))
+            continue
+        arrays.append(numpy.memmap(filename, dtype=dtype, mode=mode, offset=offset, shape=tuple(shape)))
+    decoder = P2GJSONDecoder()
+    objects = []
+    for shared_obj in footer["objects"]:
+        objects.append(_decode(shared_obj, decoder, objects))
+    obj = _decode(footer["object"], decoder, objects)
+    _resolve_arrays(obj, arrays, set())
+    LOG.debug("Loaded %d arrays from package '%s'", len(arrays), filename)
+    return obj
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the configuration readers.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+from io import StringIO
+
+import numpy
+import pytest
+
+from polar2grid.core import roles
+from polar2grid.core.rescale import Rescaler, DEFAULT_RCONFIG
+
+LOG = logging.getLogger(__name__)
+
+
+def _scan_config_section(config_reader, **kwargs):
+    """Original linear regular expression scan of `INIConfigReader.get_config_section` used as a reference."""
+    id_key = config_reader.sep_char.join(str(kwargs.get(k, None)) for k in config_reader.id_fields)
+    for num_wildcards, first_valid_idx, regex_obj, section in config_reader.config:
+        if regex_obj.match(id_key):
+            return section
+    return None
+
+
+def _field_values(config_reader):
+    """Values seen for each identifying field in the configuration plus some that aren't configured."""
+    field_values = {k: {"None", "unknown"} for k in config_reader.id_fields}
+    for section in config_reader.config_parser.sections():
+        for k in config_reader.id_fields:
+            v = config_reader.config_parser.get(section, k)
+            if v and v.lower() != "none":
+                field_values[k].add(v)
+    return {k: sorted(v) for k, v in field_values.items()}
+
+
+def _random_id_kwargs(config_reader, num_keys, seed=0):
+    rng = numpy.random.RandomState(seed)
+    field_values = _field_values(config_reader)
+    all_kwargs = []
+    # every configured section with its wildcards filled in
+    for section in config_reader.config_parser.sections():
+        kwargs = {}
+        for k in config_reader.id_fields:
+            v = config_reader.config_parser.get(section, k)
+            kwargs[k] = v if v and v.lower() != "none" else field_values[k][rng.randint(len(field_values[k]))]
+        all_kwargs.append(kwargs)
+    # random combinations of configured values
+    for _ in range(num_keys):
+        all_kwargs.append({k: v[rng.randint(len(v))] for k, v in field_values.items()})
+    return all_kwargs
+
+
+class _TestConfigReader(roles.INIConfigReader):
+    id_fields = ("product_name", "data_kind", "satellite")
+
+
+TEST_CONFIG = """
+[test:a]
+product_name=i01
+data_kind=reflectance
+satellite=
+method=literal
+[test:b]
+product_name=i0[1-5]
+data_kind=
+satellite=
+method=pattern
+[test:c]
+product_name=
+data_kind=reflectance
+satellite=npp
+method=kind_sat
+[test:d]
+product_name=
+data_kind=btemp
+satellite=
+method=kind
+[test:e]
+product_name=.*_dnb
+data_kind=.*
+satellite=n.*
+method=pattern_all
+"""
+
+
+class TestINIConfigReader(object):
+    def test_matches_scan_rescale_ini(self):
+        reader = Rescaler(DEFAULT_RCONFIG)
+        for kwargs in _random_id_kwargs(reader, 2000):
+            assert reader.get_config_section(**kwargs) == _scan_config_section(reader, **kwargs)
+            # cached result
+            assert reader.get_config_section(**kwargs) == _scan_config_section(reader, **kwargs)
+
+    @pytest.mark.parametrize("kwargs", [
+        dict(product_name="i01", data_kind="reflectance", satellite="npp"),
+        dict(product_name="i02", data_kind="reflectance", satellite="npp"),
+        dict(product_name="m01", data_kind="reflectance", satellite="npp"),
+        dict(product_name="m01", data_kind="reflectance", satellite="noaa20"),
+        dict(product_name="i04", data_kind="btemp", satellite="npp"),
+        dict(product_name="adaptive_dnb", data_kind="radiance", satellite="npp"),
+        dict(product_name="adaptive_dnb", data_kind="radiance", satellite="aqua"),
+        dict(product_name="i01:reflectance", data_kind="npp", satellite=None),
+        dict(product_name=None, data_kind=None, satellite=None),
+    ])
+    def test_matches_scan_patterns(self, kwargs):
+        reader = _TestConfigReader(StringIO(TEST_CONFIG), section_prefix="test:")
+        assert reader.get_config_section(**kwargs) == _scan_config_section(reader, **kwargs)
+
+    @pytest.mark.benchmark
+    def test_benchmark_rescale_ini(self):
+        reader = Rescaler(DEFAULT_RCONFIG)
+        all_kwargs = _random_id_kwargs(reader, 500, seed=1)
+        start = time.perf_counter()
+        expected = [_scan_config_section(reader, **kwargs) for kwargs in all_kwargs]
+        scan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = [reader.get_config_section(**kwargs) for kwargs in all_kwargs]
+        indexed_time = time.perf_counter() - start
+        start = time.perf_counter()
+        cached = [reader.get_config_section(**kwargs) for kwargs in all_kwargs]
+        cached_time = time.perf_counter() - start
+        LOG.info("%d rescale.ini lookups over %d sections: scan %.4fs, indexed %.4fs, cached %.4fs",
+                 len(all_kwargs), len(reader.config), scan_time, indexed_time, cached_time)
+        assert indexed == expected
+        assert cached == expected
@@ -41,6 +41,7 @@ import numpy as np
 from pyresample.geometry import DynamicAreaDefinition, AreaDefinition
 from pyproj import Proj
 from polar2grid.writers import geotiff, scmi
+from polar2grid.core.profiling import PipelineProfiler
 
 try:
     from pyproj import CRS
@@ -134,17 +135,27 @@ def get_input_files(input_filenames):
             yield fn
 
 
-def write_scene(scn, writers, writer_args, datasets, to_save=None):
+def write_scene(scn, writers, writer_args, datasets, to_save=None, profiler=None, area_name=None):
+    """Create the delayed results of saving `datasets` with every writer and add them to `to_save`.
+
+    If a `profiler` is provided the results are registered with it as "<writer>:<area_name>" so the tasks computing
+    them are attributed to that writer and area.
+    """
     if to_save is None:
         to_save = []
     if not datasets:
         # no datasets to save
         return to_save
+    if profiler is None:
+        profiler = PipelineProfiler(enabled=False)
 
     for writer_name in writers:
         wargs = writer_args[writer_name]
 
-        res = scn.save_datasets(writer=writer_name, compute=False, datasets=datasets, **wargs)
+        label = writer_name if area_name is None else "{}:{}".format(writer_name, area_name)
+        with profiler.stage("save_datasets:{}".format(label)):
+            res = scn.save_datasets(writer=writer_name, compute=False, datasets=datasets, **wargs)
+        profiler.add_outputs(label, res)
         if isinstance(res, (tuple, list)):
             to_save.extend(zip(*res))
         else:
@@ -211,12 +222,7 @@ def add_resample_argument_groups(parser):
 
 def main(argv=sys.argv[1:]):
     global LOG
-    from satpy import Scene
-    from satpy.resample import get_area_def
-    from satpy.writers import compute_writer_results
-    from dask.diagnostics import ProgressBar
-    from polar2grid.core.script_utils import (
-        setup_logging, rename_log_file, create_exc_handler)
+    from polar2grid.core.script_utils import setup_logging, create_exc_handler
     import argparse
     prog = os.getenv('PROG_NAME', sys.argv[0])
     # "usage: " will be printed at the top of this:
@@ -240,6 +246,9 @@ basic processing with limited products:
                         help="show processing progress bar (not recommended for logged output)")
     parser.add_argument('--num-workers', type=int, default=os.getenv('DASK_NUM_WORKERS', 4),
                         help="specify number of worker threads to use (default: 4)")
+    parser.add_argument('--profile-report', default=os.getenv('P2G_PROFILE_REPORT'),
+                        help="write wall time, CPU time, memory usage, and dask task timing for each "
+                             "processing stage to this JSON file")
     parser.add_argument('--match-resolution', dest='preserve_resolution', action='store_false',
                         help="When using the 'native' resampler for composites, don't save data "
                              "at its native resolution, use the resolution used to create the "
@@ -316,12 +325,35 @@ basic processing with limited products:
         from multiprocessing.pool import ThreadPool
         dask.config.set(pool=ThreadPool(args.num_workers))
 
+    profiler = PipelineProfiler(enabled=bool(args.profile_report))
+    profiler.start()
+    # write the profiling report no matter how processing ends
+    try:
+        return _run(args, profiler, scene_args, load_args, resample_args, writer_args, rename_log, glue_name)
+    finally:
+        profiler.stop()
+        if args.profile_report:
+            profiler.write_report(args.profile_report)
+
+
+def _run(args, profiler, scene_args, load_args, resample_args, writer_args, rename_log, glue_name):
+    """Create, resample, and save the Scene described by the parsed command line arguments.
+
+    :returns: Exit status for `main`
+    """
+    from satpy import Scene
+    from satpy.resample import get_area_def
+    from satpy.writers import compute_writer_results
+    from dask.diagnostics import ProgressBar
+    from polar2grid.core.script_utils import rename_log_file
+
     # Parse provided files and search for files if provided directories
     scene_args['filenames'] = get_input_files(scene_args['filenames'])
     # Create a Scene, analyze the provided files
     LOG.info("Sorting and reading input files...")
     try:
-        scn = Scene(**scene_args)
+        with profiler.stage("scene_creation"):
+            scn = Scene(**scene_args)
     except ValueError as e:
         LOG.error("{} | Enable debug message (-vvv) or see log file for details.".format(str(e)))
         LOG.debug("Further error information: ", exc_info=True)
@@ -350,7 +382,8 @@ basic processing with limited products:
             return -1
 
     LOG.info("Loading product metadata from files...")
-    scn.load(load_args['products'])
+    with profiler.stage("load"):
+        scn.load(load_args['products'])
 
     resample_kwargs = resample_args.copy()
     areas_to_resample = resample_kwargs.pop('grids')
@@ -384,7 +417,8 @@ basic processing with limited products:
 
     ll_bbox = resample_kwargs.pop('ll_bbox')
     if ll_bbox:
-        scn = scn.crop(ll_bbox=ll_bbox)
+        with profiler.stage("crop"):
+            scn = scn.crop(ll_bbox=ll_bbox)
 
     wishlist = scn.wishlist.copy()
     preserve_resolution = get_preserve_resolution(args, resampler, areas_to_resample)
@@ -393,7 +427,8 @@ basic processing with limited products:
         resampled_products = set(wishlist) - preserved_products
 
         # original native scene
-        to_save = write_scene(scn, args.writers, writer_args, preserved_products)
+        to_save = write_scene(scn, args.writers, writer_args, preserved_products, profiler=profiler,
+                              area_name="native")
     else:
         preserved_products = set()
         resampled_products = set(wishlist)
@@ -428,7 +463,8 @@ basic processing with limited products:
 
         if area_def is not None:
             LOG.info("Resampling data to '%s'", area_name)
-            new_scn = scn.resample(area_def, resampler=rs, **resample_kwargs)
+            with profiler.stage("resample:{}".format(area_name)):
+                new_scn = scn.resample(area_def, resampler=rs, **resample_kwargs)
         elif not preserve_resolution:
             # the user didn't want to resample to any areas
             # the user also requested that we don't preserve resolution
@@ -436,14 +472,16 @@ basic processing with limited products:
             # because they won't be saved
             new_scn = scn
 
-        to_save = write_scene(new_scn, args.writers, writer_args, resampled_products, to_save=to_save)
+        to_save = write_scene(new_scn, args.writers, writer_args, resampled_products, to_save=to_save,
+                              profiler=profiler, area_name=area_name)
 
     if args.progress:
         pbar = ProgressBar()
         pbar.register()
 
     LOG.info("Computing products and saving data to writers...")
-    compute_writer_results(to_save)
+    with profiler.stage("compute"):
+        compute_writer_results(to_save)
     LOG.info("SUCCESS")
     return 0
 
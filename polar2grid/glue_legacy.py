@@ -103,12 +103,14 @@ def get_backend_class(backends, name, entry_point=P2G_BACKEND_CLS_EP):
 
 def main_frontend(argv=sys.argv[1:]):
     from polar2grid.core.script_utils import setup_logging, create_basic_parser, create_exc_handler, ExtendAction
+    from polar2grid.core.scene_package import is_package_filename
     frontends = available_frontends()
     parser = create_basic_parser(description="Extract swath data using the generic Polar2Grid frontend command line arguments (see specific frontend for other features)")
     parser.add_argument("frontend", choices=sorted(frontends.keys()),
                         help="Specify the swath extractor to use to read data (additional arguments are determined after this is specified)")
     parser.add_argument('-o', dest="output_filename", default=None,
-                        help="Output filename for JSON scene (default is to stdout)")
+                        help="Output filename for JSON scene (default is to stdout). Filenames ending in '.p2g' "
+                             "create a single file scene package holding the metadata and all arrays")
     parser.add_argument('-f', dest='data_files', nargs="+", default=[], action=ExtendAction,
                         help="List of files or directories to extract data from")
     global_keywords = ("keep_intermediate", "overwrite_existing", "exit_on_error")
@@ -139,6 +141,9 @@ def main_frontend(argv=sys.argv[1:]):
         return 0
 
     scene = f.create_scene(**args.subgroup_args["Frontend Swath Extraction"])
+    if is_package_filename(args.output_filename):
+        scene.save(args.output_filename)
+        return 0
     json_str = scene.dumps(persist=True)
     if args.output_filename:
         with open(args.output_filename, 'w') as output_file:
@@ -155,7 +160,7 @@ def main_backend(argv=sys.argv[1:]):
     parser = create_basic_parser(description="Create image/output file from provided gridded scene using a typical Polar2Grid backend (see specific backend for other features)")
     parser.add_argument("backend", choices=sorted(backends.keys()),
                         help="Specify the output generator to use (additional arguments are determined after this is specified)")
-    parser.add_argument("--scene", required=True, help="JSON GriddedScene filename")
+    parser.add_argument("--scene", required=True, help="JSON or scene package (.p2g) GriddedScene filename")
     parser.add_argument('-o', dest="output_filename", default=None,
                         help="Output filename for JSON scene (default is to stdout)")
     parser.add_argument('-f', dest='data_files', nargs="+", default=[], action=ExtendAction,
@@ -338,7 +343,7 @@ def main(argv=sys.argv[1:]):
             raise RuntimeError("Resampling method '{}' only supports 'satpy' readers".format(resample_method))
         elif not is_satpy_resample_method and isinstance(scene, Scene):
             # convert satpy scene to P2G Scene to be compatible with old P2G resamplers
-            scene = convert_satpy_to_p2g_swath(f, scene)
+            scene = convert_satpy_to_p2g_swath(f, scene, lazy=remapper.lazy_remap)
 
         if isinstance(scene, Scene):
             if not scene.datasets:
@@ -437,10 +442,14 @@ def main(argv=sys.argv[1:]):
                 g = gridded_scene.pop(v[1])
                 b = gridded_scene.pop(v[2])
                 new_info = r.copy()
-                new_info["grid_data"] = new_info["grid_data"].replace(v[0], rgb_name)
                 new_info["product_name"] = rgb_name
-                data = np.memmap(new_info["grid_data"], dtype=new_info["data_type"],
-                                 mode="w+", shape=(3, new_info["grid_definition"]["height"], new_info["grid_definition"]["width"]))
+                rgb_shape = (3, new_info["grid_definition"]["height"], new_info["grid_definition"]["width"])
+                if isinstance(new_info["grid_data"], str):
+                    new_info["grid_data"] = new_info["grid_data"].replace(v[0], rgb_name)
+                    data = np.memmap(new_info["grid_data"], dtype=new_info["data_type"], mode="w+", shape=rgb_shape)
+                else:
+                    # lazy remapping keeps data in memory
+                    data = new_info["grid_data"] = np.empty(rgb_shape, dtype=new_info["data_type"])
                 data[0] = r.get_data_array()[:]
                 data[1] = g.get_data_array()[:]
                 data[2] = b.get_data_array()[:]
@@ -453,7 +462,10 @@ def main(argv=sys.argv[1:]):
                 tmp_scene = Scene()
                 for k, v in gridded_scene.items():
                     ds_id = DatasetID.from_dict(v)
-                    dask_arr = da.from_array(v.get_data_array(), chunks=CHUNK_SIZE)
+                    if isinstance(v["grid_data"], da.Array):
+                        dask_arr = v["grid_data"]
+                    else:
+                        dask_arr = da.from_array(v.get_data_array(), chunks=CHUNK_SIZE)
                     tmp_scene[ds_id] = DataArray(dask_arr, attrs=v)
                     tmp_scene[ds_id].attrs["area"] = this_grid_definition.to_satpy_area()
                     if isinstance(v, set):
@@ -51,6 +51,8 @@ LOG = logging.getLogger(__name__)
 gtiff_driver = gdal.GetDriverByName("GTIFF")
 
 DEFAULT_OUTPUT_PATTERN = "{satellite}_{instrument}_{product_name}_{begin_time}_{grid_name}.tif"
+# default minimum number of rows rescaled and written at a time when streaming blocks to the geotiff
+STREAM_MIN_ROWS = 256
 
 
 def _proj4_to_srs(proj4_str):
@@ -75,6 +77,53 @@ def _proj4_to_srs(proj4_str):
     return srs
 
 
+def _create_gtiff_dataset(output_filename, width, height, num_bands, proj4_str, geotransform, etype=gdal.GDT_UInt16,
+                          compress=None, tiled=False, blockxsize=None, blockysize=None):
+    options = []
+    if compress is not None and compress != "NONE":
+        options.append("COMPRESS=%s" % (compress,))
+    if tiled:
+        options.append("TILED=YES")
+    if blockxsize is not None:
+        options.append("BLOCKXSIZE=%d" % (blockxsize,))
+    if blockysize is not None:
+        options.append("BLOCKYSIZE=%d" % (blockysize,))
+
+    # Creating the file will truncate any pre-existing file
+    LOG.debug("Creation Geotiff with options %r", options)
+    gtiff = gtiff_driver.Create(output_filename, width, height, bands=num_bands, eType=etype, options=options)
+
+    gtiff.SetGeoTransform(geotransform)
+    srs = _proj4_to_srs(proj4_str)
+    gtiff.SetProjection(srs.ExportToWkt())
+    return gtiff
+
+
+def _clip_band_data(band_data, etype):
+    # Clip data to datatype, otherwise let it go and see what happens
+    # XXX: This might need to operate on colors as a whole or
+    # do a linear scaling. No one should be scaling data to outside these
+    # ranges anyway
+    if etype == gdal.GDT_UInt16:
+        band_data = clip_to_data_type(band_data, np.uint16)
+    elif etype == gdal.GDT_Byte:
+        band_data = clip_to_data_type(band_data, np.uint8)
+    return band_data
+
+
+def _finish_geotiff(gtiff, output_filename, colormap=None, quicklook=False):
+    if colormap is not None:
+        LOG.debug("Adding colormap as Geotiff ColorTable")
+        from polar2grid.add_colormap import create_colortable, add_colortable
+        ct = create_colortable(colormap)
+        add_colortable(gtiff, ct)
+
+    if quicklook:
+        png_filename = output_filename.replace(os.path.splitext(output_filename)[1], ".png")
+        png_driver = gdal.GetDriverByName("PNG")
+        png_driver.CreateCopy(png_filename, gtiff)
+
+
 def create_geotiff(data, output_filename, proj4_str, geotransform, etype=gdal.GDT_UInt16, compress=None,
                    quicklook=False, tiled=False, blockxsize=None, blockysize=None, colormap=None,
                    fill_value=None, **kwargs):
@@ -97,28 +146,13 @@ def create_geotiff(data, output_filename, proj4_str, geotransform, etype=gdal.GD
         LOG.error(msg)
         raise ValueError(msg)
 
-    options = []
-    if compress is not None and compress != "NONE":
-        options.append("COMPRESS=%s" % (compress,))
-    if tiled:
-        options.append("TILED=YES")
-    if blockxsize is not None:
-        options.append("BLOCKXSIZE=%d" % (blockxsize,))
-    if blockysize is not None:
-        options.append("BLOCKYSIZE=%d" % (blockysize,))
-
-    # Creating the file will truncate any pre-existing file
-    LOG.debug("Creation Geotiff with options %r", options)
     if num_bands == 1 and data.ndim == 2:
-        gtiff = gtiff_driver.Create(output_filename, data.shape[1], data.shape[0],
-                                    bands=num_bands, eType=etype, options=options)
+        height, width = data.shape
     else:
-        gtiff = gtiff_driver.Create(output_filename, data[0].shape[1], data[0].shape[0],
-                                    bands=num_bands, eType=etype, options=options)
-
-    gtiff.SetGeoTransform(geotransform)
-    srs = _proj4_to_srs(proj4_str)
-    gtiff.SetProjection(srs.ExportToWkt())
+        height, width = data[0].shape
+    gtiff = _create_gtiff_dataset(output_filename, width, height, num_bands, proj4_str, geotransform,
+                                  etype=etype, compress=compress, tiled=tiled,
+                                  blockxsize=blockxsize, blockysize=blockysize)
 
     for idx in range(num_bands):
         gtiff_band = gtiff.GetRasterBand(idx + 1)
@@ -131,14 +165,7 @@ def create_geotiff(data, output_filename, proj4_str, geotransform, etype=gdal.GD
         else:
             band_data = data[idx]
 
-        # Clip data to datatype, otherwise let it go and see what happens
-        # XXX: This might need to operate on colors as a whole or
-        # do a linear scaling. No one should be scaling data to outside these
-        # ranges anyway
-        if etype == gdal.GDT_UInt16:
-            band_data = clip_to_data_type(band_data, np.uint16)
-        elif etype == gdal.GDT_Byte:
-            band_data = clip_to_data_type(band_data, np.uint8)
+        band_data = _clip_band_data(band_data, etype)
         if log_level <= logging.DEBUG:
             LOG.debug("Data min: %f, max: %f" % (band_data.min(), band_data.max()))
 
@@ -147,16 +174,61 @@ def create_geotiff(data, output_filename, proj4_str, geotransform, etype=gdal.GD
             LOG.error("Could not write band 1 data to geotiff '%s'" % (output_filename,))
             raise ValueError("Could not write band 1 data to geotiff '%s'" % (output_filename,))
 
-    if colormap is not None:
-        LOG.debug("Adding colormap as Geotiff ColorTable")
-        from polar2grid.add_colormap import create_colortable, add_colortable
-        ct = create_colortable(colormap)
-        add_colortable(gtiff, ct)
+    _finish_geotiff(gtiff, output_filename, colormap=colormap, quicklook=quicklook)
 
-    if quicklook:
-        png_filename = output_filename.replace(os.path.splitext(output_filename)[1], ".png")
-        png_driver = gdal.GetDriverByName("PNG")
-        png_driver.CreateCopy(png_filename, gtiff)
+    # Garbage collection/destructor should close the file properly
+    return gtiff
+
+
+def create_geotiff_from_blocks(get_block, num_bands, height, width, output_filename, proj4_str, geotransform,
+                               etype=gdal.GDT_UInt16, compress=None, quicklook=False, tiled=False,
+                               blockxsize=None, blockysize=None, colormap=None, fill_value=None,
+                               min_block_rows=STREAM_MIN_ROWS, **kwargs):
+    """Create a geotiff by writing one row of GDAL blocks (tiles or strips) at a time.
+
+    Only one group of block rows for one band is in memory at a time so memory usage does not depend on the
+    height of the image. The number of rows written at a time is the GDAL block height (`blockysize` for tiled
+    geotiffs) or a multiple of it so at least `min_block_rows` rows are written at a time.
+
+    :param get_block: Function called as ``get_block(band_idx, row_start, row_end)`` returning a writable
+                      ``(row_end - row_start, width)`` array of data for that band
+    """
+    log_level = logging.getLogger('').handlers[0].level or 0
+    LOG.info("Creating geotiff '%s'" % (output_filename,))
+    if num_bands not in [1, 2, 3, 4]:
+        msg = "Geotiff backend doesn't know how to handle %d bands" % (num_bands,)
+        LOG.error(msg)
+        raise ValueError(msg)
+
+    gtiff = _create_gtiff_dataset(output_filename, width, height, num_bands, proj4_str, geotransform,
+                                  etype=etype, compress=compress, tiled=tiled,
+                                  blockxsize=blockxsize, blockysize=blockysize)
+
+    for idx in range(num_bands):
+        gtiff_band = gtiff.GetRasterBand(idx + 1)
+        if num_bands == 1 and fill_value is not None:
+            LOG.debug("Setting geotiff nodata value: {}".format(fill_value))
+            gtiff_band.SetNoDataValue(fill_value)
+
+        block_rows = gtiff_band.GetBlockSize()[1]
+        rows_per_write = block_rows * max(1, -(-min_block_rows // block_rows))
+        LOG.debug("Writing band %d in blocks of %d rows", idx + 1, rows_per_write)
+        data_min = np.inf
+        data_max = -np.inf
+        for row_start in range(0, height, rows_per_write):
+            row_end = min(row_start + rows_per_write, height)
+            band_data = _clip_band_data(get_block(idx, row_start, row_end), etype)
+            if log_level <= logging.DEBUG:
+                data_min = min(data_min, band_data.min())
+                data_max = max(data_max, band_data.max())
+
+            if gtiff_band.WriteArray(band_data, 0, row_start) != 0:
+                LOG.error("Could not write band %d data to geotiff '%s'" % (idx + 1, output_filename))
+                raise ValueError("Could not write band %d data to geotiff '%s'" % (idx + 1, output_filename))
+        if log_level <= logging.DEBUG:
+            LOG.debug("Data min: %f, max: %f" % (data_min, data_max))
+
+    _finish_geotiff(gtiff, output_filename, colormap=colormap, quicklook=quicklook)
 
     # Garbage collection/destructor should close the file properly
     return gtiff
@@ -182,7 +254,7 @@ class Backend(roles.BackendRole):
 
     def create_output_from_product(self, gridded_product, output_pattern=None,
                                    data_type=None, inc_by_one=None, fill_value=0,
-                                   tiled=False, blockxsize=None, blockysize=None, **kwargs):
+                                   tiled=False, blockxsize=None, blockysize=None, stream_blocks=True, **kwargs):
         data_type = data_type or np.uint8
         etype = np2etype[data_type]
         inc_by_one = inc_by_one or False
@@ -209,25 +281,39 @@ class Backend(roles.BackendRole):
                 LOG.warning("Geotiff file already exists, will overwrite: %s", output_filename)
 
         try:
-            if np.issubdtype(data_type, np.floating):
+            is_float = np.issubdtype(data_type, np.floating)
+            if is_float:
                 # assume they don't want to scale floating point
-                data = gridded_product.get_data_array()
                 rescale_options = {}
             else:
                 LOG.debug("Scaling %s data to fit in geotiff...", gridded_product["product_name"])
-                rescale_options = self.rescaler.get_rescale_options(gridded_product,
-                                                                    data_type,
-                                                                    inc_by_one=inc_by_one,
-                                                                    fill_value=fill_value)
-                data = self.rescaler.rescale_product(gridded_product, data_type, rescale_options=rescale_options.copy())
+                rescale_plan = self.rescaler.get_rescale_plan(gridded_product,
+                                                              data_type,
+                                                              inc_by_one=inc_by_one,
+                                                              fill_value=fill_value)
+                rescale_options = rescale_plan.rescale_options
 
             # Create the geotiff
             # X and Y rotation are 0 in most cases so we just hard-code it
             geotransform = gridded_product["grid_definition"].gdal_geotransform
             colormap = rescale_options.get('colormap') if rescale_options.get('method') != 'colorize' else None
-            gtiff = create_geotiff(data, output_filename, grid_def["proj4_definition"], geotransform,
-                                   etype=etype, tiled=tiled, blockxsize=blockxsize, blockysize=blockysize,
-                                   colormap=colormap, fill_value=fill_value, **kwargs)
+            gtiff_kwargs = dict(etype=etype, tiled=tiled, blockxsize=blockxsize, blockysize=blockysize,
+                                colormap=colormap, fill_value=fill_value, **kwargs)
+            data = gridded_product.get_data_array()
+            can_stream = is_float or (self.rescaler.is_blockwise(rescale_options) and
+                                      (data.ndim == 2 or rescale_options.get("separate_rgb", True)))
+            if stream_blocks and can_stream:
+                get_block = self._get_block_func(gridded_product, data, None if is_float else rescale_options)
+                num_bands = 1 if data.ndim == 2 else data.shape[0]
+                gtiff = create_geotiff_from_blocks(get_block, num_bands, data.shape[-2], data.shape[-1],
+                                                   output_filename, grid_def["proj4_definition"], geotransform,
+                                                   **gtiff_kwargs)
+            else:
+                if not is_float:
+                    data = self.rescaler.rescale_product(gridded_product, data_type,
+                                                         rescale_options=rescale_options.copy())
+                gtiff = create_geotiff(data, output_filename, grid_def["proj4_definition"], geotransform,
+                                       **gtiff_kwargs)
 
             if rescale_options.get("method") in ["linear", "palettize", "colorize"] and "min_in" in rescale_options and "max_in" in rescale_options:
                 LOG.debug("Setting geotiff metadata for linear min/max values")
@@ -240,6 +326,18 @@ class Backend(roles.BackendRole):
 
         return output_filename
 
+    def _get_block_func(self, gridded_product, data, rescale_options=None):
+        """Get a function returning a rescaled copy of one block of rows from a band of `data`.
+
+        If `rescale_options` is None the data is copied as is.
+        """
+        def get_block(band_idx, row_start, row_end):
+            block = np.array(data[row_start:row_end] if data.ndim == 2 else data[band_idx, row_start:row_end])
+            if rescale_options is None:
+                return block
+            return self.rescaler.rescale_block(gridded_product, block, rescale_options)
+        return get_block
+
 
 def add_backend_argument_groups(parser):
     from polar2grid.writers.geotiff import NumpyDtypeList, NUMPY_DTYPE_STRS
@@ -266,6 +364,9 @@ def add_backend_argument_groups(parser):
                        help="Set tile block X size")
     group.add_argument('--blockysize', default=None, type=int,
                        help="Set tile block Y size")
+    group.add_argument('--no-stream-blocks', dest='stream_blocks', action='store_false',
+                       help="Rescale and write the entire image at once instead of one row of blocks at a time. "
+                            "Streaming is only used when the rescaling method supports it.")
     return ["Backend Initialization", "Backend Output Creation"]
 
 
@@ -171,7 +171,9 @@ As an example, the ATMS band options are:
 __docformat__ = "restructuredtext en"
 
 import sys
+import hashlib
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from netCDF4 import Dataset
 
 import logging
@@ -262,18 +264,25 @@ FILE_STRUCTURE = {
 
 LIMB_SEA_FILE = os.environ.get("ATMS_LIMB_SEA", "polar2grid.mirs:limball_atmssea.txt")
 LIMB_LAND_FILE = os.environ.get("ATMS_LIMB_LAND", "polar2grid.mirs:limball_atmsland.txt")
+# directory to cache parsed coefficient files in so they are only parsed once, not cached if empty (default)
+LIMB_CACHE_DIR = os.environ.get("P2G_ATMS_LIMB_CACHE_DIR", "")
+LIMB_COEFF_NAMES = ("dmean", "coeffs", "amean", "nchx", "nchanx")
 
 
-def read_atms_limb_correction_coefficients(fn):
+def _read_limb_coefficient_file(fn):
     if os.path.isfile(fn):
-        coeff_str = open(fn, "r").readlines()
-    else:
-        parts = fn.split(":")
-        mod_part, file_part = parts if len(parts) == 2 else ("", parts[0])
-        mod_part = mod_part or __package__  # self.__module__
-        coeff_str = get_resource_string(mod_part, file_part).decode().split("\n")
+        with open(fn, "rb") as coeff_file:
+            return coeff_file.read()
+    parts = fn.split(":")
+    mod_part, file_part = parts if len(parts) == 2 else ("", parts[0])
+    mod_part = mod_part or __package__  # self.__module__
+    return get_resource_string(mod_part, file_part)
+
+
+def parse_atms_limb_correction_coefficients(coeff_str):
+    """Parse the text of a limball_atms*.txt coefficient file."""
     # make it a generator
-    coeff_str = (line.strip() for line in coeff_str)
+    coeff_str = (line.strip() for line in coeff_str.split("\n"))
 
     all_coeffs = np.zeros((22, 96, 22), dtype=np.float32)
     all_amean = np.zeros((22, 96, 22), dtype=np.float32)
@@ -312,23 +321,86 @@ def read_atms_limb_correction_coefficients(fn):
     return all_dmean, all_coeffs, all_amean, all_nchx, all_nchanx
 
 
-def apply_atms_limb_correction(datasets, dmean, coeffs, amean, nchx, nchanx):
-    all_new_ds = []
-    coeff_sum = np.zeros(datasets.shape[1], dtype=datasets[0].dtype)
-    for channel_idx in range(datasets.shape[0]):
-        ds = datasets[channel_idx]
-        new_ds = ds.copy()
-        all_new_ds.append(new_ds)
-        for fov_idx in range(96):
-            coeff_sum[:] = 0
-            for k in range(nchx[channel_idx]):
-                coef = coeffs[channel_idx, fov_idx, nchanx[channel_idx, k]] * (
-                    datasets[nchanx[channel_idx, k], :, fov_idx] -
-                    amean[nchanx[channel_idx, k], fov_idx, channel_idx])
-                coeff_sum += coef
-            new_ds[:, fov_idx] = coeff_sum + dmean[channel_idx]
+_limb_coefficients = {}
+
+
+def read_atms_limb_correction_coefficients(fn):
+    """Read a limb correction coefficient file, caching the parsed tables.
 
-    return all_new_ds
+    Parsed tables are kept in memory for the rest of the process. If `LIMB_CACHE_DIR` is set they are also saved
+    there as a numpy ``.npz`` file (keyed by a hash of the text) so the text only has to be parsed once.
+    """
+    coeff_bytes = _read_limb_coefficient_file(fn)
+    key = hashlib.sha1(coeff_bytes).hexdigest()
+    if key in _limb_coefficients:
+        return _limb_coefficients[key]
+
+    cache_fn = os.path.join(LIMB_CACHE_DIR, "atms_limb_{}.npz".format(key)) if LIMB_CACHE_DIR else None
+    try:
+        with np.load(cache_fn) as cache_file:
+            coeff_results = tuple(cache_file[k] for k in LIMB_COEFF_NAMES)
+        LOG.debug("Loaded cached limb correction coefficients for '%s'", fn)
+    except (TypeError, OSError, IOError, KeyError, ValueError):
+        coeff_results = parse_atms_limb_correction_coefficients(coeff_bytes.decode())
+        if cache_fn is not None:
+            try:
+                if not os.path.isdir(LIMB_CACHE_DIR):
+                    os.makedirs(LIMB_CACHE_DIR)
+                tmp_fn = cache_fn + ".{}.tmp.npz".format(os.getpid())
+                np.savez(tmp_fn, **dict(zip(LIMB_COEFF_NAMES, coeff_results)))
+                os.replace(tmp_fn, cache_fn)
+            except (OSError, IOError):
+                LOG.debug("Could not cache limb correction coefficients in '%s'", LIMB_CACHE_DIR, exc_info=True)
+    _limb_coefficients[key] = coeff_results
+    return coeff_results
+
+
+def _limb_correction_terms(dmean, coeffs, amean, nchx, nchanx):
+    """Rearrange the coefficient tables so every channel uses the same number of input channels.
+
+    :returns: (input channel indexes (channel, k), coefficients (channel, fov, k), offsets (channel, fov))
+    """
+    num_chans, num_fovs = coeffs.shape[:2]
+    max_nchx = int(nchx.max())
+    # channels with fewer inputs repeat their first input with a coefficient of 0
+    input_idx = np.repeat(nchanx[:, :1], max_nchx, axis=1)
+    input_coeffs = np.zeros((num_chans, num_fovs, max_nchx), dtype=coeffs.dtype)
+    offsets = np.repeat(dmean[:, None], num_fovs, axis=1).astype(coeffs.dtype)
+    for chan_idx in range(num_chans):
+        n = nchx[chan_idx]
+        chan_inputs = nchanx[chan_idx, :n]
+        input_idx[chan_idx, :n] = chan_inputs
+        input_coeffs[chan_idx, :, :n] = coeffs[chan_idx][:, chan_inputs]
+        offsets[chan_idx] -= (coeffs[chan_idx][:, chan_inputs] * amean[chan_inputs, :, chan_idx].T).sum(axis=1)
+    return input_idx, input_coeffs, offsets
+
+
+def apply_atms_limb_correction(datasets, dmean, coeffs, amean, nchx, nchanx, nprocs=1):
+    """Limb correct every channel of (channel, rows, fov) brightness temperatures at once.
+
+    Each corrected channel is ``dmean + sum(coeffs * (input_bt - amean))`` over that channel's input channels. Rows
+    are independent so with `nprocs` greater than 1 groups of rows are corrected in parallel threads.
+
+    :returns: (channel, rows, fov) array of corrected brightness temperatures
+    """
+    input_idx, input_coeffs, offsets = _limb_correction_terms(dmean, coeffs, amean, nchx, nchanx)
+    new_datasets = np.empty(datasets.shape, dtype=datasets.dtype)
+
+    def _correct_rows(row_slice):
+        new_ds = new_datasets[:, row_slice]
+        new_ds[:] = offsets[:, None, :]
+        for k in range(input_idx.shape[1]):
+            new_ds += input_coeffs[:, None, :, k] * datasets[input_idx[:, k], row_slice]
+
+    num_rows = datasets.shape[1]
+    if nprocs <= 1 or num_rows < nprocs:
+        _correct_rows(slice(None))
+    else:
+        rows_per_job = -(-num_rows // nprocs)
+        with ThreadPoolExecutor(max_workers=nprocs) as executor:
+            list(executor.map(_correct_rows, [slice(row_start, row_start + rows_per_job)
+                                              for row_start in range(0, num_rows, rows_per_job)]))
+    return new_datasets
 
 
 class NetCDFFileReader(object):
@@ -652,6 +724,10 @@ class Frontend(roles.FrontendRole):
         self.secondary_product_functions = {}
         for pname in self.all_bt_channels:
             self.secondary_product_functions[pname] = self.limb_correct_atms_bt
+        # number of threads used for limb correction
+        self._nprocs = 1
+        # limb corrected BTs for all channels, (sea, land) by full BT product name
+        self._limb_corrected = {}
 
     def update_dynamic_products(self):
         fh = self.file_readers['MIRS_IMG'].file_readers[0]
@@ -827,8 +903,7 @@ class Frontend(roles.FrontendRole):
         return one_swath
 
     def create_scene(self, products=None, nprocs=1, all_bt_channels=False, **kwargs):
-        if nprocs != 1:
-            raise NotImplementedError("The MIRS frontend does not support multiple processes yet")
+        self._nprocs = nprocs
         if products is None:
             if not all_bt_channels:
                 LOG.debug("No products specified to frontend, will try to load logical defaults")
@@ -934,6 +1009,7 @@ class Frontend(roles.FrontendRole):
                 # the user wants this product
                 scene[product_name] = one_swath
 
+        self._limb_corrected.clear()
         return scene
 
     def limb_correct_atms_bt(self, product_name, swath_definition, products_created, fill=np.nan):
@@ -958,10 +1034,15 @@ class Frontend(roles.FrontendRole):
         surf_type_mask = surf_type_product.get_data_array("swath_data")
 
         bt_data = bt_product.get_data_array("swath_data", mode="r+")
-        sea_coeff_results = read_atms_limb_correction_coefficients(LIMB_SEA_FILE)
-        new_sea_bt_data = apply_atms_limb_correction(full_bt_data, *sea_coeff_results)
-        land_coeff_results = read_atms_limb_correction_coefficients(LIMB_LAND_FILE)
-        new_land_bt_data = apply_atms_limb_correction(full_bt_data, *land_coeff_results)
+        if full_bt_product_name not in self._limb_corrected:
+            # every channel is corrected at once, reuse the results for the other BT products
+            sea_coeff_results = read_atms_limb_correction_coefficients(LIMB_SEA_FILE)
+            land_coeff_results = read_atms_limb_correction_coefficients(LIMB_LAND_FILE)
+            self._limb_corrected[full_bt_product_name] = (
+                apply_atms_limb_correction(full_bt_data, *sea_coeff_results, nprocs=self._nprocs),
+                apply_atms_limb_correction(full_bt_data, *land_coeff_results, nprocs=self._nprocs),
+            )
+        new_sea_bt_data, new_land_bt_data = self._limb_corrected[full_bt_product_name]
         is_sea = (surf_type_mask == 0)
         bt_data[is_sea] = new_sea_bt_data[bt_product["channel_index"]][is_sea]
         bt_data[~is_sea] = new_land_bt_data[bt_product["channel_index"]][~is_sea]
@@ -988,6 +1069,9 @@ def add_frontend_argument_groups(parser):
                        help="Add all BT channels to the list of requested products")
     group.add_argument("-p", "--products", dest="products", nargs="*", default=None,
                        help="Specify frontend products to process")
+    group.add_argument("--nprocs", dest="nprocs", type=int, default=1,
+                       help="Number of threads to use for ATMS limb correction. Set the environment variable "
+                            "P2G_ATMS_LIMB_CACHE_DIR to a directory to cache the parsed limb correction coefficients")
     return ["Frontend Initialization", "Frontend Swath Extraction"]
 
 
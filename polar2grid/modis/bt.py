@@ -273,12 +273,17 @@ c ...   milliWatts per square meter per steradian per wavenumber
 """
 
 
-import sys, re, logging
+import os, sys, re, logging
 import numpy as np
 from collections import namedtuple
 
 LOG = logging.getLogger(__name__)
 
+# brightness temperature range (Kelvin) covered by the lookup tables, radiances outside of it are computed exactly
+LUT_MIN_BT = float(os.environ.get("P2G_BT_LUT_MIN", 150.0))
+LUT_MAX_BT = float(os.environ.get("P2G_BT_LUT_MAX", 400.0))
+LUT_STEPS = int(os.environ.get("P2G_BT_LUT_STEPS", 4096))
+
 # exponential notation regex 
 EXPO = r'[+\-]?(?:0|[1-9]\d*)(?:\.\d*)?(?:[eE][+\-]?\d+)?'
 
@@ -361,7 +366,114 @@ def wnum_bt(v, r):
     return zult
 
 
-def bright_shift(platform, rad, band, units="micron"):
+def micron_planck(w, t):
+    """Radiance (Watts per square meter per steradian per micron) for temperature `t`, inverse of `micron_bt`."""
+    ws = 1.0e-6 * w
+    return c1 / (1.0e6 * ws**5 * (np.exp(c2 / (ws * t)) - 1.0))
+
+
+def wnum_planck(v, t):
+    """Radiance (milliWatts per square meter per steradian per wavenumber) for temperature `t`, inverse of `wnum_bt`."""
+    vs = 1.0e+2 * v
+    return c1 * vs**3 / (1.0e-5 * (np.exp(c2 * vs / t) - 1.0))
+
+
+def _band_offset(band):
+    offset = (band - 20) if (band <= 25) else (band - 21)
+    assert(offset >=0 and offset <16)
+    return offset
+
+
+def _exact_bright_shift(platform, rad, band, units="micron"):
+    offset = _band_offset(band)
+    C = _coeffs(platform, offset)
+    LOG.debug('Coeffs loaded at offset %d: %s' % (offset, C))
+
+    if units == 'micron': # Watts per square meter per steradian per micron
+        return (micron_bt(1.0e+4 / C.cwn, rad) - C.tci) / C.tcs
+    elif units == 'wavenumber': #  milliWatts per square meter per steradian per wavenumber
+        return (wnum_bt(C.cwn, rad) - C.tci) / C.tcs
+    else:
+        raise ValueError("units must be 'wavenumber' or 'micron'")
+
+
+class BrightShiftLUT(object):
+    """Radiance to brightness temperature lookup table for one platform and band.
+
+    The table holds `bright_shift` for `num_steps` radiances evenly spaced in the fourth root of radiance between the
+    radiances of `min_bt` and `max_bt`. Spacing by the fourth root keeps the steps small where the inverse Planck
+    function curves the most (cold scenes in the shortwave bands) so linear interpolation between entries is within
+    0.001K of the exact result for every MODIS emissive band with the default 4096 steps. Radiances outside of the
+    table (including zero, negative, and NaN) are computed with the exact formula.
+
+    """
+    def __init__(self, platform, band, units="micron", min_bt=LUT_MIN_BT, max_bt=LUT_MAX_BT, num_steps=LUT_STEPS):
+        C = _coeffs(platform, _band_offset(band))
+        if units == 'micron':
+            min_rad, max_rad = micron_planck(1.0e+4 / C.cwn, np.array([min_bt, max_bt]) * C.tcs + C.tci)
+        elif units == 'wavenumber':
+            min_rad, max_rad = wnum_planck(C.cwn, np.array([min_bt, max_bt]) * C.tcs + C.tci)
+        else:
+            raise ValueError("units must be 'wavenumber' or 'micron'")
+        self.platform = platform
+        self.band = band
+        self.units = units
+        self.num_steps = num_steps
+        self.min_root = np.float32(min_rad ** 0.25)
+        self.step_scale = np.float32((num_steps - 1) / (max_rad ** 0.25 - min_rad ** 0.25))
+        roots = np.linspace(min_rad ** 0.25, max_rad ** 0.25, num_steps)
+        table = _exact_bright_shift(platform, roots ** 4, band, units=units)
+        self.table = table.astype(np.float32)
+        # slope to the next entry, the extra entry keeps the last table index valid
+        self.slopes = np.append(np.diff(table), 0.0).astype(np.float32)
+
+    def __call__(self, rad, out=None, chunk_size=65536):
+        """Brightness temperatures of `rad` as float32.
+
+        :arg out: array to write the results to, may be `rad` itself
+        """
+        flat_rad = np.ravel(rad)
+        result = np.empty(flat_rad.shape, dtype=np.float32) if out is None else out.reshape(-1)
+        pos_buffer = np.empty((min(chunk_size, flat_rad.size),), dtype=np.float32)
+        index_buffer = np.empty(pos_buffer.shape, dtype=np.intp)
+        max_pos = self.num_steps - 1
+        for start in range(0, flat_rad.size, chunk_size):
+            chunk = flat_rad[start:start + chunk_size]
+            pos = pos_buffer[:chunk.size]
+            with np.errstate(invalid="ignore"):
+                np.sqrt(chunk, out=pos)
+                np.sqrt(pos, out=pos)
+                pos -= self.min_root
+                pos *= self.step_scale
+                outside = ~((pos >= 0) & (pos <= max_pos))
+            # fmax/fmin also replace NaNs so every index is valid, those pixels are recomputed below
+            np.fmax(pos, 0, out=pos)
+            np.fmin(pos, max_pos, out=pos)
+            indexes = index_buffer[:chunk.size]
+            np.copyto(indexes, pos, casting="unsafe")
+            pos -= indexes
+            pos *= self.slopes[indexes]
+            pos += self.table[indexes]
+            if outside.any():
+                pos[outside] = _exact_bright_shift(self.platform, chunk[outside], self.band, units=self.units)
+            result[start:start + chunk.size] = pos
+        return result.reshape(np.shape(rad)) if out is None else out
+
+
+_bright_shift_luts = {}
+
+
+def get_bright_shift_lut(platform, band, units="micron"):
+    """Get the `BrightShiftLUT` for this platform and band, creating it the first time it is requested."""
+    key = (platform.split(' ')[0].lower(), band, units)
+    lut = _bright_shift_luts.get(key)
+    if lut is None:
+        LOG.debug("Creating brightness temperature lookup table for %r", key)
+        lut = _bright_shift_luts[key] = BrightShiftLUT(platform, band, units=units)
+    return lut
+
+
+def bright_shift(platform, rad, band, units="micron", use_lut=False, out=None):
     """compute brightness temperature for MODIS on Terra and Aqua
 
     :arg platform: "Terra" or "Aqua"
@@ -369,6 +481,9 @@ def bright_shift(platform, rad, band, units="micron"):
     :arg band: band number
     :keyword units: "micron" implying Watts per square meter per steradian per micron for radiance
             or "wavenumber" implying milliWatts per square meter per steradian per wavenumber
+    :keyword use_lut: interpolate float32 results from a cached `BrightShiftLUT` instead of computing the exact
+            float64 result for every pixel
+    :keyword out: array to write the lookup table results to (only used with `use_lut`)
     
     .. note::
     
@@ -376,17 +491,9 @@ def bright_shift(platform, rad, band, units="micron"):
         could not be processed
 
     """    
-    offset = (band - 20) if (band <= 25) else (band - 21)
-    assert(offset >=0 and offset <16)
-    C = _coeffs(platform, offset)
-    LOG.debug('Coeffs loaded at offset %d: %s' % (offset, C))
-
-    if units == 'micron': # Watts per square meter per steradian per micron
-        return (micron_bt(1.0e+4 / C.cwn, rad) - C.tci) / C.tcs
-    elif units == 'wavenumber': #  milliWatts per square meter per steradian per wavenumber
-        return (wnum_bt(C.cwn, rad) - C.tci) / C.tcs
-    else:
-        raise ValueError("units must be 'wavenumber' or 'micron'")
+    if use_lut:
+        return get_bright_shift_lut(platform, band, units=units)(rad, out=out)
+    return _exact_bright_shift(platform, rad, band, units=units)
 
 
 def _test1():
@@ -47,6 +47,8 @@ LOG = logging.getLogger(__name__)
 # MODIS has 10 rows of data in the array for every scan line
 ROWS_PER_SCAN = 10
 EARTH_RADIUS = 6370997.0
+# default number of scans interpolated at a time, bounds the size of temporary arrays
+SCANS_PER_BLOCK = 32
 
 # FUTURE: Add this to the pytroll python-geotiepoints package if it can be more generalized
 # Most of the cartesian conversions were taken from the existing python-geotiepoints develop branch
@@ -72,8 +74,115 @@ def get_lats_from_cartesian(x__, y__, z__, thr=0.8):
     return lats
 
 
-def interpolate_geolocation_cartesian(lon_array, lat_array, res_factor=4):
-    """Interpolate MODIS navigation from 1000m resolution to 250m.
+def _scan_row_positions(res_factor):
+    """Row position in the 1km scan of every interpolated row of a scan, 0.375 for 250m, 0.25 for 500m."""
+    return (np.arange(res_factor * ROWS_PER_SCAN, dtype=np.float32) * (1. / res_factor) -
+            (res_factor * (1. / 16) + (1. / 8)))
+
+
+def _linear_taps(num_in, positions, dtype):
+    """Neighbor indexes and weights to linearly interpolate at `positions`, clamped at the edges like mode='nearest'."""
+    floor = np.floor(positions)
+    idx0 = np.clip(floor, 0, num_in - 1).astype(np.intp)
+    idx1 = np.clip(floor + 1, 0, num_in - 1).astype(np.intp)
+    weight1 = (positions - floor).astype(dtype)
+    return idx0, idx1, 1 - weight1, weight1
+
+
+# (first row, second row, rows to extrapolate) for the along track edges of each interpolated scan
+_EDGE_EXTRAPOLATION = {
+    4: ((2, 5, (0, 1)), (34, 37, (38, 39))),
+    2: ((1, 2, (0,)), (17, 18, (19,))),
+}
+
+
+def _interpolate_scans(nav_cube, col_taps, row_taps, row_positions, res_factor):
+    """Bilinearly interpolate a (scans, rows per scan, columns) cube of one cartesian coordinate.
+
+    Matches ``map_coordinates(order=1, mode='nearest')`` followed by linear extrapolation of the rows at each scan's
+    along track edges for every scan at once.
+    """
+    col0, col1, col_weight0, col_weight1 = col_taps
+    # interpolate across track first while there are fewer rows
+    cols = nav_cube[:, :, col0]
+    cols *= col_weight0
+    cols += nav_cube[:, :, col1] * col_weight1
+    row0, row1, row_weight0, row_weight1 = row_taps
+    result = cols[:, row0, :]
+    result *= row_weight0[:, None]
+    result += cols[:, row1, :] * row_weight1[:, None]
+    for first_row, second_row, extrap_rows in _EDGE_EXTRAPOLATION[res_factor]:
+        slope = (result[:, second_row] - result[:, first_row]) / (row_positions[second_row] - row_positions[first_row])
+        intercept = result[:, second_row] - slope * row_positions[second_row]
+        for extrap_row in extrap_rows:
+            result[:, extrap_row] = slope * row_positions[extrap_row] + intercept
+    return result
+
+
+def interpolate_geolocation_cartesian(lon_array, lat_array, res_factor=4, method="batched",
+                                      scans_per_block=SCANS_PER_BLOCK):
+    """Interpolate MODIS navigation from 1000m resolution to 250m or 500m.
+
+    Python rewrite of the IDL function ``MODIS_GEO_INTERP_250`` but converts to cartesian (X, Y, Z) coordinates
+    first to avoid problems with the anti-meridian/poles.
+
+    The "batched" method interpolates `scans_per_block` scans at a time, going from lon/lat to cartesian
+    coordinates and back for each block so full resolution cartesian arrays are never created. Single precision
+    inputs are processed in float32.
+
+    :param lon_array: MODIS 1km longitude array
+    :param lat_array: MODIS 1km latitude array
+    :param res_factor: 4 for 250m or 2 for 500m
+    :param method: "batched" or "per_scan" to use the original scan by scan ``map_coordinates`` implementation
+    :param scans_per_block: Number of scans interpolated at a time by the "batched" method
+
+    :returns: MODIS higher resolution longitude array and latitude array
+    """
+    if method == "per_scan":
+        return _interpolate_geolocation_per_scan(lon_array, lat_array, res_factor=res_factor)
+    elif method != "batched":
+        raise ValueError("Unknown geolocation interpolation method '%s'" % (method,))
+
+    num_rows, num_cols = lon_array.shape
+    num_scans = int(num_rows / ROWS_PER_SCAN)
+    dtype = np.promote_types(np.promote_types(lon_array.dtype, lat_array.dtype), np.float32)
+    row_positions = _scan_row_positions(res_factor).astype(dtype)
+    col_taps = _linear_taps(num_cols, np.arange(res_factor * num_cols, dtype=np.float32) * (1. / res_factor), dtype)
+    row_taps = _linear_taps(ROWS_PER_SCAN, row_positions, dtype)
+    earth_radius = dtype.type(EARTH_RADIUS)
+
+    new_lons = np.empty((num_rows * res_factor, num_cols * res_factor), dtype=lon_array.dtype)
+    new_lats = np.empty((num_rows * res_factor, num_cols * res_factor), dtype=lat_array.dtype)
+    if num_scans * ROWS_PER_SCAN != num_rows:
+        LOG.warning("Geolocation has a partial scan, the last %d rows will not be interpolated",
+                    num_rows - num_scans * ROWS_PER_SCAN)
+        new_lons[num_scans * ROWS_PER_SCAN * res_factor:] = np.nan
+        new_lats[num_scans * ROWS_PER_SCAN * res_factor:] = np.nan
+
+    for scan_start in range(0, num_scans, scans_per_block):
+        scan_end = min(scan_start + scans_per_block, num_scans)
+        block_shape = (scan_end - scan_start, ROWS_PER_SCAN, num_cols)
+        in_rows = slice(scan_start * ROWS_PER_SCAN, scan_end * ROWS_PER_SCAN)
+        out_rows = slice(scan_start * ROWS_PER_SCAN * res_factor, scan_end * ROWS_PER_SCAN * res_factor)
+
+        lons_rad = np.radians(lon_array[in_rows].astype(dtype, copy=False)).reshape(block_shape)
+        lats_rad = np.radians(lat_array[in_rows].astype(dtype, copy=False)).reshape(block_shape)
+        cos_lats = np.cos(lats_rad)
+        cos_lats *= earth_radius
+        new_x = _interpolate_scans(cos_lats * np.cos(lons_rad), col_taps, row_taps, row_positions, res_factor)
+        new_y = _interpolate_scans(cos_lats * np.sin(lons_rad), col_taps, row_taps, row_positions, res_factor)
+        new_z = _interpolate_scans(earth_radius * np.sin(lats_rad), col_taps, row_taps, row_positions, res_factor)
+
+        # arctan2 stays accurate in single precision where the arccos formulas don't
+        out_shape = (-1, num_cols * res_factor)
+        new_lons[out_rows] = np.degrees(np.arctan2(new_y, new_x)).reshape(out_shape)
+        new_lats[out_rows] = np.degrees(np.arctan2(new_z, np.hypot(new_x, new_y))).reshape(out_shape)
+
+    return new_lons, new_lats
+
+
+def _interpolate_geolocation_per_scan(lon_array, lat_array, res_factor=4):
+    """Interpolate MODIS navigation from 1000m resolution to 250m one scan at a time.
 
     Python rewrite of the IDL function ``MODIS_GEO_INTERP_250`` but converts to cartesian (X, Y, Z) coordinates
     first to avoid problems with the anti-meridian/poles.
@@ -446,6 +446,8 @@ class Frontend(roles.FrontendRole):
         self.file_readers = {}
         self.available_file_types = []
         self.load_files(self.find_files_with_extensions())
+        # use cached lookup tables for brightness temperature calculations
+        self._bt_lut = False
 
         self.secondary_product_functions = {
             PRODUCT_SLST: self.create_slst,
@@ -704,7 +706,8 @@ class Frontend(roles.FrontendRole):
         )
         return one_swath
 
-    def create_scene(self, products=None, **kwargs):
+    def create_scene(self, products=None, bt_lut=False, **kwargs):
+        self._bt_lut = bt_lut
         LOG.debug("Loading scene data...")
         # If the user didn't provide the products they want, figure out which ones we can create
         if products is None:
@@ -869,7 +872,11 @@ class Frontend(roles.FrontendRole):
             }[product_name]
             # since the input and output fill value and the invalid calculation value are all NaN we don't have to do
             # any extra calculations
-            output_data[~ir_mask] = bright_shift(sat.title(), output_data[~ir_mask], band_number)
+            if self._bt_lut:
+                # NaN radiances stay NaN so the whole array can be converted in place
+                bright_shift(sat.title(), output_data, band_number, use_lut=True, out=output_data)
+            else:
+                output_data[~ir_mask] = bright_shift(sat.title(), output_data[~ir_mask], band_number)
 
             one_swath = self.create_secondary_swath_object(product_name, swath_definition, filename,
                                                            ir_product["data_type"], products_created)
@@ -1076,6 +1083,8 @@ def add_frontend_argument_groups(parser):
                        help="Add cloud and other mask products to list of products")
     group.add_argument('--adaptive-bt', dest='products', action=ExtendConstAction, const=ADAPTIVE_BT_PRODUCTS,
                        help="Create adaptively scaled brightness temperature bands")
+    group.add_argument('--bt-lut', dest='bt_lut', action='store_true',
+                       help="Calculate brightness temperatures from cached lookup tables (faster, within 0.001K)")
     return ["Frontend Initialization", "Frontend Swath Extraction"]
 
 
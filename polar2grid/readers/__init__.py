@@ -71,7 +71,12 @@ def normalize_satellite_name(input_sat):
     return input_sat
 
 
-def area_to_swath_def(area, chunks=4096, overwrite_existing=False):
+def area_to_swath_def(area, chunks=4096, overwrite_existing=False, lazy=False):
+    """Convert a pyresample geometry to a P2G SwathDefinition.
+
+    Longitude and latitude are written to flat binary files unless `lazy` is True, in which case the dask arrays are
+    stored in the swath definition directly.
+    """
     if hasattr(area, 'lons') and area.lons is not None:
         lons = area.lons
         lats = area.lats
@@ -101,6 +106,11 @@ def area_to_swath_def(area, chunks=4096, overwrite_existing=False):
     if hasattr(area, "attrs"):
         info.update(area.attrs)
 
+    if lazy:
+        info["longitude"] = lons
+        info["latitude"] = lats
+        return containers.SwathDefinition(**info)
+
     # Write lons to disk
     filename = info["longitude"]
     if os.path.isfile(filename):
@@ -155,7 +165,12 @@ def area_to_grid_definition(area, overwrite_existing=False):
         )
 
 
-def dataarray_to_swath_product(ds, swath_def, overwrite_existing=False):
+def dataarray_to_swath_product(ds, swath_def, overwrite_existing=False, lazy=False):
+    """Generate P2G SwathProducts from a satpy DataArray, one per channel.
+
+    Data is written to flat binary files unless `lazy` is True, in which case the dask arrays are stored in the
+    products directly.
+    """
     info = ds.attrs.copy()
     info.pop("area")
     if ds.ndim == 3:
@@ -208,6 +223,10 @@ def dataarray_to_swath_product(ds, swath_def, overwrite_existing=False):
         if info.get('modifiers'):
             filename += '-' + '_'.join(info['modifiers'])
         filename = filename + ".dat"
+        if lazy:
+            info["swath_data"] = ds.where(ds.notnull(), np.nan).data.astype(dtype)
+            yield containers.SwathProduct(**info)
+            return
         info["swath_data"] = filename
         if os.path.isfile(filename):
             if not overwrite_existing:
@@ -225,6 +244,10 @@ def dataarray_to_swath_product(ds, swath_def, overwrite_existing=False):
             tmp_info = info.copy()
             tmp_info["product_name"] = info["product_name"] + "_rgb_{:d}".format(chn_idx)
             filename = tmp_info["product_name"] + ".dat"
+            if lazy:
+                tmp_info["swath_data"] = ds.data[chn_idx].astype(dtype)
+                yield containers.SwathProduct(**tmp_info)
+                continue
             tmp_info["swath_data"] = filename
             if os.path.isfile(filename):
                 if not overwrite_existing:
@@ -289,7 +312,7 @@ def dataarray_to_gridded_product(ds, grid_def, overwrite_existing=False):
     return containers.GriddedProduct(**info)
 
 
-def convert_satpy_to_p2g_swath(frontend, scene, convert_area_defs=True):
+def convert_satpy_to_p2g_swath(frontend, scene, convert_area_defs=True, lazy=False):
     """Convert a Satpy Scene in to a Polar2Grid SwathScene.
 
     If ``convert_area_defs`` is ``True`` (default) then `AreaDefinition`
@@ -297,6 +320,10 @@ def convert_satpy_to_p2g_swath(frontend, scene, convert_area_defs=True):
     their longitude and latitude arrays. If ``False`` then an exception
     is raised when an `AreaDefinition` is encountered.
 
+    If ``lazy`` is ``True`` the swath products and definitions hold the
+    dask arrays from the Scene instead of writing them to flat binary files.
+    This is only supported by a ``Remapper`` created with ``lazy_remap``.
+
     """
     p2g_scene = containers.SwathScene()
     overwrite_existing = frontend.overwrite_existing
@@ -314,11 +341,13 @@ def convert_satpy_to_p2g_swath(frontend, scene, convert_area_defs=True):
         else:
             areas[area_name] = swath_def = area_to_swath_def(ds.attrs["area"],
                                                              chunks=ds.data.chunks,
-                                                             overwrite_existing=overwrite_existing)
+                                                             overwrite_existing=overwrite_existing,
+                                                             lazy=lazy)
             def_rps = ds.shape[0] if ds.ndim <= 2 else ds.shape[-2]
             swath_def.setdefault("rows_per_scan", ds.attrs.get("rows_per_scan", def_rps))
 
-        for swath_product in dataarray_to_swath_product(ds, swath_def, overwrite_existing=overwrite_existing):
+        for swath_product in dataarray_to_swath_product(ds, swath_def, overwrite_existing=overwrite_existing,
+                                                        lazy=lazy):
             swath_product.setdefault('reader', frontend.reader)
             p2g_scene[swath_product["product_name"]] = swath_product
 
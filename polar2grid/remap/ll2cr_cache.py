@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Persistent on-disk cache of ll2cr and nearest neighbor results.
+
+The column and row arrays produced by ll2cr only depend on the longitude and
+latitude data of a swath and on the grid being mapped to. When the same
+granules are reprocessed (reruns, new products, more grids) the projection
+step can be skipped entirely by reusing the arrays from a previous run.
+
+Cache entries are keyed by a hash of the longitude/latitude bytes, the
+geolocation fill value, and the grid definition as it was *before* ll2cr
+filled in any dynamic parameters. Each entry is stored as two flat binary
+files (columns and rows) and a small JSON metadata file holding the
+completed grid parameters and the number of swath points that fell in the
+grid.
+
+Nearest neighbor resampling results are cached in the same directory. The
+index array produced by `polar2grid.remap.nearest.nearest_index` is a lookup
+table from grid cell to swath pixel, so later products and later runs over the
+same swath and grid only have to gather their data through it instead of
+building and querying a KDTree. These entries are additionally keyed by the
+search distance and the mask of valid swath pixels.
+
+The total size of the cache is bounded; the least recently used entries are
+removed first.
+
+The cache can be inspected and pruned from the command line::
+
+    python -m polar2grid.remap.ll2cr_cache info /path/to/cache
+    python -m polar2grid.remap.ll2cr_cache prune --max-size 2G /path/to/cache
+    python -m polar2grid.remap.ll2cr_cache clear /path/to/cache
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+
+import numpy
+
+LOG = logging.getLogger(__name__)
+
+LL2CR_CACHE_DIR = os.environ.get("P2G_LL2CR_CACHE_DIR", None)
+LL2CR_CACHE_SIZE = os.environ.get("P2G_LL2CR_CACHE_SIZE", "4G")
+# grid parameters that define the result of ll2cr
+GRID_KEYS = ("proj4_definition", "cell_width", "cell_height", "width", "height", "origin_x", "origin_y")
+# number of swath rows hashed at a time to keep memory usage low
+HASH_ROWS = 512
+SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(size_str):
+    """Convert a human readable size string (ex. '500M', '4G') to a number of bytes.
+    """
+    if isinstance(size_str, (int, float)):
+        return int(size_str)
+    size_str = size_str.strip().upper().rstrip("B")
+    if size_str and size_str[-1] in SIZE_SUFFIXES:
+        return int(float(size_str[:-1]) * SIZE_SUFFIXES[size_str[-1]])
+    return int(float(size_str))
+
+
+def format_size(num_bytes):
+    """Convert a number of bytes to a human readable size string (ex. '1.5G'), the inverse of `parse_size`.
+    """
+    for suffix in ("T", "G", "M", "K"):
+        if num_bytes >= SIZE_SUFFIXES[suffix]:
+            return "%.1f%s" % (num_bytes / float(SIZE_SUFFIXES[suffix]), suffix)
+    return "%dB" % (num_bytes,)
+
+
+def _update_hash_with_array(h, arr):
+    h.update(str(arr.dtype.str).encode())
+    h.update(str(arr.shape).encode())
+    for start in range(0, arr.shape[0], HASH_ROWS):
+        h.update(numpy.ascontiguousarray(arr[start:start + HASH_ROWS]).data)
+
+
+def swath_geolocation_hash(swath_definition):
+    """Hash the longitude and latitude data of a `SwathDefinition`.
+
+    The data is read in row blocks so the full arrays never have to be in memory at once.
+    """
+    h = hashlib.sha1()
+    h.update(repr(float(swath_definition["fill_value"])).encode())
+    _update_hash_with_array(h, swath_definition.get_longitude_array())
+    _update_hash_with_array(h, swath_definition.get_latitude_array())
+    return h.hexdigest()
+
+
+def grid_definition_hash(grid_definition):
+    """Hash the parameters of a grid definition that affect ll2cr output.
+
+    Dynamic parameters that haven't been computed yet (None) are part of the hash so a dynamic grid
+    and a static grid with the same name are never confused.
+    """
+    h = hashlib.sha1()
+    for k in GRID_KEYS:
+        h.update(("%s=%r;" % (k, grid_definition.get(k))).encode())
+    return h.hexdigest()
+
+
+class RemapFileCache(object):
+    """Content-addressed, size-bounded cache of flat binary remapping results.
+
+    Every entry is a JSON metadata file plus one flat binary file for each name in `data_names`.
+    Entries from different subclasses can share the same directory and size limit.
+
+    :param cache_dir: Directory to store cache entries in (created if it doesn't exist)
+    :param max_size: Maximum number of bytes or size string ('4G') of cached data before LRU entries are removed
+
+    """
+    kind = None
+    data_names = tuple()
+
+    def __init__(self, cache_dir, max_size=LL2CR_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = parse_size(max_size)
+        if not os.path.isdir(self.cache_dir):
+            LOG.debug("Creating remap cache directory: %s", self.cache_dir)
+            os.makedirs(self.cache_dir)
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _data_paths(self, key, data_names=None):
+        base = os.path.join(self.cache_dir, key)
+        return [base + ".%s.dat" % (name,) for name in (data_names or self.data_names)]
+
+    def _link_or_copy(self, src, dst):
+        # never write in to an existing file, it may be linked to a cache entry
+        if os.path.isfile(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            # different file systems or links aren't supported
+            shutil.copyfile(src, dst)
+
+    def _get(self, key, *filenames):
+        """Provide the cached data files for `key` as `filenames` (one per name in `data_names`).
+
+        :returns: Cached metadata dictionary or None if there is no entry for `key`
+        """
+        meta_fn = self._meta_path(key)
+        try:
+            with open(meta_fn, "r") as meta_file:
+                meta = json.load(meta_file)
+            for cached_fn, fn in zip(self._data_paths(key), filenames):
+                self._link_or_copy(cached_fn, fn)
+            # mark this entry as recently used
+            now = time.time()
+            os.utime(meta_fn, (now, now))
+        except (OSError, ValueError):
+            LOG.debug("No usable %s cache entry for '%s'", self.kind, key)
+            for fp in filenames:
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            return None
+        return meta
+
+    def _put(self, key, meta, *filenames):
+        """Add the data files for `key` to the cache.
+
+        Files are hard linked in to the cache if possible so no additional data is written.
+        """
+        meta_fn = self._meta_path(key)
+        meta["kind"] = self.kind
+        meta["data_names"] = list(self.data_names)
+        meta["size"] = sum(os.path.getsize(fn) for fn in filenames)
+        try:
+            for fn, cached_fn in zip(filenames, self._data_paths(key)):
+                self._link_or_copy(fn, cached_fn)
+            # write metadata last so partial entries are never used
+            tmp_meta_fn = meta_fn + ".tmp%d" % (os.getpid(),)
+            with open(tmp_meta_fn, "w") as meta_file:
+                json.dump(meta, meta_file, indent=4, sort_keys=True)
+            os.rename(tmp_meta_fn, meta_fn)
+        except OSError:
+            LOG.warning("Could not add %s results to cache directory '%s'", self.kind, self.cache_dir)
+            LOG.debug("Remap cache exception: ", exc_info=True)
+            self.remove(key)
+            return
+        LOG.debug("Added %s results to cache: %s", self.kind, key)
+        self.prune()
+
+    def remove(self, key, data_names=None):
+        for fp in [self._meta_path(key)] + self._data_paths(key, data_names=data_names):
+            if os.path.isfile(fp):
+                try:
+                    os.remove(fp)
+                except OSError:
+                    LOG.debug("Could not remove remap cache file '%s'", fp, exc_info=True)
+
+    def entries(self):
+        """List of (key, metadata, last_used_time) for every cache entry, most recently used first.
+        """
+        results = []
+        for fn in os.listdir(self.cache_dir):
+            if not fn.endswith(".json"):
+                continue
+            key = fn[:-5]
+            meta_fn = os.path.join(self.cache_dir, fn)
+            try:
+                with open(meta_fn, "r") as meta_file:
+                    meta = json.load(meta_file)
+                last_used = os.path.getmtime(meta_fn)
+            except (OSError, ValueError):
+                LOG.debug("Skipping unreadable remap cache entry: %s", meta_fn)
+                continue
+            results.append((key, meta, last_used))
+        return sorted(results, key=lambda x: x[2], reverse=True)
+
+    def total_size(self):
+        return sum(meta.get("size", 0) for _, meta, _ in self.entries())
+
+    def prune(self, max_size=None):
+        """Remove least recently used entries until the cache is smaller than `max_size` bytes.
+
+        :returns: Number of entries removed
+        """
+        max_size = self.max_size if max_size is None else parse_size(max_size)
+        total = 0
+        removed = 0
+        for key, meta, _ in self.entries():
+            total += meta.get("size", 0)
+            if total > max_size:
+                LOG.debug("Removing least recently used remap cache entry: %s", key)
+                self.remove(key, data_names=meta.get("data_names"))
+                removed += 1
+        return removed
+
+    def clear(self):
+        return self.prune(max_size=0)
+
+
+class LL2CRCache(RemapFileCache):
+    """Cache of ll2cr column and row arrays.
+    """
+    kind = "ll2cr"
+    data_names = ("cols", "rows")
+
+    def get_key(self, swath_definition, grid_definition, swath_hash=None):
+        """Unique key for the result of running ll2cr on this swath and grid.
+
+        If `swath_hash` is provided it is used instead of hashing the geolocation data of `swath_definition` again
+        (see `swath_geolocation_hash`).
+        """
+        swath_hash = swath_geolocation_hash(swath_definition) if swath_hash is None else swath_hash
+        grid_hash = grid_definition_hash(grid_definition)
+        return hashlib.sha1((swath_hash + grid_hash).encode()).hexdigest()
+
+    def get(self, key, cols_fn, rows_fn):
+        """Provide cached column and row arrays as `cols_fn` and `rows_fn`.
+
+        :returns: Cached metadata dictionary or None if there is no entry for `key`
+        """
+        return self._get(key, cols_fn, rows_fn)
+
+    def put(self, key, cols_fn, rows_fn, grid_definition, points_in_grid, **extra_info):
+        meta = dict((k, grid_definition[k]) for k in GRID_KEYS)
+        meta["grid_name"] = grid_definition["grid_name"]
+        meta["points_in_grid"] = int(points_in_grid)
+        meta.update(extra_info)
+        self._put(key, meta, cols_fn, rows_fn)
+
+
+class NearestIndexCache(RemapFileCache):
+    """Cache of nearest neighbor index arrays (see `polar2grid.remap.nearest`).
+
+    An index array maps every grid cell to the swath pixel it takes its value from, so any product using the
+    same geolocation, grid, search distance, and valid swath mask can be resampled with a single gather.
+    """
+    kind = "nearest"
+    data_names = ("index",)
+
+    def get_key(self, swath_definition, grid_definition, distance_upper_bound, good_mask, swath_hash=None):
+        """Unique key for the nearest neighbor index of this swath, grid, search distance, and swath mask.
+
+        If `swath_hash` is provided it is used instead of hashing the geolocation data of `swath_definition` again.
+        """
+        swath_hash = swath_geolocation_hash(swath_definition) if swath_hash is None else swath_hash
+        h = hashlib.sha1()
+        h.update(swath_hash.encode())
+        h.update(grid_definition_hash(grid_definition).encode())
+        h.update(repr(float(distance_upper_bound)).encode())
+        h.update(numpy.packbits(good_mask).data)
+        return h.hexdigest()
+
+    def get(self, key, index_fn):
+        return self._get(key, index_fn)
+
+    def put(self, key, index_fn, grid_definition, distance_upper_bound, **extra_info):
+        meta = dict((k, grid_definition[k]) for k in GRID_KEYS)
+        meta["grid_name"] = grid_definition["grid_name"]
+        meta["distance_upper_bound"] = float(distance_upper_bound)
+        meta.update(extra_info)
+        self._put(key, meta, index_fn)
+
+
+def info_cache(cache_dir):
+    """Print the number of entries and total size of a remap cache and the kind, grid, size, and last use of every
+    entry (most recently used first).
+    """
+    cache = RemapFileCache(cache_dir)
+    entries = cache.entries()
+    print("Remap cache: %s" % (cache_dir,))
+    print("Number of entries: %d" % (len(entries),))
+    print("Total size: %s" % (format_size(sum(meta.get("size", 0) for _, meta, _ in entries)),))
+    for key, meta, last_used in entries:
+        print("\t%s  %-8s %-20s %8s  %s" % (key, meta.get("kind", "ll2cr"), meta.get("grid_name", "?"),
+                                            format_size(meta.get("size", 0)),
+                                            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_used))))
+
+
+def prune_cache(cache_dir, max_size):
+    cache = RemapFileCache(cache_dir, max_size=max_size)
+    removed = cache.prune()
+    print("Removed %d entries from remap cache" % (removed,))
+
+
+def clear_cache(cache_dir):
+    cache = RemapFileCache(cache_dir)
+    removed = cache.clear()
+    print("Removed %d entries from remap cache" % (removed,))
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description="Utility for inspecting and pruning the persistent remap (ll2cr and nearest "
+                                        "neighbor) cache")
+    subparsers = parser.add_subparsers()
+    sp_info = subparsers.add_parser("info", help="List the entries in the cache")
+    sp_info.set_defaults(func=info_cache)
+    sp_info.add_argument("cache_dir", help="Remap cache directory")
+
+    sp_prune = subparsers.add_parser("prune", help="Remove least recently used entries until the cache fits in a size")
+    sp_prune.set_defaults(func=prune_cache)
+    sp_prune.add_argument("--max-size", default=LL2CR_CACHE_SIZE,
+                          help="Maximum size of the cache (ex. 500M, 4G) (default: %(default)s)")
+    sp_prune.add_argument("cache_dir", help="Remap cache directory")
+
+    sp_clear = subparsers.add_parser("clear", help="Remove all entries from the cache")
+    sp_clear.set_defaults(func=clear_cache)
+    sp_clear.add_argument("cache_dir", help="Remap cache directory")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    kwargs = vars(args)
+    func = kwargs.pop("func")
+    func(**kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
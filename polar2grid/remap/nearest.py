@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Tiled nearest neighbor resampling of swath data already mapped to grid columns and rows by ll2cr.
+
+Instead of querying a KDTree of the entire swath for every grid cell at once
+(which needs several full-grid coordinate and result arrays) the output grid
+is processed one tile at a time. Only the swath points that could be within
+the search distance of a tile are used to build that tile's KDTree. The
+result of the search is an index array the size of the grid pointing in to
+the flattened swath (or one past the last swath pixel where no valid swath
+point was found). This index array is written to disk tile by tile and then
+used to gather each product's data in to its output grid so peak memory use
+depends on the tile size and swath size, not on the size of the grid.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import logging
+
+import numpy
+from scipy.spatial import cKDTree
+
+LOG = logging.getLogger(__name__)
+
+TILE_SIZE = int(os.environ.get("P2G_NEAREST_TILE_SIZE", 1024))
+INDEX_DTYPE = numpy.int32
+
+
+def _sorted_swath_points(cols_array, rows_array, good_mask):
+    """Valid swath column and row points sorted by row so row bands can be found with a binary search.
+
+    :returns: (sorted columns, sorted rows, flattened swath index of each sorted point)
+    """
+    good_indexes = numpy.flatnonzero(good_mask).astype(INDEX_DTYPE)
+    good_rows = rows_array[good_indexes]
+    order = numpy.argsort(good_rows, kind="mergesort")
+    good_indexes = good_indexes[order]
+    return cols_array[good_indexes], good_rows[order], good_indexes
+
+
+def nearest_index(cols_array, rows_array, good_mask, grid_rows, grid_cols, distance_upper_bound,
+                  output_index=None, tile_size=TILE_SIZE):
+    """Find the nearest valid swath point for every grid cell.
+
+    :param cols_array: Flattened ll2cr column array for the swath
+    :param rows_array: Flattened ll2cr row array for the swath
+    :param good_mask: Flattened boolean array of swath points that should be used
+    :param grid_rows: Number of rows in the output grid
+    :param grid_cols: Number of columns in the output grid
+    :param distance_upper_bound: Maximum search distance in grid cells
+    :param output_index: Filename or (grid_rows, grid_cols) array to write the resulting indexes to
+    :param tile_size: Number of grid rows and columns processed at a time
+    :returns: (grid_rows, grid_cols) int32 array (memory mapped if `output_index` is a filename) of indexes in to
+              the flattened swath. Grid cells with no valid swath point in range have an index equal to the number
+              of swath pixels.
+
+    """
+    if output_index is None:
+        output_index = numpy.empty((grid_rows, grid_cols), dtype=INDEX_DTYPE)
+    elif isinstance(output_index, str):
+        output_index = numpy.memmap(output_index, dtype=INDEX_DTYPE, mode="w+", shape=(grid_rows, grid_cols))
+
+    fill_index = good_mask.size
+    if fill_index >= numpy.iinfo(INDEX_DTYPE).max:
+        raise ValueError("Too many swath points for nearest neighbor index array")
+    sorted_cols, sorted_rows, sorted_indexes = _sorted_swath_points(cols_array, rows_array, good_mask)
+    LOG.debug("Running tiled nearest neighbor search for %d swath points with a tile size of %d",
+              sorted_indexes.size, tile_size)
+
+    d = distance_upper_bound
+    for row_start in range(0, grid_rows, tile_size):
+        row_end = min(row_start + tile_size, grid_rows)
+        # swath points that could be in range of this row band
+        band_start = numpy.searchsorted(sorted_rows, row_start - d, side="left")
+        band_end = numpy.searchsorted(sorted_rows, row_end - 1 + d, side="right")
+        band_cols = sorted_cols[band_start:band_end]
+        band_rows = sorted_rows[band_start:band_end]
+        for col_start in range(0, grid_cols, tile_size):
+            col_end = min(col_start + tile_size, grid_cols)
+            tile_index = output_index[row_start:row_end, col_start:col_end]
+            in_tile = (band_cols >= col_start - d) & (band_cols <= col_end - 1 + d)
+            candidates = numpy.nonzero(in_tile)[0]
+            if not candidates.size:
+                tile_index[:] = fill_index
+                continue
+
+            tree = cKDTree(numpy.column_stack((band_cols[candidates], band_rows[candidates])))
+            tile_y, tile_x = numpy.mgrid[row_start:row_end, col_start:col_end]
+            query_points = numpy.column_stack((tile_x.ravel(), tile_y.ravel()))
+            _, idx = tree.query(query_points, distance_upper_bound=d)
+            # map tree indexes back to the index in the swath
+            found = idx < candidates.size
+            result = numpy.full(idx.shape, fill_index, dtype=INDEX_DTYPE)
+            result[found] = sorted_indexes[band_start + candidates[idx[found]]]
+            tile_index[:] = result.reshape(tile_index.shape)
+
+    return output_index
+
+
+def nearest_gather(index_array, input_array, fill_value, output_array, rows_per_block=TILE_SIZE):
+    """Use the index array from `nearest_index` to resample one product in to `output_array`.
+
+    The same index array can be used for any product with the same geolocation and valid swath mask.
+
+    :param index_array: (grid_rows, grid_cols) array from `nearest_index`
+    :param input_array: Flattened swath data for the product
+    :param fill_value: Value written where no swath point was found
+    :param output_array: (grid_rows, grid_cols) array or memory map to write the resampled data to
+    :returns: Number of valid (non-fill) grid cells
+
+    """
+    values = numpy.append(input_array, input_array.dtype.type(fill_value))
+    is_nan_fill = numpy.isnan(fill_value)
+    valid_points = 0
+    for row_start in range(0, index_array.shape[0], rows_per_block):
+        row_end = row_start + rows_per_block
+        block = values[index_array[row_start:row_end]]
+        output_array[row_start:row_end] = block
+        valid_points += block.size - numpy.count_nonzero(numpy.isnan(block) if is_nan_fill else block == fill_value)
+    return valid_points
@@ -82,21 +82,30 @@ import sys
 import logging
 import numpy
 import os
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import dask
+import dask.array as da
 from satpy import Scene
-from scipy.interpolate.interpnd import _ndim_coords_from_arrays
-from scipy.spatial import cKDTree
 
 from polar2grid.core.containers import GriddedProduct, GriddedScene, SwathScene
 from polar2grid.grids import GridManager
 from polar2grid.remap import fornav
+from polar2grid.remap import nearest
 from polar2grid.remap import ll2cr as ll2cr  # gridinator
+from polar2grid.remap.ll2cr_cache import (LL2CRCache, NearestIndexCache, LL2CR_CACHE_DIR, LL2CR_CACHE_SIZE, parse_size,
+                                          swath_geolocation_hash)
 
 LOG = logging.getLogger(__name__)
 SWATH_USAGE = os.environ.get("P2G_SWATH_USAGE", 0)
 GRID_COVERAGE = os.environ.get("P2G_GRID_COVERAGE", 0.1)
 # resampling 'methods' that accept satpy Scenes instead of P2G scenes
 SATPY_RESAMPLERS = ["sensor"]
+REMAP_WORKERS = int(os.environ.get("P2G_REMAP_WORKERS", 1))
+REMAP_MEMORY_LIMIT = os.environ.get("P2G_REMAP_MEMORY_LIMIT", None)
+LAZY_REMAP = os.environ.get("P2G_LAZY_REMAP", "0").lower() in ("1", "true", "yes")
+# chunk size of lazily remapped gridded data, same default as satpy
+CHUNK_SIZE = int(os.environ.get("PYTROLL_CHUNK_SIZE", 4096))
 
 
 def mask_helper(arr, fill):
@@ -106,6 +115,30 @@ def mask_helper(arr, fill):
         return arr == fill
 
 
+def compute_arrays(*arrays, **kwargs):
+    """Load file, numpy, or dask arrays in to in-memory numpy arrays.
+
+    Dask arrays are computed together so any tasks they share (ex. reading the same file) are only run once.
+    Arrays are only copied when `writable=True` is passed (ex. ll2cr modifies its inputs in place).
+    """
+    writable = kwargs.pop("writable", False)
+    lazy_idx = [idx for idx, arr in enumerate(arrays) if isinstance(arr, da.Array)]
+    results = list(arrays)
+    for idx, arr in zip(lazy_idx, dask.compute(*[arrays[idx] for idx in lazy_idx])):
+        results[idx] = arr
+    if writable:
+        return [numpy.array(arr) for arr in results]
+    return [numpy.asarray(arr) for arr in results]
+
+
+def lazy_array(product, item):
+    """Array `item` of a product as a dask array if it is one, otherwise as a numpy or memory mapped array."""
+    data = product[item]
+    if isinstance(data, da.Array):
+        return data
+    return product.get_data_array(item)
+
+
 def init_worker():
     """Used in multiprocessing to initialize pool workers.
 
@@ -116,19 +149,99 @@ def init_worker():
     signal.signal(signal.SIGINT, signal.SIG_IGN)
 
 
+def estimate_group_memory(group_method, swath_scene, grid_def, group_args):
+    """Rough estimate of the peak number of bytes needed to remap one product group.
+
+    Used to limit how many groups are remapped at the same time when a memory limit is specified. Dynamic grids
+    that haven't had their size determined yet only count the swath arrays.
+    """
+    product_names = group_args[-1]
+    swath_def = swath_scene[product_names[0]]["swath_definition"]
+    swath_size = swath_def["swath_rows"] * swath_def["swath_columns"]
+    grid_size = (grid_def.get("width") or 0) * (grid_def.get("height") or 0)
+    num_products = len(product_names)
+    # ll2cr works on 64-bit column and row arrays
+    geo_bytes = swath_size * 8 * 2
+    if group_method == "_remap_group_ewa":
+        # swath input, output grid, and fornav accumulation and weight grids for every product
+        return geo_bytes + num_products * (swath_size * 4 + grid_size * 4 * 3)
+    # valid swath points sorted for the tiled search plus each product's valid values
+    return geo_bytes + swath_size * 8 * 3 + num_products * swath_size * 4
+
+
+# remapper used by a remap worker process, see `_init_remap_worker`
+_worker_remapper = None
+
+
+def _init_remap_worker(remapper):
+    """Store the remapper used by this remap worker process so it is only sent once per worker."""
+    global _worker_remapper
+    _worker_remapper = remapper
+    init_worker()
+
+
+def _scene_subset(scene, product_names):
+    """Scene with only the products in `product_names` to send to a remap worker.
+
+    Products are added as they are so whether or not their files persist isn't changed.
+    """
+    subset = scene.__class__()
+    dict.update(subset, ((product_name, scene[product_name]) for product_name in product_names))
+    return subset
+
+
+def _remap_groups_worker(group_method, swath_scene, grid_def, groups, kwargs):
+    """Remap product groups sharing the same geolocation in a worker process.
+
+    ll2cr results created for these groups are removed before returning since the parent process doesn't know
+    about them. Results from the parent (ex. the shared dynamic grid ll2cr run) are left for the parent to clean up.
+    """
+    remapper = _worker_remapper
+    inherited_ll2cr = set(remapper.ll2cr_cache.keys())
+    try:
+        return [getattr(remapper, group_method)(swath_scene, grid_def, *group_args, **kwargs)
+                for group_args in groups]
+    finally:
+        for ll2cr_key in list(remapper.ll2cr_cache.keys()):
+            if ll2cr_key not in inherited_ll2cr:
+                cols_fn, rows_fn = remapper.ll2cr_cache.pop(ll2cr_key)
+                remapper._safe_remove(rows_fn, cols_fn)
+
+
 class Remapper(object):
     def __init__(self, grid_configs=None,
-                 overwrite_existing=False, keep_intermediate=False, exit_on_error=True, **kwargs):
+                 overwrite_existing=False, keep_intermediate=False, exit_on_error=True,
+                 ll2cr_cache_dir=LL2CR_CACHE_DIR, ll2cr_cache_size=LL2CR_CACHE_SIZE,
+                 remap_workers=REMAP_WORKERS, remap_memory_limit=REMAP_MEMORY_LIMIT, lazy_remap=LAZY_REMAP,
+                 **kwargs):
         self.grid_manager = GridManager(*(grid_configs or []))
         self.overwrite_existing = overwrite_existing
         self.keep_intermediate = keep_intermediate
         self.exit_on_error = exit_on_error
+        # number of geolocation groups to remap at the same time
+        self.remap_workers = max(int(remap_workers or 1), 1)
+        self.remap_memory_limit = parse_size(remap_memory_limit) if remap_memory_limit else None
+        # keep swath inputs, ll2cr results, and gridded outputs in memory (as dask arrays) instead of binary files
+        self.lazy_remap = lazy_remap
+        if self.lazy_remap and self.keep_intermediate:
+            raise ValueError("Lazy remapping doesn't create intermediate files and can't be used with "
+                             "'keep_intermediate'")
         self.methods = {
             "ewa": self._remap_scene_ewa,
             "nearest": self._remap_scene_nearest,
             "sensor": self._remap_scene_sensor,
         }
         self.ll2cr_cache = {}
+        # geolocation hash of each swath used for persistent cache keys (geo_id -> sha1 hex string)
+        self.geo_hashes = {}
+        # persistent cache of ll2cr and nearest neighbor results between runs
+        self.ll2cr_disk_cache = None
+        self.nearest_disk_cache = None
+        if ll2cr_cache_dir and self.lazy_remap:
+            LOG.debug("Persistent ll2cr cache is file based and is not used for lazy remapping")
+        elif ll2cr_cache_dir:
+            self.ll2cr_disk_cache = LL2CRCache(ll2cr_cache_dir, max_size=ll2cr_cache_size)
+            self.nearest_disk_cache = NearestIndexCache(ll2cr_cache_dir, max_size=ll2cr_cache_size)
 
     def highest_resolution_swath_definition(self, swath_scene_or_product):
         if isinstance(swath_scene_or_product, SwathScene):
@@ -178,6 +291,8 @@ class Remapper(object):
         if (geo_id, grid_name) in self.ll2cr_cache:
             return self.ll2cr_cache[(geo_id, grid_name)]
         LOG.debug("Swath '%s' -> Grid '%s'", geo_id, grid_name)
+        if self.lazy_remap:
+            return self._run_ll2cr_in_memory(swath_definition, grid_definition, swath_usage=swath_usage)
 
         rows_fn = "ll2cr_rows_%s_%s.dat" % (grid_name, geo_id)
         cols_fn = "ll2cr_cols_%s_%s.dat" % (grid_name, geo_id)
@@ -196,9 +311,71 @@ class Remapper(object):
                 raise RuntimeError("Intermediate remapping file already exists: %s" % (cols_fn,))
             else:
                 LOG.warning("Intermediate remapping file already exists, will overwrite: %s", cols_fn)
+
+        cache_key = None
+        cache_info = None
+        if self.ll2cr_disk_cache is not None:
+            # the working files may be linked to a cache entry so they must never be written to in place
+            for fp in (rows_fn, cols_fn):
+                if os.path.isfile(fp):
+                    os.remove(fp)
+            cache_key = self.ll2cr_disk_cache.get_key(swath_definition, grid_definition,
+                                                      swath_hash=self._geolocation_hash(swath_definition))
+            cache_info = self.ll2cr_disk_cache.get(cache_key, cols_fn, rows_fn)
+
+        if cache_info is not None:
+            LOG.debug("Using cached ll2cr results for %s -> %s (%s)", geo_id, grid_name, cache_key)
+            # fill in any dynamic grid parameters the same way ll2cr would have
+            for k in ("origin_x", "origin_y", "width", "height"):
+                grid_definition[k] = cache_info[k]
+            points_in_grid = cache_info["points_in_grid"]
+        else:
+            try:
+                rows_arr = swath_definition.copy_latitude_array(filename=rows_fn, read_only=False)
+                cols_arr = swath_definition.copy_longitude_array(filename=cols_fn, read_only=False)
+                points_in_grid, _, _ = ll2cr.ll2cr(cols_arr, rows_arr, grid_definition,
+                                                   fill_in=swath_definition["fill_value"])
+                grid_str = str(grid_definition).replace("\n", "\n\t")
+                LOG.debug("Grid information:\n\t%s", grid_str)
+                # make sure the results are on disk before anything else uses the files
+                cols_arr.flush()
+                rows_arr.flush()
+                del cols_arr, rows_arr
+            except (RuntimeError, ValueError, OSError):
+                LOG.error("Unexpected error encountered during ll2cr gridding for %s -> %s", geo_id, grid_name)
+                LOG.debug("ll2cr error exception: ", exc_info=True)
+                self._safe_remove(rows_fn, cols_fn)
+                raise
+
+            if cache_key is not None:
+                self.ll2cr_disk_cache.put(cache_key, cols_fn, rows_fn, grid_definition, points_in_grid,
+                                          swath_name=geo_id)
+
+        # if 5% of the grid will have data in it then it fits
+        fraction_in = points_in_grid / float(swath_definition["swath_rows"] * swath_definition["swath_columns"])
+        swath_used = fraction_in > swath_usage
+        if not swath_used:
+            self._safe_remove(rows_fn, cols_fn)
+            LOG.error("Data does not fit in grid %s because it only %f%% of the swath is used" % (grid_name, fraction_in * 100))
+            raise RuntimeError("Data does not fit in grid %s" % (grid_name,))
+        else:
+            LOG.debug("Data fits in grid %s and uses %f%% of the swath", grid_name, fraction_in * 100)
+
+        self.ll2cr_cache[(geo_id, grid_name)] = (cols_fn, rows_fn)
+        return cols_fn, rows_fn
+
+    def _run_ll2cr_in_memory(self, swath_definition, grid_definition, swath_usage=SWATH_USAGE):
+        """Run ll2cr on in-memory copies of the geolocation arrays for lazy remapping.
+
+        :returns: (columns array, rows array)
+        """
+        geo_id = swath_definition["swath_name"]
+        grid_name = grid_definition["grid_name"]
         try:
-            rows_arr = swath_definition.copy_latitude_array(filename=rows_fn, read_only=False)
-            cols_arr = swath_definition.copy_longitude_array(filename=cols_fn, read_only=False)
+            cols_arr, rows_arr = compute_arrays(lazy_array(swath_definition, "longitude"),
+                                                lazy_array(swath_definition, "latitude"), writable=True)
+            cols_arr = cols_arr.reshape((swath_definition["swath_rows"], swath_definition["swath_columns"]))
+            rows_arr = rows_arr.reshape(cols_arr.shape)
             points_in_grid, _, _ = ll2cr.ll2cr(cols_arr, rows_arr, grid_definition,
                                                fill_in=swath_definition["fill_value"])
             grid_str = str(grid_definition).replace("\n", "\n\t")
@@ -206,21 +383,16 @@ class Remapper(object):
         except (RuntimeError, ValueError, OSError):
             LOG.error("Unexpected error encountered during ll2cr gridding for %s -> %s", geo_id, grid_name)
             LOG.debug("ll2cr error exception: ", exc_info=True)
-            self._safe_remove(rows_fn, cols_fn)
             raise
 
-        # if 5% of the grid will have data in it then it fits
-        fraction_in = points_in_grid / float(rows_arr.size)
-        swath_used = fraction_in > swath_usage
-        if not swath_used:
-            self._safe_remove(rows_fn, cols_fn)
+        fraction_in = points_in_grid / float(cols_arr.size)
+        if not fraction_in > swath_usage:
             LOG.error("Data does not fit in grid %s because it only %f%% of the swath is used" % (grid_name, fraction_in * 100))
             raise RuntimeError("Data does not fit in grid %s" % (grid_name,))
-        else:
-            LOG.debug("Data fits in grid %s and uses %f%% of the swath", grid_name, fraction_in * 100)
+        LOG.debug("Data fits in grid %s and uses %f%% of the swath", grid_name, fraction_in * 100)
 
-        self.ll2cr_cache[(geo_id, grid_name)] = (cols_fn, rows_fn)
-        return cols_fn, rows_fn
+        self.ll2cr_cache[(geo_id, grid_name)] = (cols_arr, rows_arr)
+        return cols_arr, rows_arr
 
     def _add_prefix(self, prefix, *filepaths):
         return [os.path.join(os.path.dirname(x), prefix + os.path.basename(x)) for x in filepaths]
@@ -228,7 +400,8 @@ class Remapper(object):
     def _safe_remove(self, *filepaths):
         if not self.keep_intermediate:
             for fp in filepaths:
-                if os.path.isfile(fp):
+                # in-memory arrays (lazy remapping) have nothing to remove
+                if isinstance(fp, str) and os.path.isfile(fp):
                     try:
                         LOG.debug("Removing intermediate file '%s'...", fp)
                         os.remove(fp)
@@ -236,13 +409,81 @@ class Remapper(object):
                         LOG.warning("Could not remove intermediate files that aren't needed anymore.")
                         LOG.debug("Intermediate output file remove exception:", exc_info=True)
 
+    def _geolocation_hash(self, swath_definition):
+        """Hash of the swath's geolocation data for persistent cache keys, computed once per swath.
+        """
+        geo_id = swath_definition["swath_name"]
+        if geo_id not in self.geo_hashes:
+            self.geo_hashes[geo_id] = swath_geolocation_hash(swath_definition)
+        return self.geo_hashes[geo_id]
+
     def _clear_ll2cr_cache(self):
         # Remove ll2cr files now that we are done with them
         for cols_fn, rows_fn in self.ll2cr_cache.values():
             self._safe_remove(rows_fn, cols_fn)
         self.ll2cr_cache = {}
-
-    def _remap_scene_ewa(self, swath_scene, grid_def, share_dynamic_grids=True, **kwargs):
+        # the next scene may reuse swath names for different geolocation
+        self.geo_hashes = {}
+
+    def _run_product_groups(self, group_method, swath_scene, grid_def, product_groups, **kwargs):
+        """Run `group_method` for every product group and return the results in the same order as the groups.
+
+        Groups sharing the same geolocation are always processed together by the same worker so their ll2cr
+        results can be shared and their intermediate files never collide. If more than one remap worker was
+        requested the geolocation groups are processed concurrently in separate processes with no more than
+        `remap_workers` at a time and, if a memory limit was specified, no more than would fit in the limit
+        according to `estimate_group_memory`. Workers get a copy of this remapper once when they start and only
+        the products of the groups they are remapping after that.
+        """
+        # group products by geolocation, keeping the original group order
+        geo_units = OrderedDict()
+        for group_idx, (geo_id, group_args) in enumerate(product_groups):
+            geo_units.setdefault(geo_id, []).append((group_idx, group_args))
+
+        results = [None] * len(product_groups)
+        if self.lazy_remap and self.remap_workers > 1:
+            # dask graphs and in-memory results would have to be pickled to and from the workers
+            LOG.debug("Remap workers are not used when remapping lazily")
+        if self.lazy_remap or self.remap_workers <= 1 or len(geo_units) <= 1:
+            for unit in geo_units.values():
+                for group_idx, group_args in unit:
+                    results[group_idx] = getattr(self, group_method)(swath_scene, grid_def, *group_args, **kwargs)
+            return results
+
+        estimates = [sum(estimate_group_memory(group_method, swath_scene, grid_def, group_args)
+                         for _, group_args in unit) for unit in geo_units.values()]
+        pending = list(zip(geo_units.values(), estimates))
+        running = {}
+        memory_used = 0
+        num_workers = min(self.remap_workers, len(geo_units))
+        LOG.debug("Remapping %d geolocation groups with %d workers", len(geo_units), num_workers)
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_remap_worker,
+                                 initargs=(self,)) as executor:
+            while pending or running:
+                while pending and len(running) < num_workers:
+                    unit, estimate = pending[0]
+                    if running and self.remap_memory_limit is not None and \
+                            memory_used + estimate > self.remap_memory_limit:
+                        LOG.debug("Waiting for running remap groups to finish to stay under the memory limit")
+                        break
+                    pending.pop(0)
+                    unit_groups = [group_args for _, group_args in unit]
+                    unit_scene = _scene_subset(swath_scene, set(product_name for group_args in unit_groups
+                                                                for product_name in group_args[-1]))
+                    future = executor.submit(_remap_groups_worker, group_method, unit_scene, grid_def, unit_groups,
+                                             kwargs)
+                    running[future] = (unit, estimate)
+                    memory_used += estimate
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    unit, estimate = running.pop(future)
+                    memory_used -= estimate
+                    for (group_idx, _), group_result in zip(unit, future.result()):
+                        results[group_idx] = group_result
+        return results
+
+    def _remap_scene_ewa(self, swath_scene, grid_def, **kwargs):
         # TODO: Make methods more flexible than just a function call
         gridded_scene = GriddedScene()
         grid_name = grid_def["grid_name"]
@@ -254,122 +495,33 @@ class Remapper(object):
             is_cat = swath_product.get('flag_meanings') is not None
             geo_id = swath_def["swath_name"]
             product_groups[(is_cat, geo_id)].append(product_name)
+        product_groups = [(geo_id, (is_cat, product_names))
+                          for (is_cat, geo_id), product_names in product_groups.items()]
 
-        # keep a copy of the original grid definition
-        # if a shared grid definition isn't used then
-        # we start from the original
-        orig_grid_def = grid_def
-        fornav_filepaths = None  # just in case the loop isn't entered
-        for (is_cat, geo_id), product_names in product_groups.items():
-            try:
-                LOG.debug("Running ll2cr on the geolocation data for the following products:\n\t%s", "\n\t".join(sorted(product_names)))
-                swath_def = swath_scene[product_names[0]]["swath_definition"]
-                if not share_dynamic_grids:
-                    grid_def = orig_grid_def.copy()
-                cols_fn, rows_fn = self.run_ll2cr(swath_def, grid_def,
-                                                  swath_usage=kwargs.get("swath_usage", SWATH_USAGE))
-            except (RuntimeError, ValueError, OSError):
-                LOG.error("Remapping error")
-                if self.exit_on_error:
-                    raise
-                continue
-
-            # Run fornav for all of the products at once
-            LOG.debug("Running fornav for the following products:\n\t%s", "\n\t".join(sorted(product_names)))
-            # XXX: May have to do something smarter if there are float products and integer products together (is_category property on SwathProduct?)
-            product_filepaths = list(swath_scene.get_data_filepaths(product_names))
-            fornav_filepaths = self._add_prefix("grid_%s_" % (grid_name,), *product_filepaths)
-            for fp in fornav_filepaths:
-                if os.path.isfile(fp):
-                    if not self.overwrite_existing:
-                        LOG.error("Intermediate remapping file already exists: %s" % (fp,))
-                        raise RuntimeError("Intermediate remapping file already exists: %s" % (fp,))
-                    else:
-                        LOG.warning("Intermediate remapping file already exists, will overwrite: %s", fp)
-
-            rows_per_scan = swath_def.get("rows_per_scan", 0)
-            if rows_per_scan < 2:
-                LOG.warning("Data has less than 2 rows per scan, this is not optimal for the EWA resampling algorithm. All rows will be used as one scan")
-                rows_per_scan = swath_def['swath_rows']
-            edge_res = swath_def.get("limb_resolution", None)
-            fornav_D = kwargs.get("fornav_D", None)
-            if fornav_D is None:
-                if edge_res is not None:
-                    if grid_def.is_latlong:
-                        fornav_D = (edge_res / 2) / grid_def.cell_width_meters
-                    else:
-                        fornav_D = (edge_res / 2) / grid_def["cell_width"]
-                    LOG.debug("Fornav 'D' option dynamically set to %f", fornav_D)
-                else:
-                    fornav_D = 10.0
-
-            mwm = kwargs.get('maximum_weight_mode', False)
-            if is_cat and not mwm:
-                LOG.debug("Turning on maximum weight mode in EWA resampling for category products")
-                mwm = True
+        try:
+            results = self._run_product_groups("_remap_group_ewa", swath_scene, grid_def, product_groups, **kwargs)
+        except (RuntimeError, ValueError, OSError, KeyError):
+            self._clear_ll2cr_cache()
+            raise
 
-            try:
-                # fornav.ms2gt_fornav(
-                #     len(product_filepaths),
-                #     swath_def["swath_columns"],
-                #     swath_def["swath_rows"]/rows_per_scan,
-                #     rows_per_scan,
-                #     cols_fn,
-                #     rows_fn,
-                #     product_filepaths,
-                #     grid_def["width"],
-                #     grid_def["height"],
-                #     fornav_filepaths,
-                #     swath_data_type_1="f4",
-                #     swath_fill_1=swath_scene.get_fill_value(product_names),
-                #     grid_fill_1=numpy.nan,
-                #     weight_delta_max=fornav_D,
-                #     weight_distance_max=kwargs.get("fornav_d", None),
-                #     maximum_weight_mode=kwargs.get("maximum_weight_mode", None),
-                #     start_scan=(0, 0),
-                # )
-                cols_array = numpy.memmap(cols_fn, dtype=swath_def['data_type'],
-                                          mode='r', shape=(swath_def["swath_rows"], swath_def["swath_columns"]))
-                rows_array = numpy.memmap(rows_fn, dtype=swath_def['data_type'],
-                                          mode='r', shape=(swath_def["swath_rows"], swath_def["swath_columns"]))
-                # Assumed that all share the same fill value and data type
-                input_dtype = [swath_scene[pn]["data_type"] for pn in product_names]
-                input_fill = [swath_scene[pn]["fill_value"] for pn in product_names]
-                LOG.debug("Running fornav with D={} and d={}".format(fornav_D, kwargs.get('fornav_d', 1.0)))
-                valid_list = fornav.fornav(cols_array,
-                                           rows_array,
-                                           rows_per_scan,
-                                           product_filepaths,
-                                           input_dtype=input_dtype,
-                                           input_fill=input_fill,
-                                           output_arrays=fornav_filepaths,
-                                           grid_cols=grid_def["width"],
-                                           grid_rows=grid_def["height"],
-                                           weight_delta_max=fornav_D,
-                                           weight_distance_max=kwargs.get("fornav_d", 1.0),
-                                           maximum_weight_mode=mwm,
-                                           use_group_size=True
-                                           )
-            except (RuntimeError, ValueError, OSError, KeyError):
-                LOG.debug("Remapping exception: ", exc_info=True)
-                LOG.error("Remapping error")
-                self._safe_remove(*fornav_filepaths)
-                if self.exit_on_error:
-                    self._clear_ll2cr_cache()
-                    raise
+        fornav_filepaths = []
+        for group_result in results:
+            if group_result is None:
+                # group was skipped because of an error
                 continue
-
+            group_grid_def, product_results = group_result
             # Give the gridded product ownership of the remapped data
-            for product_name, fornav_fp, valid_points in zip(product_names, fornav_filepaths, valid_list):
+            for product_name, fornav_fp, valid_points in product_results:
+                fornav_filepaths.append(fornav_fp)
                 swath_product = swath_scene[product_name]
                 gridded_product = GriddedProduct()
                 gridded_product.from_swath_product(swath_product)
-                gridded_product["grid_definition"] = grid_def
+                gridded_product["grid_definition"] = group_grid_def
                 gridded_product["fill_value"] = numpy.nan
                 gridded_product["grid_data"] = fornav_fp
 
                 grid_coverage = kwargs.get("grid_coverage", GRID_COVERAGE)
-                grid_covered_ratio = valid_points / float(grid_def["width"] * grid_def["height"])
+                grid_covered_ratio = valid_points / float(group_grid_def["width"] * group_grid_def["height"])
                 grid_covered = grid_covered_ratio > grid_coverage
                 if not grid_covered:
                     msg = "EWA resampling only found %f%% of the grid covered (need %f%%) for %s" % (grid_covered_ratio * 100, grid_coverage * 100, product_name)
@@ -386,7 +538,105 @@ class Remapper(object):
 
         return gridded_scene
 
-    def _remap_scene_nearest(self, swath_scene, grid_def, share_dynamic_grids=True, share_remap_mask=True, **kwargs):
+    def _remap_group_ewa(self, swath_scene, grid_def, is_cat, product_names, share_dynamic_grids=True, **kwargs):
+        """Run ll2cr and fornav for one group of products sharing the same geolocation.
+
+        :returns: (grid definition, list of (product name, fornav filepath, valid points)) or None if skipped
+        """
+        grid_name = grid_def["grid_name"]
+        try:
+            LOG.debug("Running ll2cr on the geolocation data for the following products:\n\t%s", "\n\t".join(sorted(product_names)))
+            swath_def = swath_scene[product_names[0]]["swath_definition"]
+            if not share_dynamic_grids:
+                # start from the original grid definition
+                grid_def = grid_def.copy()
+            cols_fn, rows_fn = self.run_ll2cr(swath_def, grid_def,
+                                              swath_usage=kwargs.get("swath_usage", SWATH_USAGE))
+        except (RuntimeError, ValueError, OSError):
+            LOG.error("Remapping error")
+            if self.exit_on_error:
+                raise
+            return None
+
+        # Run fornav for all of the products at once
+        LOG.debug("Running fornav for the following products:\n\t%s", "\n\t".join(sorted(product_names)))
+        # XXX: May have to do something smarter if there are float products and integer products together (is_category property on SwathProduct?)
+        if self.lazy_remap:
+            product_filepaths = compute_arrays(*(lazy_array(swath_scene[pn], "swath_data") for pn in product_names))
+            # fornav creates in-memory output arrays when none are provided
+            fornav_filepaths = None
+        else:
+            product_filepaths = list(swath_scene.get_data_filepaths(product_names))
+            fornav_filepaths = self._add_prefix("grid_%s_" % (grid_name,), *product_filepaths)
+            for fp in fornav_filepaths:
+                if os.path.isfile(fp):
+                    if not self.overwrite_existing:
+                        LOG.error("Intermediate remapping file already exists: %s" % (fp,))
+                        raise RuntimeError("Intermediate remapping file already exists: %s" % (fp,))
+                    else:
+                        LOG.warning("Intermediate remapping file already exists, will overwrite: %s", fp)
+
+        rows_per_scan = swath_def.get("rows_per_scan", 0)
+        if rows_per_scan < 2:
+            LOG.warning("Data has less than 2 rows per scan, this is not optimal for the EWA resampling algorithm. All rows will be used as one scan")
+            rows_per_scan = swath_def['swath_rows']
+        edge_res = swath_def.get("limb_resolution", None)
+        fornav_D = kwargs.get("fornav_D", None)
+        if fornav_D is None:
+            if edge_res is not None:
+                if grid_def.is_latlong:
+                    fornav_D = (edge_res / 2) / grid_def.cell_width_meters
+                else:
+                    fornav_D = (edge_res / 2) / grid_def["cell_width"]
+                LOG.debug("Fornav 'D' option dynamically set to %f", fornav_D)
+            else:
+                fornav_D = 10.0
+
+        mwm = kwargs.get('maximum_weight_mode', False)
+        if is_cat and not mwm:
+            LOG.debug("Turning on maximum weight mode in EWA resampling for category products")
+            mwm = True
+
+        try:
+            if self.lazy_remap:
+                cols_array, rows_array = cols_fn, rows_fn
+            else:
+                cols_array = numpy.memmap(cols_fn, dtype=swath_def['data_type'],
+                                          mode='r', shape=(swath_def["swath_rows"], swath_def["swath_columns"]))
+                rows_array = numpy.memmap(rows_fn, dtype=swath_def['data_type'],
+                                          mode='r', shape=(swath_def["swath_rows"], swath_def["swath_columns"]))
+            # Assumed that all share the same fill value and data type
+            input_dtype = [swath_scene[pn]["data_type"] for pn in product_names]
+            input_fill = [swath_scene[pn]["fill_value"] for pn in product_names]
+            LOG.debug("Running fornav with D={} and d={}".format(fornav_D, kwargs.get('fornav_d', 1.0)))
+            valid_list = fornav.fornav(cols_array,
+                                       rows_array,
+                                       rows_per_scan,
+                                       product_filepaths,
+                                       input_dtype=input_dtype,
+                                       input_fill=input_fill,
+                                       output_arrays=fornav_filepaths,
+                                       grid_cols=grid_def["width"],
+                                       grid_rows=grid_def["height"],
+                                       weight_delta_max=fornav_D,
+                                       weight_distance_max=kwargs.get("fornav_d", 1.0),
+                                       maximum_weight_mode=mwm,
+                                       use_group_size=True
+                                       )
+        except (RuntimeError, ValueError, OSError, KeyError):
+            LOG.debug("Remapping exception: ", exc_info=True)
+            LOG.error("Remapping error")
+            self._safe_remove(*(fornav_filepaths or []))
+            if self.exit_on_error:
+                raise
+            return None
+
+        if self.lazy_remap:
+            valid_list, fornav_arrays = valid_list
+            fornav_filepaths = [da.from_array(arr, chunks=CHUNK_SIZE, name=False) for arr in fornav_arrays]
+        return grid_def, list(zip(product_names, fornav_filepaths, valid_list))
+
+    def _remap_scene_nearest(self, swath_scene, grid_def, **kwargs):
         # TODO: Make methods more flexible than just a function call
         gridded_scene = GriddedScene()
         grid_name = grid_def["grid_name"]
@@ -397,122 +647,197 @@ class Remapper(object):
             swath_def = swath_product["swath_definition"]
             geo_id = swath_def["swath_name"]
             product_groups[geo_id].append(product_name)
+        product_groups = [(geo_id, (product_names,)) for geo_id, product_names in product_groups.items()]
+
+        try:
+            results = self._run_product_groups("_remap_group_nearest", swath_scene, grid_def, product_groups,
+                                               **kwargs)
+        except (RuntimeError, ValueError, OSError, KeyError):
+            self._clear_ll2cr_cache()
+            raise
 
         grid_coverage = kwargs.get("grid_coverage", GRID_COVERAGE)
-        orig_grid_def = grid_def
-        for geo_id, product_names in product_groups.items():
-            pp_names = "\n\t".join(product_names)
-            LOG.debug("Running ll2cr on the geolocation data for the following products:\n\t%s", pp_names)
-            LOG.debug("Swath name: %s", geo_id)
-
-            # TODO: Move into it's own function if this gets complicated
-            # TODO: Add some multiprocessing
-            try:
-                swath_def = swath_scene[product_names[0]]["swath_definition"]
-                if not share_dynamic_grids:
-                    grid_def = orig_grid_def.copy()
-                cols_fn, rows_fn = self.run_ll2cr(swath_def, grid_def)
-            except (RuntimeError, ValueError, OSError, KeyError):
-                LOG.error("Remapping error")
-                if self.exit_on_error:
-                    raise
+        for group_result in results:
+            if group_result is None:
+                # group was skipped because of an error
                 continue
+            group_grid_def, product_results = group_result
+            for product_name, output_fn, fill_value, valid_points in product_results:
+                # Give the gridded product ownership of the remapped data
+                swath_product = swath_scene[product_name]
+                gridded_product = GriddedProduct()
+                gridded_product.from_swath_product(swath_product)
+                gridded_product["grid_definition"] = group_grid_def
+                gridded_product["fill_value"] = fill_value
+                gridded_product["grid_data"] = output_fn
+
+                # Check grid coverage
+                grid_covered_ratio = valid_points / float(group_grid_def["width"] * group_grid_def["height"])
+                grid_covered = grid_covered_ratio > grid_coverage
+                if not grid_covered:
+                    msg = "Nearest neighbor resampling only found %f%% of the grid covered (need %f%%) for %s" % (grid_covered_ratio * 100, grid_coverage * 100, product_name)
+                    LOG.warning(msg)
+                    continue
+                LOG.debug("Nearest neighbor resampling found %f%% of the grid covered for %s" % (grid_covered_ratio * 100, product_name))
+
+                gridded_scene[product_name] = gridded_product
 
-            LOG.debug("Running nearest neighbor for the following products:\n\t%s", "\n\t".join(product_names))
-            edge_res = swath_def.get("limb_resolution", None)
-            if kwargs.get("distance_upper_bound", None) is None:
-                if edge_res is not None:
-                    if grid_def.is_latlong:
-                        distance_upper_bound = (edge_res / 2) / grid_def.cell_width_meters
+        # Remove ll2cr files now that we are done with them
+        self._clear_ll2cr_cache()
+
+        if not gridded_scene:
+            raise RuntimeError("Nearest neighbor resampling could not remap any of the data to grid '%s'" % (grid_name,))
+
+        return gridded_scene
+
+    def _remap_group_nearest(self, swath_scene, grid_def, product_names, share_dynamic_grids=True,
+                             share_remap_mask=True, **kwargs):
+        """Run ll2cr and nearest neighbor resampling for one group of products sharing the same geolocation.
+
+        :returns: (grid definition, list of (product name, output filepath, fill value, valid points)) or None if skipped
+        """
+        grid_name = grid_def["grid_name"]
+        geo_id = swath_scene[product_names[0]]["swath_definition"]["swath_name"]
+        pp_names = "\n\t".join(product_names)
+        LOG.debug("Running ll2cr on the geolocation data for the following products:\n\t%s", pp_names)
+        LOG.debug("Swath name: %s", geo_id)
+
+        try:
+            swath_def = swath_scene[product_names[0]]["swath_definition"]
+            if not share_dynamic_grids:
+                # start from the original grid definition
+                grid_def = grid_def.copy()
+            cols_fn, rows_fn = self.run_ll2cr(swath_def, grid_def)
+        except (RuntimeError, ValueError, OSError, KeyError):
+            LOG.error("Remapping error")
+            if self.exit_on_error:
+                raise
+            return None
+
+        LOG.debug("Running nearest neighbor for the following products:\n\t%s", "\n\t".join(product_names))
+        edge_res = swath_def.get("limb_resolution", None)
+        distance_upper_bound = kwargs.get("distance_upper_bound", None)
+        if distance_upper_bound is None:
+            if edge_res is not None:
+                if grid_def.is_latlong:
+                    distance_upper_bound = (edge_res / 2) / grid_def.cell_width_meters
+                else:
+                    distance_upper_bound = (edge_res / 2) / grid_def["cell_width"]
+                LOG.debug("Distance upper bound dynamically set to %f", distance_upper_bound)
+            else:
+                distance_upper_bound = 3.0
+
+        if self.lazy_remap:
+            # the index and swath data are kept in memory
+            index_fn = None
+            swath_arrays = compute_arrays(*(lazy_array(swath_scene[pn], "swath_data") for pn in product_names))
+            swath_arrays = dict(zip(product_names, swath_arrays))
+        else:
+            index_fn = "nn_index_%s_%s.dat" % (grid_name, geo_id)
+        try:
+            # we need flattened versions of these
+            shape = (swath_def["swath_rows"] * swath_def["swath_columns"],)
+            if self.lazy_remap:
+                cols_array = cols_fn.ravel()
+                rows_array = rows_fn.ravel()
+            else:
+                cols_array = numpy.memmap(cols_fn, shape=shape, dtype=swath_def["data_type"], mode="r")
+                rows_array = numpy.memmap(rows_fn, shape=shape, dtype=swath_def["data_type"], mode="r")
+            good_mask = ~mask_helper(cols_array, swath_def["fill_value"])
+            if share_remap_mask:
+                for product_name in product_names:
+                    LOG.debug("Combining data masks before building KDTree for nearest neighbor: %s", product_name)
+                    if self.lazy_remap:
+                        good_mask &= ~mask_helper(swath_arrays[product_name].ravel(),
+                                                  swath_scene[product_name]["fill_value"])
                     else:
-                        distance_upper_bound = (edge_res / 2) / grid_def["cell_width"]
-                    LOG.debug("Distance upper bound dynamically set to %f", distance_upper_bound)
+                        good_mask &= ~swath_scene[product_name].get_data_mask().ravel()
+            index_array = self._nearest_index(swath_def, grid_def, cols_array, rows_array, good_mask,
+                                              distance_upper_bound, index_fn,
+                                              tile_size=kwargs.get("nearest_tile_size", nearest.TILE_SIZE))
+        except (RuntimeError, ValueError, OSError, KeyError):
+            LOG.debug("Remapping exception: ", exc_info=True)
+            LOG.error("Remapping error")
+            self._safe_remove(index_fn)
+            if self.exit_on_error:
+                raise
+            return None
+
+        if self.lazy_remap:
+            output_filepaths = [None] * len(product_names)
+        else:
+            product_filepaths = swath_scene.get_data_filepaths(product_names)
+            output_filepaths = self._add_prefix("grid_%s_" % (grid_name,), *product_filepaths)
+
+        # Prepare the products
+        product_results = []
+        for product_name, output_fn in zip(product_names, output_filepaths):
+            LOG.debug("Running nearest neighbor on '%s' with search distance %f", product_name, distance_upper_bound)
+            if output_fn is not None and os.path.isfile(output_fn):
+                if not self.overwrite_existing:
+                    LOG.error("Intermediate remapping file already exists: %s" % (output_fn,))
+                    raise RuntimeError("Intermediate remapping file already exists: %s" % (output_fn,))
                 else:
-                    distance_upper_bound = 3.0
-                kwargs["distance_upper_bound"] = distance_upper_bound
+                    LOG.warning("Intermediate remapping file already exists, will overwrite: %s", output_fn)
 
             try:
-                grid_x, grid_y = numpy.mgrid[:grid_def["height"], :grid_def["width"]]
-                # we need flattened versions of these
-                shape = (swath_def["swath_rows"] * swath_def["swath_columns"],)
-                cols_array = numpy.memmap(cols_fn, shape=shape, dtype=swath_def["data_type"])
-                rows_array = numpy.memmap(rows_fn, shape=shape, dtype=swath_def["data_type"])
-                good_mask = ~mask_helper(cols_array, swath_def["fill_value"])
-                if share_remap_mask:
-                    for product_name in product_names:
-                        LOG.debug("Combining data masks before building KDTree for nearest neighbor: %s", product_name)
-                        good_mask &= ~swath_scene[product_name].get_data_mask().ravel()
-                x = _ndim_coords_from_arrays((cols_array[good_mask], rows_array[good_mask]))
-                xi = _ndim_coords_from_arrays((grid_y, grid_x))
-                dist, i = cKDTree(x).query(xi, distance_upper_bound=kwargs["distance_upper_bound"])
+                fill_value = swath_scene[product_name]['fill_value']
+                if self.lazy_remap:
+                    image_array = swath_arrays.pop(product_name).ravel()
+                    output_array = numpy.empty((grid_def["height"], grid_def["width"]), dtype=image_array.dtype)
+                    valid_points = nearest.nearest_gather(index_array, image_array, fill_value, output_array)
+                    output_fn = da.from_array(output_array, chunks=CHUNK_SIZE, name=False)
+                else:
+                    image_array = swath_scene[product_name].get_data_array().ravel()
+                    output_array = numpy.memmap(output_fn, dtype=image_array.dtype, mode="w+",
+                                                shape=(grid_def["height"], grid_def["width"]))
+                    valid_points = nearest.nearest_gather(index_array, image_array, fill_value, output_array)
+                    output_array.flush()
+                product_results.append((product_name, output_fn, fill_value, valid_points))
+
+                # hopefully force garbage collection
+                del output_array
             except (RuntimeError, ValueError, OSError, KeyError):
                 LOG.debug("Remapping exception: ", exc_info=True)
                 LOG.error("Remapping error")
+                self._safe_remove(output_fn)
                 if self.exit_on_error:
-                    self._clear_ll2cr_cache()
+                    del index_array
+                    self._safe_remove(index_fn)
                     raise
                 continue
 
-            product_filepaths = swath_scene.get_data_filepaths(product_names)
-            output_filepaths = self._add_prefix("grid_%s_" % (grid_name,), *product_filepaths)
-
-            # Prepare the products
-            for product_name, output_fn in zip(product_names, output_filepaths):
-                LOG.debug("Running nearest neighbor on '%s' with search distance %f", product_name, kwargs["distance_upper_bound"])
-                if os.path.isfile(output_fn):
-                    if not self.overwrite_existing:
-                        LOG.error("Intermediate remapping file already exists: %s" % (output_fn,))
-                        raise RuntimeError("Intermediate remapping file already exists: %s" % (output_fn,))
-                    else:
-                        LOG.warning("Intermediate remapping file already exists, will overwrite: %s", output_fn)
-
-                try:
-                    image_array = swath_scene[product_name].get_data_array().ravel()
-                    fill_value = swath_scene[product_name]['fill_value']
-                    values = numpy.append(image_array[good_mask], image_array.dtype.type(fill_value))
-                    output_array = values[i]
-                    output_array.tofile(output_fn)
-
-                    # Give the gridded product ownership of the remapped data
-                    swath_product = swath_scene[product_name]
-                    gridded_product = GriddedProduct()
-                    gridded_product.from_swath_product(swath_product)
-                    gridded_product["grid_definition"] = grid_def
-                    gridded_product["fill_value"] = fill_value
-                    gridded_product["grid_data"] = output_fn
-
-                    # Check grid coverage
-                    valid_points = numpy.count_nonzero(~gridded_product.get_data_mask())
-                    grid_covered_ratio = valid_points / float(grid_def["width"] * grid_def["height"])
-                    grid_covered = grid_covered_ratio > grid_coverage
-                    if not grid_covered:
-                        msg = "Nearest neighbor resampling only found %f%% of the grid covered (need %f%%) for %s" % (grid_covered_ratio * 100, grid_coverage * 100, product_name)
-                        LOG.warning(msg)
-                        continue
-                    LOG.debug("Nearest neighbor resampling found %f%% of the grid covered for %s" % (grid_covered_ratio * 100, product_name))
-
-                    gridded_scene[product_name] = gridded_product
-
-                    # hopefully force garbage collection
-                    del output_array
-                except (RuntimeError, ValueError, OSError, KeyError):
-                    LOG.debug("Remapping exception: ", exc_info=True)
-                    LOG.error("Remapping error")
-                    self._safe_remove(output_fn)
-                    if self.exit_on_error:
-                        self._clear_ll2cr_cache()
-                        raise
-                    continue
-
-                LOG.debug("Done running nearest neighbor on '%s'", product_name)
-
-        # Remove ll2cr files now that we are done with them
-        self._clear_ll2cr_cache()
-
-        if not gridded_scene:
-            raise RuntimeError("Nearest neighbor resampling could not remap any of the data to grid '%s'" % (grid_name,))
-
-        return gridded_scene
+            LOG.debug("Done running nearest neighbor on '%s'", product_name)
+
+        del index_array
+        self._safe_remove(index_fn)
+        return grid_def, product_results
+
+    def _nearest_index(self, swath_def, grid_def, cols_array, rows_array, good_mask, distance_upper_bound,
+                       index_fn, tile_size=nearest.TILE_SIZE):
+        """Get the nearest neighbor index array for a swath, from the persistent cache if possible.
+        """
+        shape = (grid_def["height"], grid_def["width"])
+        if self.nearest_disk_cache is None:
+            return nearest.nearest_index(cols_array, rows_array, good_mask, shape[0], shape[1],
+                                         distance_upper_bound, output_index=index_fn, tile_size=tile_size)
+
+        # the index file may be linked to a cache entry so it must never be written to in place
+        if os.path.isfile(index_fn):
+            os.remove(index_fn)
+        cache_key = self.nearest_disk_cache.get_key(swath_def, grid_def, distance_upper_bound, good_mask,
+                                                    swath_hash=self._geolocation_hash(swath_def))
+        if self.nearest_disk_cache.get(cache_key, index_fn) is not None:
+            LOG.debug("Using cached nearest neighbor index for %s -> %s (%s)",
+                      swath_def["swath_name"], grid_def["grid_name"], cache_key)
+            return numpy.memmap(index_fn, dtype=nearest.INDEX_DTYPE, mode="r", shape=shape)
+
+        index_array = nearest.nearest_index(cols_array, rows_array, good_mask, shape[0], shape[1],
+                                            distance_upper_bound, output_index=index_fn, tile_size=tile_size)
+        index_array.flush()
+        self.nearest_disk_cache.put(cache_key, index_fn, grid_def, distance_upper_bound,
+                                    swath_name=swath_def["swath_name"])
+        return index_array
 
     def _remap_scene_sensor(self, swath_scene, grid_def, **kwargs):
         if not isinstance(swath_scene, Scene):
@@ -539,6 +864,21 @@ def add_remap_argument_groups(parser):
     group = parser.add_argument_group(title="Remapping Initialization")
     group.add_argument('--grid-configs', dest='grid_configs', nargs="+", default=tuple(),
                        help="Specify additional grid configuration files ('grids.conf' for built-ins)")
+    group.add_argument('--ll2cr-cache-dir', dest='ll2cr_cache_dir', default=LL2CR_CACHE_DIR,
+                       help="Directory to persistently cache ll2cr and nearest neighbor results in between runs "
+                            "(default: $P2G_LL2CR_CACHE_DIR, disabled if not set)")
+    group.add_argument('--ll2cr-cache-size', dest='ll2cr_cache_size', default=LL2CR_CACHE_SIZE,
+                       help="Maximum size of the remap cache before least recently used entries are removed "
+                            "(ex. 500M, 4G) (default: %(default)s)")
+    group.add_argument('--remap-workers', dest='remap_workers', default=REMAP_WORKERS, type=int,
+                       help="Number of processes used to remap groups of products with different geolocation "
+                            "at the same time (default: %(default)s)")
+    group.add_argument('--remap-memory-limit', dest='remap_memory_limit', default=REMAP_MEMORY_LIMIT,
+                       help="Approximate memory budget (ex. 8G) shared by concurrently remapped groups; "
+                            "groups wait for others to finish when it would be exceeded")
+    group.add_argument('--lazy-remap', dest='lazy_remap', default=LAZY_REMAP, action='store_true',
+                       help="Keep swath data, geolocation, and remapped data in memory as dask arrays instead of "
+                            "writing intermediate binary files (satpy readers only skip all disk writes)")
     group = parser.add_argument_group(title="Remapping")
     group.add_argument('-g', '--grids', dest='forced_grids', nargs="+", default=SUPPRESS,
                        help="Force remapping to only some grids, defaults to 'wgs84_fit', use 'all' for determination")
@@ -556,6 +896,8 @@ def add_remap_argument_groups(parser):
                        help="Use maximum weight mode in fornav (-m)")
     group.add_argument("--distance-upper-bound", dest="distance_upper_bound", type=float, default=SUPPRESS,
                        help="Nearest neighbor search distance upper bound in units of grid cell")
+    group.add_argument("--nearest-tile-size", dest="nearest_tile_size", type=int, default=SUPPRESS,
+                       help="Number of grid rows and columns searched at a time by nearest neighbor (default 1024)")
     group.add_argument("--no-share-mask", dest="share_remap_mask", action="store_false",
                        help="Don't share invalid masks between nearest neighbor resampling (slow)")
     group.add_argument("--no-share-grid", dest="share_dynamic_grids", action="store_false",
@@ -566,12 +908,15 @@ def add_remap_argument_groups(parser):
 def main():
     from polar2grid.core.script_utils import create_basic_parser, create_exc_handler, setup_logging
     from polar2grid.core.containers import SwathScene
+    from polar2grid.core.scene_package import is_package_filename
     parser = create_basic_parser(description="Remap a SwathScene to the provided grids")
     subgroup_titles = add_remap_argument_groups(parser)
     parser.add_argument("--scene", required=True,
-                        help="JSON SwathScene filename to be remapped")
+                        help="JSON or scene package (.p2g) SwathScene filename to be remapped")
     parser.add_argument('-o', dest="output_filename", default="gridded_scene_{grid_name}.json",
-                        help="Output filename for JSON scene (default is to 'gridded_scene_{grid_name}.json')")
+                        help="Output filename for JSON scene (default is to 'gridded_scene_{grid_name}.json'). "
+                             "Filenames ending in '.p2g' create a single file scene package holding the metadata "
+                             "and all arrays")
     global_keywords = ("keep_intermediate", "overwrite_existing", "exit_on_error")
     args = parser.parse_args(subgroup_titles=subgroup_titles, global_keywords=global_keywords)
 
@@ -587,6 +932,10 @@ def main():
     scene = SwathScene.load(args.scene)
 
     remapper = Remapper(**args.subgroup_args["Remapping Initialization"])
+    if remapper.lazy_remap and not is_package_filename(args.output_filename):
+        # scene packages store the computed arrays, JSON scenes can only refer to files
+        LOG.error("Lazy remapping results can't be saved to a JSON scene file")
+        raise ValueError("Lazy remapping results can't be saved to a JSON scene file")
     remap_kwargs = args.subgroup_args["Remapping"]
     for grid_name in remap_kwargs.pop("forced_grids", ["wgs84_fit"]):
         gridded_scene = remapper.remap_scene(scene, grid_name, **remap_kwargs)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the AVHRR file readers.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.avhrr import readers
+
+LOG = logging.getLogger(__name__)
+
+
+def _swath_40km_geolocation(num_lines, start_lon=170.0, start_lat=-60.0):
+    """Orbit-like 40km AVHRR longitudes and latitudes crossing the dateline."""
+    lines = numpy.arange(num_lines)[:, None]
+    cols = numpy.arange(24, 2048, 40)[None, :]
+    # ~1.1km between scanlines along track and a slightly curved scan line
+    lats = start_lat + lines * 0.01 + (cols - 1023.5) * 0.0005 + ((cols - 1023.5) / 1024.) ** 2 * 0.3
+    lons = start_lon + lines * 0.005 + (cols - 1023.5) * 0.012 / numpy.cos(numpy.radians(lats))
+    lons = (lons + 180.) % 360. - 180.
+    return lons, lats
+
+
+def _lon_diff(lons_a, lons_b):
+    return numpy.abs((lons_a - lons_b + 180.) % 360. - 180.)
+
+
+class TestInterpolate1kmGeolocation(object):
+    @pytest.mark.parametrize("dtype", [numpy.float64, numpy.float32])
+    def test_max_error(self, dtype):
+        lons_40km, lats_40km = _swath_40km_geolocation(500)
+        lons_40km = lons_40km.astype(dtype)
+        lats_40km = lats_40km.astype(dtype)
+        exp_lons, exp_lats = readers.interpolate_1km_geolocation(lons_40km, lats_40km, method="per_line")
+        lons, lats = readers.interpolate_1km_geolocation(lons_40km, lats_40km, method="batched")
+        assert lons.shape == exp_lons.shape == (500, 2048)
+        assert lons.dtype == exp_lons.dtype
+        assert lats.dtype == exp_lats.dtype
+        max_lon_error = _lon_diff(lons, exp_lons).max()
+        max_lat_error = numpy.abs(lats - exp_lats).max()
+        LOG.info("Batched spline max error: longitude %g, latitude %g degrees", max_lon_error, max_lat_error)
+        tolerance = 1e-7 if dtype == numpy.float64 else 1e-3
+        assert max_lon_error < tolerance
+        assert max_lat_error < tolerance
+
+    def test_tie_points_kept(self):
+        lons_40km, lats_40km = _swath_40km_geolocation(10)
+        lons, lats = readers.interpolate_1km_geolocation(lons_40km, lats_40km)
+        assert _lon_diff(lons[:, 24::40], lons_40km).max() < 1e-7
+        numpy.testing.assert_allclose(lats[:, 24::40], lats_40km, rtol=0, atol=1e-9)
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        lons_40km, lats_40km = _swath_40km_geolocation(2000)
+        start = time.perf_counter()
+        exp_lons, exp_lats = readers.interpolate_1km_geolocation(lons_40km, lats_40km, method="per_line")
+        per_line_time = time.perf_counter() - start
+        start = time.perf_counter()
+        lons, lats = readers.interpolate_1km_geolocation(lons_40km, lats_40km, method="batched")
+        batched_time = time.perf_counter() - start
+        LOG.info("AVHRR 40km->1km interpolation of %d lines: per line %.3fs, batched %.3fs",
+                 lons_40km.shape[0], per_line_time, batched_time)
+        assert _lon_diff(lons, exp_lons).max() < 1e-7
+        assert numpy.abs(lats - exp_lats).max() < 1e-7
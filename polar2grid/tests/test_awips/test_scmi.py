@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the AWIPS SCMI backend.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import json
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.awips import scmi_backend
+
+LOG = logging.getLogger(__name__)
+
+
+def _stats_image(dtype=numpy.float32):
+    data = numpy.arange(37 * 23, dtype=dtype).reshape((37, 23)) - 100
+    invalid_mask = numpy.zeros(data.shape, dtype=numpy.bool_)
+    invalid_mask[5, :] = True
+    invalid_mask[30:, 20:] = True
+    if numpy.issubdtype(data.dtype, numpy.floating):
+        data[0, 0] = numpy.nan
+        data[12, 3:9] = numpy.nan
+    return data, invalid_mask
+
+
+class TestDataStatistics(object):
+    @pytest.mark.parametrize("rows_per_block", [1, 5, 16, 512])
+    @pytest.mark.parametrize("dtype", [numpy.float32, numpy.float64, numpy.int16])
+    def test_matches_numpy(self, dtype, rows_per_block):
+        data, invalid_mask = _stats_image(dtype)
+        stats = scmi_backend.data_statistics(data, invalid_mask, rows_per_block=rows_per_block)
+        nan_mask = numpy.isnan(data) if numpy.issubdtype(data.dtype, numpy.floating) else numpy.zeros_like(invalid_mask)
+        good_mask = ~(nan_mask | invalid_mask)
+        expected = numpy.where(good_mask, data, numpy.nan).astype(numpy.float64)
+        assert stats["min"] == numpy.nanmin(expected)
+        assert stats["max"] == numpy.nanmax(expected)
+        assert stats["valid_count"] == numpy.count_nonzero(good_mask)
+        assert stats["nan_count"] == numpy.count_nonzero(nan_mask)
+
+    def test_masked_array(self):
+        data, invalid_mask = _stats_image()
+        stats = scmi_backend.data_statistics(numpy.ma.masked_array(data, mask=invalid_mask), invalid_mask)
+        assert stats["min"] == numpy.nanmin(data[~invalid_mask])
+        assert stats["max"] == numpy.nanmax(data[~invalid_mask])
+
+    def test_no_valid_pixels(self):
+        data = numpy.full((10, 10), numpy.nan, dtype=numpy.float32)
+        data[2, 2] = 5.0
+        invalid_mask = numpy.zeros(data.shape, dtype=numpy.bool_)
+        invalid_mask[2, 2] = True
+        stats = scmi_backend.data_statistics(data, invalid_mask, rows_per_block=3)
+        assert numpy.isnan(stats["min"]) and numpy.isnan(stats["max"])
+        assert stats["valid_count"] == 0
+        assert stats["nan_count"] == 99
+
+
+class TestScalingCache(object):
+    def test_round_trip(self, tmpdir):
+        fn = str(tmpdir.join("scaling.json"))
+        cache = scmi_backend.ScalingCache(fn)
+        assert cache.get("npp", "viirs", "i04", "LCC") is None
+        cache.set("npp", "viirs", "i04", "LCC", numpy.float32(200.5), 300)
+        assert cache.get("npp", "viirs", "i04", "LCC") == (200.5, 300.0)
+
+        reloaded = scmi_backend.ScalingCache(fn)
+        assert reloaded.get("npp", "viirs", "i04", "LCC") == (200.5, 300.0)
+        with open(fn, "r") as cache_file:
+            assert len(json.load(cache_file)) == 1
+        assert not [x for x in os.listdir(str(tmpdir)) if ".tmp" in x]
+
+    def test_key_includes_satellite_and_instrument(self, tmpdir):
+        cache = scmi_backend.ScalingCache(str(tmpdir.join("scaling.json")))
+        cache.set("npp", "viirs", "i04", "LCC", 200.0, 300.0)
+        assert cache.get("noaa20", "viirs", "i04", "LCC") is None
+        assert cache.get("npp", "modis", "i04", "LCC") is None
+        assert cache.get("npp", "viirs", "i04", "Polar") is None
+        assert cache.update("noaa20", "viirs", "i04", "LCC", 190.0, 310.0) == (190.0, 310.0)
+        assert cache.get("npp", "viirs", "i04", "LCC") == (200.0, 300.0)
+
+    def test_update_widens(self, tmpdir):
+        fn = str(tmpdir.join("scaling.json"))
+        cache = scmi_backend.ScalingCache(fn)
+        assert cache.update("npp", "viirs", "i04", "LCC", 200.0, 300.0) == (200.0, 300.0)
+        # data inside of the cached range uses the cached range
+        assert cache.update("npp", "viirs", "i04", "LCC", 210.0, 290.0) == (200.0, 300.0)
+        # data outside of the cached range widens it on either side
+        assert cache.update("npp", "viirs", "i04", "LCC", 250.0, 320.0) == (200.0, 320.0)
+        assert cache.update("npp", "viirs", "i04", "LCC", 180.0, 250.0) == (180.0, 320.0)
+        assert scmi_backend.ScalingCache(fn).get("npp", "viirs", "i04", "LCC") == (180.0, 320.0)
+
+    def test_update_no_valid_data(self, tmpdir):
+        cache = scmi_backend.ScalingCache(str(tmpdir.join("scaling.json")))
+        data_min, data_max = cache.update("npp", "viirs", "i04", "LCC", numpy.nan, numpy.nan)
+        assert numpy.isnan(data_min) and numpy.isnan(data_max)
+        assert cache.get("npp", "viirs", "i04", "LCC") is None
+        cache.set("npp", "viirs", "i04", "LCC", 200.0, 300.0)
+        assert cache.update("npp", "viirs", "i04", "LCC", numpy.nan, numpy.nan) == (200.0, 300.0)
+
+    def test_corrupt_file(self, tmpdir):
+        fn = tmpdir.join("scaling.json")
+        fn.write("{not json")
+        cache = scmi_backend.ScalingCache(str(fn))
+        assert cache.get("npp", "viirs", "i04", "LCC") is None
+        cache.set("npp", "viirs", "i04", "LCC", 200.0, 300.0)
+        assert scmi_backend.ScalingCache(str(fn)).get("npp", "viirs", "i04", "LCC") == (200.0, 300.0)
+
+
+class TestBackendValidRange(object):
+    def _product(self, **kwargs):
+        product = {"product_name": "i04", "satellite": "npp", "instrument": "viirs"}
+        product.update(kwargs)
+        return product
+
+    def test_later_pass_not_clipped(self, tmpdir):
+        backend = scmi_backend.Backend(scaling_cache=str(tmpdir.join("scaling.json")))
+        mask = numpy.zeros((4, 5), dtype=numpy.bool_)
+        first = numpy.linspace(200.0, 300.0, 20).reshape((4, 5))
+        assert backend._get_valid_range(self._product(), first, mask, "LCC") == (200.0, 300.0)
+        inside = numpy.linspace(220.0, 280.0, 20).reshape((4, 5))
+        assert backend._get_valid_range(self._product(), inside, mask, "LCC") == (200.0, 300.0)
+        # a later pass with a wider range must not be clipped to the first pass's range
+        wider = numpy.linspace(190.0, 330.0, 20).reshape((4, 5))
+        assert backend._get_valid_range(self._product(), wider, mask, "LCC") == (190.0, 330.0)
+        # another satellite gets its own range
+        assert backend._get_valid_range(self._product(satellite="noaa20"), inside, mask, "LCC") == (220.0, 280.0)
+
+    def test_configured_range(self, tmpdir):
+        fn = str(tmpdir.join("scaling.json"))
+        backend = scmi_backend.Backend(scaling_cache=fn)
+        mask = numpy.zeros((4, 5), dtype=numpy.bool_)
+        data = numpy.linspace(200.0, 300.0, 20).reshape((4, 5))
+        assert backend._get_valid_range(self._product(valid_min=0.0, valid_max=1.0), data, mask, "LCC") == (0.0, 1.0)
+        assert not os.path.exists(fn)
+        assert backend._get_valid_range(self._product(valid_min=150.0), data, mask, "LCC") == (150.0, 300.0)
+
+
+def _gridded_product(rows=150, cols=230):
+    from datetime import datetime
+    from polar2grid.core.containers import GriddedProduct, GridDefinition
+    grid_def = GridDefinition(
+        grid_name="test_lcc",
+        proj4_definition="+proj=lcc +datum=WGS84 +ellps=WGS84 +lat_0=25 +lat_1=25 +lon_0=-95 +units=m +no_defs",
+        height=rows,
+        width=cols,
+        cell_width=1000.0,
+        cell_height=-1000.0,
+        origin_x=-115000.0,
+        origin_y=1075000.0,
+    )
+    data = numpy.linspace(200.0, 320.0, rows * cols).astype(numpy.float32).reshape((rows, cols))
+    data[:20, :40] = numpy.nan
+    data[70, :] = numpy.nan
+    return GriddedProduct(
+        product_name="i04",
+        satellite="npp",
+        instrument="viirs",
+        begin_time=datetime(2020, 1, 1, 12, 0),
+        end_time=datetime(2020, 1, 1, 12, 5),
+        data_type=numpy.float32,
+        data_kind="brightness_temperature",
+        units="K",
+        grid_data=data,
+        grid_definition=grid_def,
+        fill_value=numpy.nan,
+    )
+
+
+def _read_tile(fn):
+    from netCDF4 import Dataset
+    with Dataset(fn, "r") as nc:
+        nc.set_auto_maskandscale(False)
+        global_attrs = {k: nc.getncattr(k) for k in nc.ncattrs() if k != "creation_time"}
+        variables = {}
+        for var_name, var in nc.variables.items():
+            attrs = {k: var.getncattr(k) for k in var.ncattrs()}
+            variables[var_name] = (var.dtype, var[:], attrs)
+    return global_attrs, variables
+
+
+class TestTileWorkers(object):
+    @pytest.mark.parametrize("tile_kwargs", [{"tile_count": (2, 3)}, {"tile_size": (64, 100)}])
+    def test_parallel_matches_serial(self, tmpdir, tile_kwargs):
+        outputs = {}
+        for tile_workers in (1, 2):
+            out_dir = tmpdir.mkdir("workers_{}".format(tile_workers))
+            backend = scmi_backend.Backend(tile_workers=tile_workers)
+            pattern = os.path.join(str(out_dir), scmi_backend.DEFAULT_OUTPUT_PATTERN)
+            created = backend.create_output_from_product(_gridded_product(), sector_id="LCC", source_name="SSEC",
+                                                         output_pattern=pattern, **tile_kwargs)
+            outputs[tile_workers] = {os.path.basename(fn): _read_tile(fn) for fn in created}
+
+        assert len(outputs[1]) > 1
+        assert sorted(outputs[1]) == sorted(outputs[2])
+        for fn, (serial_attrs, serial_vars) in outputs[1].items():
+            parallel_attrs, parallel_vars = outputs[2][fn]
+            numpy.testing.assert_equal(parallel_attrs, serial_attrs)
+            assert sorted(parallel_vars) == sorted(serial_vars)
+            for var_name, (dtype, data, attrs) in serial_vars.items():
+                assert parallel_vars[var_name][0] == dtype
+                numpy.testing.assert_array_equal(parallel_vars[var_name][1], data)
+                numpy.testing.assert_equal(parallel_vars[var_name][2], attrs)
+
+    def test_tile_error_removes_file(self, tmpdir, monkeypatch):
+        def _fail(*args, **kwargs):
+            raise RuntimeError("set_image_data failed")
+        monkeypatch.setattr(scmi_backend.SCMI_writer, "set_image_data", _fail)
+        backend = scmi_backend.Backend(tile_workers=1)
+        pattern = os.path.join(str(tmpdir), scmi_backend.DEFAULT_OUTPUT_PATTERN)
+        with pytest.raises(RuntimeError):
+            backend.create_output_from_product(_gridded_product(), sector_id="LCC", output_pattern=pattern,
+                                               tile_count=(1, 1))
+        assert not tmpdir.listdir()
+
+
+def _tiles_reference(tile_gen, data, fill_value=numpy.nan):
+    """Old ``NumberedTileGenerator.__call__``: copy every tile in to a padded masked array, skip empty tiles."""
+    tmp_tile = numpy.ma.zeros(tile_gen.tile_shape, dtype=numpy.float32)
+    tmp_tile.set_fill_value(fill_value)
+    tmp_tile[:] = numpy.ma.masked
+    for tile_info in list(tile_gen._generate_tile_info()):
+        tmp_tile[tile_info[-2]] = data[tile_info[-1]]
+        if tmp_tile.mask.all():
+            continue
+        yield tile_info[:-2], tmp_tile.copy()
+        tmp_tile[:] = numpy.ma.masked
+
+
+def _tile_image(rows=150, cols=230):
+    data = numpy.linspace(200.0, 320.0, rows * cols).astype(numpy.float32).reshape((rows, cols))
+    # first 64x100 tile is all fill, partial fill in others
+    data[:64, :100] = numpy.nan
+    data[70, :] = numpy.nan
+    data[140:, 210:] = numpy.nan
+    return numpy.ma.masked_invalid(data)
+
+
+def _tile_grid(rows=150, cols=230, cell_size=1000.0):
+    from polar2grid.core.containers import GridDefinition
+    return GridDefinition(
+        grid_name="test_lcc",
+        proj4_definition="+proj=lcc +datum=WGS84 +ellps=WGS84 +lat_0=25 +lat_1=25 +lon_0=-95 +units=m +no_defs",
+        height=rows, width=cols, cell_width=cell_size, cell_height=-cell_size,
+        origin_x=-1150000.0, origin_y=2000000.0,
+    )
+
+
+class TestTileViews(object):
+    def _assert_matches_reference(self, tile_gen, data):
+        expected = list(_tiles_reference(tile_gen, data))
+        views = list(tile_gen.iter_tile_views(data))
+        assert expected
+        assert [info[2] for info, _ in expected] == [info[2] for info, _, _ in views]
+        for (exp_info, exp_tile), (info, tile_slices, tile_data) in zip(expected, views):
+            assert info[:3] == exp_info[:3]
+            numpy.testing.assert_array_equal(info[3], exp_info[3])
+            numpy.testing.assert_array_equal(info[4], exp_info[4])
+            tile = numpy.ma.masked_all(tile_gen.tile_shape, dtype=numpy.float32)
+            tile[tile_slices] = tile_data
+            numpy.testing.assert_array_equal(numpy.ma.getmaskarray(tile), numpy.ma.getmaskarray(exp_tile))
+            numpy.testing.assert_array_equal(tile.compressed(), exp_tile.compressed())
+        return expected
+
+    @pytest.mark.parametrize("tile_kwargs", [
+        {"tile_shape": (64, 100)}, {"tile_shape": (150, 230)}, {"tile_shape": (37, 41)}, {"tile_count": (3, 4)},
+    ])
+    def test_numbered_matches_reference(self, tile_kwargs):
+        tile_gen = scmi_backend.NumberedTileGenerator(_tile_grid(), **tile_kwargs)
+        data = _tile_image()
+        expected = self._assert_matches_reference(tile_gen, data)
+        if tile_kwargs == {"tile_shape": (64, 100)}:
+            # the all fill tile is skipped and edge tiles are smaller than the full tile
+            assert "T001" not in [info[2] for info, _ in expected]
+            shapes = [tile_data.shape for _, _, tile_data in tile_gen.iter_tile_views(data)]
+            assert (22, 30) in shapes
+
+    def test_all_fill_image(self):
+        tile_gen = scmi_backend.NumberedTileGenerator(_tile_grid(), tile_shape=(64, 100))
+        data = numpy.ma.masked_all((150, 230), dtype=numpy.float32)
+        assert list(tile_gen.iter_tile_views(data)) == []
+        assert list(_tiles_reference(tile_gen, data)) == []
+
+    def test_valid_mask(self):
+        tile_gen = scmi_backend.NumberedTileGenerator(_tile_grid(), tile_shape=(64, 100))
+        data = _tile_image()
+        valid_mask = ~numpy.ma.getmaskarray(data)
+        valid_mask[64:128, :] = False
+        tile_ids = [info[2] for info, _, _ in tile_gen.iter_tile_views(data, valid_mask=valid_mask)]
+        assert tile_ids == ["T002", "T003", "T007", "T008", "T009"]
+
+    def test_lettered_matches_reference(self):
+        tile_gen = scmi_backend.LetteredTileGenerator(_tile_grid(cell_size=10000.0), (-135, 20, -60, 60),
+                                                      cell_size=(1300000, 1300000), num_subtiles=(2, 2))
+        assert len(self._assert_matches_reference(tile_gen, _tile_image())) > 1
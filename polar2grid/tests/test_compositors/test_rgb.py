@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the RGB compositors against the previous whole-array implementations.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import gc
+import logging
+from datetime import datetime
+
+import numpy
+import pytest
+
+from polar2grid.compositors import rgb
+from polar2grid.core.containers import GriddedProduct, GriddedScene, GridDefinition
+from polar2grid.core.rescale import lookup_scale
+
+LOG = logging.getLogger(__name__)
+
+ROWS = 37
+COLS = 11
+
+
+def _grid_def():
+    return GridDefinition(
+        grid_name="test_grid", proj4_definition="+proj=latlong +datum=WGS84 +ellps=WGS84 +no_defs",
+        height=ROWS, width=COLS, cell_width=0.01, cell_height=-0.01, origin_x=-100.0, origin_y=40.0,
+    )
+
+
+def _band_data(seed):
+    rng = numpy.random.RandomState(seed)
+    data = rng.uniform(-0.05, 1.2, (ROWS, COLS)).astype(numpy.float32)
+    data[rng.uniform(size=data.shape) < 0.05] = numpy.nan
+    # dark pixels where the sharpening ratio is negative or infinite
+    data[seed % ROWS, :3] = 0.0
+    data[(seed * 3) % ROWS, 3:6] = -0.01
+    return data
+
+
+def _gridded_scene(tmpdir, product_names, fill_values=None):
+    """Scene of file based products, each with different invalid pixels."""
+    fill_values = fill_values or {}
+    scene = GriddedScene()
+    for seed, product_name in enumerate(product_names):
+        data = _band_data(seed + 1)
+        fill_value = fill_values.get(product_name, numpy.nan)
+        if not numpy.isnan(fill_value):
+            data[numpy.isnan(data)] = fill_value
+        fn = str(tmpdir.join("grid_%s.dat" % (product_name,)))
+        data.tofile(fn)
+        scene[product_name] = GriddedProduct(
+            product_name=product_name, satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+            end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind="reflectance", units="1",
+            grid_data=fn, grid_definition=_grid_def(), fill_value=fill_value,
+        )
+    return scene
+
+
+def _arrays(scene):
+    return {pname: numpy.array(product.get_data_array()) for pname, product in scene.items()}
+
+
+def _masks(scene, arrays, product_names):
+    masks = []
+    for pname in product_names:
+        fill = scene[pname]["fill_value"]
+        masks.append(numpy.isnan(arrays[pname]) if numpy.isnan(fill) else arrays[pname] == fill)
+    return numpy.any(masks, axis=0)
+
+
+def _ratio_sharpen_reference(lowres_data, rgb_data, compare_index):
+    ratio = rgb_data[compare_index] / lowres_data
+    ratio[(ratio < 0) | ~numpy.isfinite(ratio)] = 1.
+    for idx in range(rgb_data.shape[0]):
+        if idx != compare_index:
+            rgb_data[idx, :] *= ratio
+
+
+def _composite_reference(scene, band_products, mask_products, fill_value, lowres_product=None, compare_index=0):
+    """Previous composite creation: join the whole bands, sharpen, then mask with a whole-image shared mask."""
+    arrays = _arrays(scene)
+    comp_data = numpy.array([arrays[pname] for pname in band_products])
+    if lowres_product is not None:
+        _ratio_sharpen_reference(arrays[lowres_product], comp_data, compare_index)
+    if mask_products:
+        comp_data[:, _masks(scene, arrays, mask_products)] = fill_value
+    return comp_data
+
+
+def _crefl_sharpen_reference(scene, lores_name, hires_name, share_mask, apply_scale, fill_value):
+    """Previous `CreflRGBSharpenCompositor.modify_scene` on whole arrays, returns the new arrays by product."""
+    arrays = _arrays(scene)
+    lores_data = arrays[lores_name]
+    hires_data = arrays[hires_name]
+    ratio = hires_data / lores_data
+    shared_mask = _masks(scene, arrays, list(scene.keys())) if share_mask else None
+    if shared_mask is not None:
+        lores_data[shared_mask] = fill_value
+        hires_data[shared_mask] = fill_value
+
+    def _scale(data, max_clip):
+        valid = data if shared_mask is None else data[~shared_mask]
+        numpy.clip(valid, -0.01, max_clip, valid)
+        valid[:] = lookup_scale(valid, 0., 1., -0.01, 1.1)
+        if shared_mask is None:
+            data[:] = valid
+        else:
+            data[~shared_mask] = valid
+
+    for pname in set(arrays) - {lores_name, hires_name}:
+        arrays[pname] *= ratio
+        if shared_mask is not None:
+            arrays[pname][shared_mask] = fill_value
+        if apply_scale:
+            _scale(arrays[pname], 1.1)
+    if apply_scale:
+        _scale(lores_data, 1.1)
+        _scale(hires_data, 0.9)
+    return arrays
+
+
+@pytest.fixture
+def in_tmpdir(tmpdir, monkeypatch):
+    """Run in `tmpdir` where compositors write their relative composite filenames.
+
+    Products that don't persist delete their (relative) files when garbage collected so make sure that happens before
+    the next test is using the same filenames in its own directory.
+    """
+    monkeypatch.chdir(tmpdir)
+    yield tmpdir
+    gc.collect()
+
+
+@pytest.fixture(params=[1, 5, ROWS, 512])
+def rows_per_strip(request):
+    return request.param
+
+
+class TestRGBCompositor(object):
+    @pytest.mark.parametrize("share_mask", [True, False])
+    @pytest.mark.usefixtures("in_tmpdir")
+    def test_matches_reference(self, tmpdir, rows_per_strip, share_mask):
+        product_names = ["m05", "m04", "m03"]
+        scene = _gridded_scene(tmpdir, product_names, fill_values={"m04": -999.0})
+        expected = _composite_reference(scene, product_names, product_names if share_mask else None, -999.0)
+
+        compositor = rgb.RGBCompositor(composite_products=",".join(product_names), share_mask=share_mask,
+                                       rows_per_strip=rows_per_strip)
+        scene = compositor.modify_scene(scene, fill_value=-999.0)
+        composite = scene["rgb_composite"]
+        assert composite["grid_data"] == "grid_test_grid_rgb_composite.dat"
+        numpy.testing.assert_array_equal(composite.get_data_array(), expected)
+
+    def test_write_composite_strip_func(self, tmpdir, rows_per_strip):
+        product_names = ["m05", "m04", "m03"]
+        scene = _gridded_scene(tmpdir, product_names)
+        strips = []
+
+        def _strip_func(strip_data, row_slice):
+            strips.append((row_slice.start, row_slice.stop))
+            strip_data[1] += row_slice.start
+
+        fn = str(tmpdir.join("composite.dat"))
+        compositor = rgb.RGBCompositor(rows_per_strip=rows_per_strip)
+        compositor.write_composite(scene, fn, product_names, mask_products=product_names[:1], fill_value=numpy.nan,
+                                   strip_func=_strip_func)
+        assert strips == [(s.start, s.stop) for s in rgb.iter_row_strips(ROWS, rows_per_strip)]
+        assert strips[-1][1] == ROWS
+        expected = _composite_reference(scene, product_names, None, numpy.nan)
+        expected[1] += numpy.repeat([s[0] for s in strips], [s[1] - s[0] for s in strips])[:, None]
+        expected[:, _masks(scene, _arrays(scene), product_names[:1])] = numpy.nan
+        result = numpy.fromfile(fn, dtype=numpy.float32).reshape((3, ROWS, COLS))
+        numpy.testing.assert_array_equal(result, expected)
+
+
+class TestTrueFalseColorCompositor(object):
+    @pytest.mark.parametrize(("compositor_class", "compare_index"), [
+        (rgb.TrueColorCompositor, 0), (rgb.FalseColorCompositor, 1),
+    ])
+    @pytest.mark.parametrize("share_mask", [True, False])
+    @pytest.mark.parametrize("sharpen_rgb", [True, False])
+    @pytest.mark.parametrize("has_hires", [True, False])
+    @pytest.mark.usefixtures("in_tmpdir")
+    def test_matches_reference(self, tmpdir, rows_per_strip, compositor_class, compare_index,
+                               share_mask, sharpen_rgb, has_hires):
+        product_names = ["red", "green", "blue"] + (["hires"] if has_hires else [])
+        scene = _gridded_scene(tmpdir, product_names)
+        all_products = product_names if sharpen_rgb else product_names[:3]
+        if has_hires and sharpen_rgb:
+            band_products = list(product_names[:3])
+            lowres_product = band_products[compare_index]
+            band_products[compare_index] = "hires"
+        else:
+            band_products = product_names[:3]
+            lowres_product = None
+        expected = _composite_reference(scene, band_products, all_products if share_mask else None, numpy.nan,
+                                        lowres_product=lowres_product, compare_index=compare_index)
+
+        compositor = compositor_class("red", "green", "blue", "hires", share_mask=share_mask,
+                                      sharpen_rgb=sharpen_rgb, rows_per_strip=rows_per_strip)
+        scene = compositor.modify_scene(scene)
+        composite = scene[compositor.composite_name]
+        numpy.testing.assert_array_equal(composite.get_data_array(), expected)
+        # the input products are not modified
+        for pname, data in _arrays(_gridded_scene(tmpdir.mkdir("orig"), product_names)).items():
+            numpy.testing.assert_array_equal(scene[pname].get_data_array(), data)
+
+    @pytest.mark.usefixtures("in_tmpdir")
+    def test_false_color_without_sharpening(self, tmpdir):
+        scene = _gridded_scene(tmpdir, ["red", "green", "blue", "hires"])
+        expected = _composite_reference(scene, ["red", "green", "blue"], ["red", "green", "blue"], numpy.nan)
+        scene = rgb.FalseColorCompositor("red", "green", "blue", "hires", sharpen_rgb=False).modify_scene(scene)
+        numpy.testing.assert_array_equal(scene["false_color"].get_data_array(), expected)
+        assert os.path.isfile("grid_test_grid_false_color.dat")
+
+
+class TestCreflRGBSharpenCompositor(object):
+    @pytest.mark.parametrize("share_mask", [True, False])
+    @pytest.mark.parametrize("apply_scale", [True, False])
+    def test_matches_reference(self, tmpdir, rows_per_strip, share_mask, apply_scale):
+        product_names = ["lores", "hires", "green", "blue"]
+        scene = _gridded_scene(tmpdir, product_names, fill_values={"blue": -999.0})
+        expected = _crefl_sharpen_reference(scene, "lores", "hires", share_mask, apply_scale, numpy.nan)
+
+        compositor = rgb.CreflRGBSharpenCompositor("lores", "hires", share_mask=share_mask, apply_scale=apply_scale,
+                                                   rows_per_strip=rows_per_strip)
+        scene = compositor.modify_scene(scene)
+        assert "lores" not in scene
+        for pname in ("hires", "green", "blue"):
+            numpy.testing.assert_array_equal(scene[pname].get_data_array(), expected[pname])
+            if apply_scale:
+                assert scene[pname]["valid_min"] == 0. and scene[pname]["valid_max"] == 1.
+        assert scene["green"]["sharpened"] and scene["blue"]["sharpened"]
+        # the modified data is written to the files
+        numpy.testing.assert_array_equal(numpy.fromfile(scene["green"]["grid_data"], dtype=numpy.float32),
+                                         expected["green"].ravel())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the polar2grid container objects.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import gc
+import os
+import logging
+from datetime import datetime
+
+import numpy
+import dask.array as da
+
+from polar2grid.core.containers import SwathDefinition, SwathProduct, DataCache
+from polar2grid.core import containers
+
+LOG = logging.getLogger(__name__)
+
+
+def _swath_product(swath_data, rows=4, cols=5):
+    lons, lats = numpy.meshgrid(numpy.linspace(-100., -90., cols), numpy.linspace(30., 40., rows))
+    swath_def = SwathDefinition(
+        swath_name="test_swath", longitude=lons.astype(numpy.float32), latitude=lats.astype(numpy.float32),
+        data_type=numpy.float32, swath_rows=rows, swath_columns=cols, fill_value=numpy.nan)
+    return SwathProduct(
+        product_name="test_product", satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+        end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind="btemp", units="K",
+        swath_data=swath_data, swath_definition=swath_def, fill_value=numpy.nan, rows_per_scan=2)
+
+
+class TestGetDataArray(object):
+    def test_lazy_array_computed_once(self):
+        computed = []
+
+        def _load(block):
+            computed.append(block.shape)
+            return block + 1
+
+        data = numpy.arange(20, dtype=numpy.float32).reshape((4, 5))
+        lazy_data = da.from_array(data, chunks=(2, 5)).map_blocks(_load, dtype=numpy.float32)
+        product = _swath_product(lazy_data)
+
+        first = product.get_data_array()
+        numpy.testing.assert_array_equal(first, data + 1)
+        num_computed = len(computed)
+        assert num_computed > 0
+        assert product["swath_data"] is first
+        assert product.get_data_array() is first
+        assert product.get_data_mask().shape == (4, 5)
+        assert len(computed) == num_computed
+
+    def test_lazy_array_writable_changes_kept(self):
+        data = numpy.arange(20, dtype=numpy.float32).reshape((4, 5))
+        product = _swath_product(da.from_array(data, chunks=(2, 5)))
+        product.get_data_array(mode="r+")[0, 0] = numpy.nan
+        assert numpy.isnan(product.get_data_array()[0, 0])
+
+
+def _write_file(tmpdir, name, data):
+    fn = str(tmpdir.join(name))
+    data.tofile(fn)
+    return fn
+
+
+class _Opener(object):
+    """Count how many times a cached memory map or mask is (re)created."""
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.func()
+
+
+class TestDataCache(object):
+    def test_memmap_lru_max_handles(self, tmpdir):
+        cache = DataCache(max_bytes=1024, max_handles=2)
+        data = numpy.arange(10, dtype=numpy.float32)
+        fns = [_write_file(tmpdir, "data_%d.dat" % (idx,), data) for idx in range(3)]
+        openers = [_Opener(lambda fn=fn: numpy.memmap(fn, dtype=numpy.float32, mode="r")) for fn in fns]
+
+        first = cache.get_memmap(fns[0], ("f4",), openers[0])
+        cache.get_memmap(fns[1], ("f4",), openers[1])
+        # use the first so the second is the least recently used
+        assert cache.get_memmap(fns[0], ("f4",), openers[0]) is first
+        cache.get_memmap(fns[2], ("f4",), openers[2])
+        assert cache.get_memmap(fns[0], ("f4",), openers[0]) is first
+        cache.get_memmap(fns[1], ("f4",), openers[1])
+        assert [o.calls for o in openers] == [1, 2, 1]
+
+        cache = DataCache(max_bytes=1024, max_handles=0)
+        cache.get_memmap(fns[0], ("f4",), openers[0])
+        cache.get_memmap(fns[0], ("f4",), openers[0])
+        assert openers[0].calls == 3
+
+    def test_mask_lru_max_bytes(self, tmpdir):
+        # each packed mask is 8 bytes so only two fit
+        cache = DataCache(max_bytes=16, max_handles=4)
+        data = numpy.zeros(64, dtype=numpy.float32)
+        data[::3] = numpy.nan
+        fns = [_write_file(tmpdir, "data_%d.dat" % (idx,), data) for idx in range(3)]
+        masks = [_Opener(lambda: numpy.isnan(data)) for _ in fns]
+
+        cache.get_mask(fns[0], ("nan",), masks[0])
+        cache.get_mask(fns[1], ("nan",), masks[1])
+        cache.get_mask(fns[0], ("nan",), masks[0])
+        cache.get_mask(fns[2], ("nan",), masks[2])
+        assert cache._mask_bytes <= cache.max_bytes
+        numpy.testing.assert_array_equal(cache.get_mask(fns[0], ("nan",), masks[0]), numpy.isnan(data))
+        cache.get_mask(fns[1], ("nan",), masks[1])
+        assert [m.calls for m in masks] == [1, 2, 1]
+
+        # returned masks are copies that can be modified
+        mask = cache.get_mask(fns[1], ("nan",), masks[1])
+        mask[:] = True
+        numpy.testing.assert_array_equal(cache.get_mask(fns[1], ("nan",), masks[1]), numpy.isnan(data))
+
+        # masks bigger than the whole budget are never cached
+        big = numpy.zeros(1024, dtype=numpy.bool_)
+        big_mask = _Opener(lambda: big)
+        cache.get_mask(fns[2], ("big",), big_mask)
+        cache.get_mask(fns[2], ("big",), big_mask)
+        assert big_mask.calls == 2
+
+    def test_replaced_file_is_stale(self, tmpdir):
+        cache = DataCache()
+        data = numpy.arange(10, dtype=numpy.float32)
+        fn = _write_file(tmpdir, "data.dat", data)
+        opener = _Opener(lambda: numpy.fromfile(fn, dtype=numpy.float32))
+        mask = _Opener(lambda: numpy.fromfile(fn, dtype=numpy.float32) > 4)
+
+        cache.get_memmap(fn, ("f4",), opener)
+        cache.get_mask(fn, ("gt4",), mask)
+        # replace the file with a new one (new inode) the way a rerun of a frontend would
+        tmp_fn = _write_file(tmpdir, "data.dat.tmp", data[::-1].copy())
+        os.replace(tmp_fn, fn)
+
+        numpy.testing.assert_array_equal(cache.get_memmap(fn, ("f4",), opener), data[::-1])
+        numpy.testing.assert_array_equal(cache.get_mask(fn, ("gt4",), mask), data[::-1] > 4)
+        assert opener.calls == 2
+        assert mask.calls == 2
+
+        # a different size is also detected
+        _write_file(tmpdir, "data.dat", numpy.arange(12, dtype=numpy.float32))
+        assert cache.get_memmap(fn, ("f4",), opener).shape == (12,)
+        assert opener.calls == 3
+
+    def test_writers_block_caching(self, tmpdir, monkeypatch):
+        cache = DataCache()
+        monkeypatch.setattr(containers, "DATA_CACHE", cache)
+        data = numpy.arange(20, dtype=numpy.float32).reshape((4, 5))
+        fn = _write_file(tmpdir, "swath_data.dat", data)
+        product = _swath_product(fn)
+
+        read_only = product.get_data_array()
+        assert product.get_data_array() is read_only
+        writable = product.get_data_array(mode="r+")
+        # the cached read-only memory map was dropped and nothing is cached while the writer exists
+        assert product.get_data_array() is not read_only
+        assert not cache._memmaps
+        assert not product.get_data_mask().any()
+        assert not cache._masks
+
+        writable[0, 0] = numpy.nan
+        writable.flush()
+        assert numpy.isnan(product.get_data_array()[0, 0])
+        assert product.get_data_mask()[0, 0]
+
+        del writable
+        gc.collect()
+        cached = product.get_data_array()
+        assert product.get_data_array() is cached
+        assert product.get_data_mask()[0, 0]
+        assert cache._masks
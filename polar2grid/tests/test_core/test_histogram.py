@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the histogram equalization functions.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.core import histogram
+
+LOG = logging.getLogger(__name__)
+
+
+def _loop_local_histogram_equalization(data, mask_to_equalize, valid_data_mask=None, number_of_bins=1000,
+                                       std_mult_cutoff=3.0, do_zerotoone_normalization=True, local_radius_px=300,
+                                       clip_limit=60.0, slope_limit=3.0, do_log_scale=True, log_offset=0.00001):
+    """Original tile by tile implementation of `local_histogram_equalization` used as a reference."""
+    out = numpy.zeros_like(data)
+    if valid_data_mask is None:
+        valid_data_mask = mask_to_equalize
+    total_rows, total_cols = data.shape
+    tile_size = int((local_radius_px * 2.0) + 1.0)
+    row_tiles = int(numpy.ceil(total_rows / float(tile_size)))
+    col_tiles = int(numpy.ceil(total_cols / float(tile_size)))
+
+    all_cdfs = [[None] * col_tiles for _ in range(row_tiles)]
+    all_bins = [[None] * col_tiles for _ in range(row_tiles)]
+    for num_row_tile in range(row_tiles):
+        for num_col_tile in range(col_tiles):
+            min_row = num_row_tile * tile_size
+            max_row = min_row + tile_size
+            min_col = num_col_tile * tile_size
+            max_col = min_col + tile_size
+            mask_valid_data_in_tile = valid_data_mask[min_row:max_row, min_col:max_col]
+            if not mask_valid_data_in_tile.any():
+                continue
+            temp_valid_data = data[min_row:max_row, min_col:max_col][mask_valid_data_in_tile]
+            temp_valid_data = temp_valid_data[temp_valid_data >= 0]
+            if std_mult_cutoff is not None:
+                avg = numpy.mean(temp_valid_data)
+                std = numpy.std(temp_valid_data)
+                concervative_mask = (temp_valid_data < (avg + std*std_mult_cutoff)) & \
+                                    (temp_valid_data > (avg - std*std_mult_cutoff))
+                temp_valid_data = temp_valid_data[concervative_mask]
+            if do_log_scale:
+                temp_valid_data = numpy.log(temp_valid_data + log_offset)
+            if temp_valid_data.size > 0:
+                all_cdfs[num_row_tile][num_col_tile], all_bins[num_row_tile][num_col_tile] = \
+                    histogram._histogram_equalization_helper(temp_valid_data, number_of_bins,
+                                                             clip_limit=clip_limit, slope_limit=slope_limit)
+
+    tile_weights = histogram._calculate_weights(tile_size)
+    for num_row_tile in range(row_tiles):
+        for num_col_tile in range(col_tiles):
+            min_row = num_row_tile * tile_size
+            max_row = min_row + tile_size
+            min_col = num_col_tile * tile_size
+            max_col = min_col + tile_size
+            temp_all_data = data[min_row:max_row, min_col:max_col].copy()
+            temp_mask_to_equalize = mask_to_equalize[min_row:max_row, min_col:max_col]
+            temp_all_valid_data_mask = valid_data_mask[min_row:max_row, min_col:max_col]
+            if not temp_mask_to_equalize.any():
+                continue
+            if do_log_scale:
+                temp_all_data[temp_all_valid_data_mask] = numpy.log(temp_all_data[temp_all_valid_data_mask] +
+                                                                    log_offset)
+            temp_data_to_equalize = temp_all_data[temp_mask_to_equalize]
+            temp_all_valid_data = temp_all_data[temp_all_valid_data_mask]
+            temp_sum = numpy.zeros_like(temp_data_to_equalize)
+            unused_weight = numpy.zeros(temp_data_to_equalize.shape, dtype=tile_weights.dtype)
+            for weight_row in range(3):
+                for weight_col in range(3):
+                    calculated_row = num_row_tile - 1 + weight_row
+                    calculated_col = num_col_tile - 1 + weight_col
+                    tmp_tile_weights = tile_weights[weight_row, weight_col][numpy.where(temp_mask_to_equalize)]
+                    if (0 <= calculated_row < row_tiles and 0 <= calculated_col < col_tiles and
+                            all_bins[calculated_row][calculated_col] is not None):
+                        temp_equalized_data = numpy.interp(temp_all_valid_data,
+                                                           all_bins[calculated_row][calculated_col][:-1],
+                                                           all_cdfs[calculated_row][calculated_col])
+                        temp_equalized_data = temp_equalized_data[
+                            numpy.where(temp_mask_to_equalize[temp_all_valid_data_mask])]
+                        temp_sum += (temp_equalized_data * tmp_tile_weights)
+                    else:
+                        unused_weight -= tmp_tile_weights
+            if unused_weight.any():
+                temp_sum /= unused_weight + 1
+            out[min_row:max_row, min_col:max_col][temp_mask_to_equalize] = temp_sum
+
+    if do_zerotoone_normalization:
+        histogram._linear_normalization_from_0to1(out, mask_to_equalize, number_of_bins)
+    return out
+
+
+def _create_dnb_like_data(shape=(768, 4064), seed=42):
+    """Smooth radiance-like field spanning several orders of magnitude with a band of missing data."""
+    rs = numpy.random.RandomState(seed)
+    rows = numpy.linspace(0, 1, shape[0])[:, None]
+    cols = numpy.linspace(0, 1, shape[1])[None, :]
+    data = numpy.exp(-10.0 + 8.0 * rows + 3.0 * numpy.sin(6.0 * cols)).astype(numpy.float32)
+    data *= rs.lognormal(0.0, 0.5, size=shape).astype(numpy.float32)
+    good_mask = numpy.ones(shape, dtype=numpy.bool_)
+    good_mask[:, :37] = False
+    good_mask[100:140, 2000:2300] = False
+    data[~good_mask] = numpy.nan
+    return data, good_mask
+
+
+class TestSlopeLimit(object):
+    @pytest.mark.parametrize("slope_limit", [0.5, 3.0, 50.0])
+    @pytest.mark.parametrize("clip_limit", [None, 20.0, 60.0])
+    def test_cumulative_matches_loop(self, clip_limit, slope_limit):
+        rs = numpy.random.RandomState(1)
+        all_tile_data = (numpy.log(rs.lognormal(0., 2., 40000) + 0.00001), rs.normal(size=5000),
+                         rs.exponential(size=300))
+        for tile_data in all_tile_data:
+            loop_cdf, loop_bins = histogram._histogram_equalization_helper(
+                tile_data, 1000, clip_limit=clip_limit, slope_limit=slope_limit, slope_limit_method="loop")
+            cum_cdf, cum_bins = histogram._histogram_equalization_helper(
+                tile_data, 1000, clip_limit=clip_limit, slope_limit=slope_limit, slope_limit_method="cumulative")
+            numpy.testing.assert_array_equal(cum_cdf, loop_cdf)
+            numpy.testing.assert_array_equal(cum_bins, loop_bins)
+
+    @pytest.mark.benchmark
+    def test_benchmark_tiles(self):
+        """Time both slope limit implementations on the CDFs of a few hundred tiles."""
+        rs = numpy.random.RandomState(2)
+        cdfs = [numpy.histogram(rs.lognormal(0., 1.5, 2000), 1000)[0].cumsum() for _ in range(200)]
+        timings = {}
+        results = {}
+        for method, slope_limit_func in histogram.SLOPE_LIMIT_METHODS.items():
+            t0 = time.perf_counter()
+            results[method] = [slope_limit_func(cdf.copy(), 6) for cdf in cdfs]
+            timings[method] = time.perf_counter() - t0
+        LOG.info("Slope limit on %d tiles: %s", len(cdfs),
+                 ", ".join("%s %.3fs" % (method, t) for method, t in sorted(timings.items())))
+        for loop_cdf, cum_cdf in zip(results["loop"], results["cumulative"]):
+            numpy.testing.assert_array_equal(cum_cdf, loop_cdf)
+
+
+class TestInterpUniformBins(object):
+    def test_matches_numpy_interp(self):
+        rs = numpy.random.RandomState(0)
+        tile_data = numpy.log(rs.lognormal(0., 2., 10000).astype(numpy.float32) + 0.00001)
+        cdf, bins = histogram._histogram_equalization_helper(tile_data, 1000, clip_limit=60.0, slope_limit=3.0)
+        xp = bins[:-1].astype(numpy.float64)
+        x = numpy.log(rs.lognormal(0., 2.5, 50000).astype(numpy.float32) + 0.00001).astype(numpy.float64)
+        x[:20] = xp[::50]
+        x[20:25] = xp[-1]
+        x[25:30] = [numpy.nan, numpy.inf, -numpy.inf, xp[0] - 1., xp[-1] + 1.]
+        numpy.testing.assert_array_equal(histogram._interp_uniform_bins(x, xp, cdf), numpy.interp(x, xp, cdf))
+
+
+class TestLocalHistogramEqualization(object):
+    def test_matches_loop_small(self):
+        data, good_mask = _create_dnb_like_data(shape=(250, 330))
+        exp = _loop_local_histogram_equalization(data, good_mask, local_radius_px=40)
+        res = histogram.local_histogram_equalization(data, good_mask, local_radius_px=40)
+        numpy.testing.assert_array_equal(res, exp)
+
+    def test_matches_loop_valid_mask(self):
+        data, good_mask = _create_dnb_like_data(shape=(250, 330))
+        day_mask = good_mask.copy()
+        day_mask[:, 200:] = False
+        exp = _loop_local_histogram_equalization(data, day_mask, valid_data_mask=good_mask, local_radius_px=40)
+        res = histogram.local_histogram_equalization(data, day_mask, valid_data_mask=good_mask,
+                                                     local_radius_px=40)
+        numpy.testing.assert_array_equal(res, exp)
+
+    def test_matches_loop_no_log(self):
+        data, good_mask = _create_dnb_like_data(shape=(250, 330))
+        data = data * 1000.
+        exp = _loop_local_histogram_equalization(data, good_mask, local_radius_px=25, do_log_scale=False)
+        res = histogram.local_histogram_equalization(data, good_mask, local_radius_px=25, do_log_scale=False)
+        numpy.testing.assert_array_equal(res, exp)
+
+    @pytest.mark.benchmark
+    def test_benchmark_dnb_granule(self):
+        """Compare the vectorized engine against the original tile loop on a DNB granule sized array."""
+        data, good_mask = _create_dnb_like_data()
+        t0 = time.perf_counter()
+        exp = _loop_local_histogram_equalization(data, good_mask, local_radius_px=100)
+        loop_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        res = histogram.local_histogram_equalization(data, good_mask, local_radius_px=100)
+        vec_time = time.perf_counter() - t0
+        LOG.info("local_histogram_equalization on %r: loop %.3fs, vectorized %.3fs", data.shape, loop_time, vec_time)
+        numpy.testing.assert_array_equal(res, exp)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the pipeline profiling instrumentation.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+
+import dask
+import dask.array as da
+import numpy
+import pytest
+
+from polar2grid.core import profiling
+
+LOG = logging.getLogger(__name__)
+
+
+class TestPipelineProfiler(object):
+    def test_stage(self):
+        with profiling.PipelineProfiler() as profiler:
+            with profiler.stage("first") as stage_info:
+                assert stage_info["name"] == "first"
+                time.sleep(0.01)
+            with profiler.stage("second"):
+                pass
+        assert [stage["name"] for stage in profiler.stages] == ["first", "second"]
+        first = profiler.stages[0]
+        assert first["wall_time"] >= 0.01
+        assert first["cpu_time"] >= 0
+        assert first["dask_tasks"] == 0
+        if first["start_rss_mb"] is not None:
+            assert first["peak_rss_mb"] >= max(first["start_rss_mb"], first["end_rss_mb"])
+
+    def test_stage_exception(self):
+        profiler = profiling.PipelineProfiler()
+        with pytest.raises(ValueError):
+            with profiler.stage("failed"):
+                raise ValueError("stage failed")
+        assert [stage["name"] for stage in profiler.stages] == ["failed"]
+        # the failed stage is finished so another can start
+        with profiler.stage("next"):
+            pass
+        assert len(profiler.stages) == 2
+
+    def test_nested_stage(self):
+        profiler = profiling.PipelineProfiler()
+        with profiler.stage("outer"):
+            with pytest.raises(RuntimeError):
+                with profiler.stage("inner"):
+                    pass
+        assert [stage["name"] for stage in profiler.stages] == ["outer"]
+
+    def test_stage_peak_rss(self):
+        if profiling.get_current_rss() is None:
+            pytest.skip("Current memory usage isn't available on this platform")
+        profiler = profiling.PipelineProfiler()
+        with profiler.stage("allocate"):
+            arr = numpy.ones((64 * 1024 * 1024,), dtype=numpy.uint8)
+            time.sleep(profiling.RSS_SAMPLE_INTERVAL * 4)
+            del arr
+        stage = profiler.stages[0]
+        # the memory was freed before the stage ended but the sampled peak includes it
+        assert stage["peak_rss_mb"] - stage["start_rss_mb"] > 48
+        assert stage["peak_rss_mb"] - stage["end_rss_mb"] > 48
+
+    def test_disabled(self, tmpdir):
+        profiler = profiling.PipelineProfiler(enabled=False)
+        profiler.start()
+        with profiler.stage("ignored") as stage_info:
+            assert stage_info is None
+        profiler.add_outputs("ignored", da.ones((4, 4), chunks=2))
+        da.ones((4, 4), chunks=2).sum().compute()
+        profiler.stop()
+        report_fn = tmpdir.join("report.json")
+        profiler.write_report(str(report_fn))
+        assert not profiler.stages and not profiler.tasks and not profiler.output_labels
+        assert not report_fn.exists()
+
+    def test_task_attribution(self):
+        with dask.config.set(scheduler="threads"):
+            with profiling.PipelineProfiler() as profiler:
+                base = da.arange(64, chunks=16) * 2
+                first = (base + 1).sum()
+                second = (base - 1).max()
+                with profiler.stage("build"):
+                    profiler.add_outputs("writer:first", [first, "not a dask collection"])
+                    profiler.add_outputs("writer:second", (second,))
+                with profiler.stage("compute"):
+                    dask.compute(first, second)
+        build, compute = profiler.stages
+        assert build["dask_tasks"] == 0
+        assert compute["dask_tasks"] > 0
+        outputs = compute["outputs"]
+        assert set(outputs) == {"writer:first", "writer:second", profiling.SHARED_LABEL}
+        assert sum(info["dask_tasks"] for info in outputs.values()) == compute["dask_tasks"]
+        assert all(info["task_time"] >= 0 for info in outputs.values())
+
+    def test_label_tasks(self):
+        dsk = {"a": 1, "b": (sum, ["a"]), "c": (sum, ["a", "b"]), "d": (sum, ["a"]), "e": (sum, ["d"])}
+        labels = profiling._label_tasks(dsk, {"c": "first", "e": "second", "missing": "third"})
+        assert labels == {"a": profiling.SHARED_LABEL, "b": "first", "c": "first", "d": "second", "e": "second"}
+
+    def test_write_report(self, tmpdir):
+        with profiling.PipelineProfiler() as profiler:
+            with profiler.stage("compute"):
+                da.ones((8, 8), chunks=4).sum().compute(scheduler="threads")
+        report_fn = str(tmpdir.join("report.json"))
+        profiler.write_report(report_fn)
+        with open(report_fn, "r") as report_file:
+            report = json.load(report_file)
+        assert [stage["name"] for stage in report["stages"]] == ["compute"]
+        assert report["stages"][0]["dask_tasks"] == sum(task["count"] for task in report["tasks"])
+        assert report["wall_time"] >= report["stages"][0]["wall_time"]
+        assert datetime.fromisoformat(report["created"]).utcoffset() == timedelta(0)
+        assert "process_peak_rss_mb" in report and "peak_rss_mb" not in report
+        total_times = [task["total_time"] for task in report["tasks"]]
+        assert total_times == sorted(total_times, reverse=True)
+
+
+class TestGlueProfileReport(object):
+    def test_report_on_early_return(self, tmpdir, monkeypatch):
+        import sys
+        from polar2grid import glue
+        from polar2grid.core import script_utils
+        monkeypatch.setattr(script_utils, "setup_logging", lambda **kwargs: None)
+        monkeypatch.setattr(sys, "excepthook", sys.excepthook)
+        report_fn = tmpdir.join("report.json")
+        ret = glue.main(["-r", "viirs_sdr", "-w", "geotiff", "-vvv", "--num-workers", "0",
+                         "-l", str(tmpdir.join("p2g.log")), "--profile-report", str(report_fn),
+                         "-f", str(tmpdir.join("does_not_exist.h5"))])
+        assert ret == -1
+        with open(str(report_fn), "r") as report_file:
+            report = json.load(report_file)
+        assert [stage["name"] for stage in report["stages"]] == ["scene_creation"]
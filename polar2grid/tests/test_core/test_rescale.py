@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the rescaling functions.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import copy
+import logging
+from datetime import datetime
+
+import numpy
+import pytest
+
+from polar2grid.core import rescale
+from polar2grid.core.containers import GriddedProduct, GridDefinition
+from polar2grid.core.dtype import clip_to_data_type
+
+LOG = logging.getLogger(__name__)
+
+
+def _lookup_inputs(min_in, max_in, num=200001):
+    """Evenly spaced inputs reaching past both ends of the input range plus NaNs."""
+    pad = (max_in - min_in) * 0.1
+    img = numpy.linspace(min_in - pad, max_in + pad, num).astype(numpy.float32)
+    img[::997] = numpy.nan
+    return img.reshape((-1, 1))
+
+
+class TestQuantizedLookup(object):
+    @pytest.mark.parametrize(("min_out", "max_out", "min_in", "max_in", "flip"), [
+        (0., 1., -0.01, 1.1, False),
+        (0., 255., 0., 1., False),
+        (0., 255., -0.01, 1.1, True),
+    ])
+    def test_crefl_error_bound(self, min_out, max_out, min_in, max_in, flip):
+        img = _lookup_inputs(min_in, max_in)
+        expected = rescale.lookup_scale(img.astype(numpy.float64), min_out, max_out, min_in, max_in,
+                                        table_name="crefl", flip=flip)
+        result = rescale.quantized_lookup_scale(img, min_out, max_out, min_in, max_in, table_name="crefl", flip=flip)
+        assert result.shape == img.shape
+        numpy.testing.assert_array_equal(numpy.isnan(result), numpy.isnan(img))
+        # half an input step times the largest slope of the table plus float32 rounding
+        interp_in, interp_out = rescale.lookup_tables["crefl"]
+        max_slope = numpy.max(numpy.diff(interp_out) / numpy.diff(interp_in))
+        bound = 0.5 / (rescale.LOOKUP_STEPS - 1) * max_slope * (max_out - min_out) + 1e-6 * max_out
+        numpy.testing.assert_allclose(result, expected, rtol=0, atol=bound)
+        # inputs outside of the input range are clipped
+        valid = ~numpy.isnan(img)
+        assert numpy.nanmin(result) == pytest.approx(numpy.nanmin(expected[valid]))
+        assert numpy.nanmax(result) == pytest.approx(numpy.nanmax(expected[valid]))
+
+    def test_crefl_old_error_bound(self):
+        min_out, max_out, min_in, max_in = 0., 255., -0.01, 1.1
+        img = _lookup_inputs(min_in, max_in)
+        valid = ~numpy.isnan(img)
+        expected = rescale.lookup_scale(img[valid], min_out, max_out, min_in, max_in, table_name="crefl_old")
+        result = rescale.quantized_lookup_scale(img, min_out, max_out, min_in, max_in, table_name="crefl_old")
+        assert numpy.isnan(result[~valid]).all()
+        # inputs near a step edge may get the neighboring step's output
+        lut = rescale.lookup_tables["crefl_old"]
+        step_bound = numpy.max(numpy.diff(lut)) / (lut.max() - lut.min()) * (max_out - min_out) + 1e-4
+        diff = numpy.abs(result[valid] - expected)
+        assert diff.max() <= step_bound
+        assert numpy.count_nonzero(diff > 1e-4) / float(diff.size) < 0.01
+
+    def test_lookup_cached(self):
+        first = rescale.get_quantized_lookup(0., 1., -0.01, 1.1)
+        assert rescale.get_quantized_lookup(0., 1., -0.01, 1.1) is first
+        assert rescale.get_quantized_lookup(0., 1., -0.01, 1.1, flip=True) is not first
+
+    def test_input_not_modified(self):
+        img = numpy.linspace(-0.1, 1.2, 100).astype(numpy.float32)
+        orig = img.copy()
+        rescale.quantized_lookup_scale(img, 0., 1., -0.01, 1.1)
+        numpy.testing.assert_array_equal(img, orig)
+
+    def test_lookup_method_is_exact(self):
+        assert rescale.Rescaler.rescale_methods["lookup"] is rescale.lookup_scale
+        assert rescale.Rescaler.rescale_methods["lookup_quantized"] is rescale.quantized_lookup_scale
+
+
+def _gridded_product(product_name="test_product", data_kind="brightness_temperature", num_bands=None, offset=0.0,
+                     min_value=150.0, max_value=340.0, rows=53, cols=31):
+    grid_def = GridDefinition(
+        grid_name="test_lcc",
+        proj4_definition="+proj=lcc +datum=WGS84 +ellps=WGS84 +lat_0=25 +lat_1=25 +lon_0=-95 +units=m +no_defs",
+        height=rows, width=cols, cell_width=1000.0, cell_height=-1000.0, origin_x=-115000.0, origin_y=1075000.0,
+    )
+    shape = (rows, cols) if num_bands is None else (num_bands, rows, cols)
+    data = numpy.linspace(min_value, max_value, int(numpy.prod(shape))).astype(numpy.float32).reshape(shape) + offset
+    data[..., 3, :] = numpy.nan
+    data[..., 10:20, 5:9] = numpy.nan
+    return GriddedProduct(
+        product_name=product_name, satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+        end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind=data_kind, units="K",
+        grid_data=data, grid_definition=grid_def, fill_value=numpy.nan,
+    )
+
+
+def _rescaler():
+    import trollimage.colormap as ticolormap
+    rescaler = rescale.Rescaler(rescale.DEFAULT_RCONFIG)
+    # builtin trollimage colormaps are loaded without trying them as a color table file (needs GDAL)
+    rescaler._colormap_cache["ylorrd"] = copy.copy(ticolormap.ylorrd)
+    return rescaler
+
+
+def _rescale_reference(rescaler, gridded_product, data_type, inc_by_one=False, fill_value=None, clip_zero=False):
+    data = rescaler.rescale_product(gridded_product, data_type, inc_by_one=inc_by_one, fill_value=fill_value,
+                                    clip_zero=clip_zero)
+    return clip_to_data_type(data, data_type)
+
+
+class TestRescalePlan(object):
+    @pytest.mark.parametrize(("product_kwargs", "blockwise"), [
+        ({"data_kind": "brightness_temperature"}, True),
+        ({"data_kind": "reflectance", "min_value": -0.01, "max_value": 1.1}, True),
+        ({"data_kind": "radiance", "num_bands": 3, "min_value": -0.1, "max_value": 1.1}, True),
+        # linear without configured limits uses the min/max of all of the data
+        ({"data_kind": "unknown_kind"}, False),
+        ({"product_name": "confidence_pct", "data_kind": "percent", "min_value": -5.0, "max_value": 110.0}, False),
+    ])
+    @pytest.mark.parametrize(("data_type", "inc_by_one", "fill_value", "clip_zero"), [
+        (numpy.uint8, False, 0, False),
+        (numpy.uint8, True, 0, False),
+        (numpy.uint16, False, 0, True),
+        (numpy.int16, False, -1, False),
+    ])
+    @pytest.mark.parametrize("rows_per_block", [1, 7, 512])
+    def test_matches_rescale_product(self, product_kwargs, blockwise, data_type, inc_by_one, fill_value, clip_zero,
+                                     rows_per_block):
+        rescaler = _rescaler()
+        product = _gridded_product(**product_kwargs)
+        plan = rescaler.get_rescale_plan(product, data_type, inc_by_one=inc_by_one, fill_value=fill_value,
+                                         clip_zero=clip_zero)
+        plan.rows_per_block = rows_per_block
+        assert plan.is_blockwise == blockwise
+        expected = _rescale_reference(rescaler, product, data_type, inc_by_one=inc_by_one, fill_value=fill_value,
+                                      clip_zero=clip_zero)
+        result = plan.apply(product)
+        assert result.dtype == expected.dtype
+        numpy.testing.assert_array_equal(result, expected)
+
+        output = numpy.full(expected.shape, 123, dtype=expected.dtype)
+        assert plan.apply(product, output=output) is output
+        numpy.testing.assert_array_equal(output, expected)
+        # the product's data is not modified
+        numpy.testing.assert_array_equal(product.get_data_array(), _gridded_product(**product_kwargs)["grid_data"])
+
+    def test_plan_cache(self, monkeypatch):
+        rescaler = _rescaler()
+        get_options = rescaler.get_rescale_options
+        searches = []
+
+        def _counting_options(*args, **kwargs):
+            searches.append(args[0]["product_name"])
+            return get_options(*args, **kwargs)
+        monkeypatch.setattr(rescaler, "get_rescale_options", _counting_options)
+
+        plan = rescaler.get_rescale_plan(_gridded_product(), numpy.uint8, fill_value=0)
+        # same identifying information with different data uses the same plan
+        second_product = _gridded_product(offset=10.0)
+        assert rescaler.get_rescale_plan(second_product, numpy.uint8, fill_value=0) is plan
+        assert searches == ["test_product"]
+        numpy.testing.assert_array_equal(plan.apply(second_product),
+                                         _rescale_reference(rescaler, second_product, numpy.uint8, fill_value=0))
+
+        del searches[:]
+        assert rescaler.get_rescale_plan(_gridded_product(), numpy.uint16, fill_value=0) is not plan
+        assert rescaler.get_rescale_plan(_gridded_product(), numpy.uint8, fill_value=0, inc_by_one=True) is not plan
+        assert rescaler.get_rescale_plan(_gridded_product(), numpy.uint8, fill_value=1) is not plan
+        assert rescaler.get_rescale_plan(_gridded_product(data_kind="reflectance"), numpy.uint8,
+                                         fill_value=0) is not plan
+        assert len(searches) == 4
+
+    def test_colormap_not_shared(self):
+        import trollimage.colormap as ticolormap
+        rescaler = _rescaler()
+        original_values = numpy.array(ticolormap.ylorrd.values)
+        pct_product = _gridded_product(product_name="confidence_pct", data_kind="percent", min_value=0.0,
+                                       max_value=100.0)
+        cat_product = _gridded_product(product_name="confidence_cat", data_kind="category", min_value=7.0,
+                                       max_value=9.0)
+        pct_plan = rescaler.get_rescale_plan(pct_product, numpy.uint8, fill_value=0)
+        cat_plan = rescaler.get_rescale_plan(cat_product, numpy.uint8, fill_value=0)
+        pct_colormap = pct_plan.rescale_options["colormap"]
+        cat_colormap = cat_plan.rescale_options["colormap"]
+        assert pct_colormap is not cat_colormap
+        pct_values = pct_colormap.values
+
+        expected_pct = pct_plan.apply(pct_product)
+        cat_plan.apply(cat_product)
+        cat_plan.apply(_gridded_product(product_name="confidence_cat", data_kind="category", min_value=6.0,
+                                        max_value=10.0))
+        numpy.testing.assert_array_equal(pct_plan.apply(pct_product), expected_pct)
+
+        # applying a plan doesn't change its colormap
+        assert pct_colormap.values is pct_values
+        assert pct_colormap.values[0] == 0 and pct_colormap.values[-1] == 100
+        assert cat_colormap.values[0] == 7 and cat_colormap.values[-1] == 9
+        numpy.testing.assert_array_equal(rescaler._colormap_cache["ylorrd"].values, original_values)
+        numpy.testing.assert_array_equal(ticolormap.ylorrd.values, original_values)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the single file scene package format.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+import numpy
+import pytest
+
+from polar2grid.core import scene_package
+from polar2grid.core.containers import BaseP2GObject, SwathDefinition, SwathProduct, SwathScene, GriddedScene
+
+LOG = logging.getLogger(__name__)
+
+
+def _swath_scene(tmpdir, rows=12, cols=10):
+    lons, lats = numpy.meshgrid(numpy.linspace(-100., -90., cols), numpy.linspace(30., 40., rows))
+    lat_fn = str(tmpdir.join("latitude.dat"))
+    lats.astype(numpy.float32).tofile(lat_fn)
+    swath_def = SwathDefinition(
+        swath_name="test_swath", longitude=lons.astype(numpy.float32), latitude=lat_fn, data_type=numpy.float32,
+        swath_rows=rows, swath_columns=cols, fill_value=numpy.nan)
+    swath_def.set_persist()
+    scene = SwathScene()
+    for idx, name in enumerate(("i01", "i02")):
+        scene[name] = SwathProduct(
+            product_name=name, satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+            end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind="reflectance", units="%",
+            swath_data=numpy.arange(rows * cols, dtype=numpy.float32).reshape((rows, cols)) * (idx + 1),
+            swath_definition=swath_def, fill_value=numpy.nan, rows_per_scan=4)
+    return scene
+
+
+def _footer(filename):
+    with open(filename, "rb") as package_file:
+        magic, footer_offset = scene_package._HEADER.unpack(package_file.read(scene_package._HEADER.size))
+        package_file.seek(footer_offset)
+        return json.loads(package_file.read().decode("utf-8"))
+
+
+def _file_hash(filename):
+    with open(filename, "rb") as package_file:
+        return hashlib.sha1(package_file.read()).hexdigest()
+
+
+class TestScenePackage(object):
+    def test_round_trip(self, tmpdir):
+        scene = _swath_scene(tmpdir)
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        scene.save(fn)
+        assert scene_package.is_package_file(fn)
+        assert not scene_package.is_package_file(str(tmpdir.join("latitude.dat")))
+
+        loaded = BaseP2GObject.load(fn)
+        assert type(loaded) is SwathScene
+        assert sorted(loaded.keys()) == ["i01", "i02"]
+        for name, product in loaded.items():
+            assert type(product) is SwathProduct
+            assert type(product["swath_definition"]) is SwathDefinition
+            for k in ("product_name", "begin_time", "data_type", "rows_per_scan", "units"):
+                assert product[k] == scene[name][k]
+            numpy.testing.assert_array_equal(product.get_data_array(), scene[name].get_data_array())
+        swath_def = loaded["i01"]["swath_definition"]
+        numpy.testing.assert_array_equal(swath_def.get_longitude_array(),
+                                         scene["i01"]["swath_definition"].get_longitude_array())
+        numpy.testing.assert_array_equal(swath_def.get_latitude_array(),
+                                         scene["i01"]["swath_definition"].get_latitude_array())
+
+    def test_shared_swath_definition_stored_once(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        _swath_scene(tmpdir).save(fn)
+        footer = _footer(fn)
+        # longitude, latitude, and one data array per product
+        assert len(footer["arrays"]) == 4
+        assert len(footer["objects"]) == 1
+        assert footer["object"]["i01"]["swath_definition"] == {"__object__": 0}
+        loaded = SwathScene.load(fn)
+        assert loaded["i01"]["swath_definition"] is loaded["i02"]["swath_definition"]
+
+    def test_arrays_page_aligned(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        _swath_scene(tmpdir).save(fn)
+        for offset, _, _ in _footer(fn)["arrays"]:
+            assert offset % scene_package.PACKAGE_ALIGNMENT == 0
+
+    def test_copy_on_write(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        scene = _swath_scene(tmpdir)
+        scene.save(fn)
+        orig_hash = _file_hash(fn)
+
+        loaded = SwathScene.load(fn)
+        data = loaded["i01"].get_data_array(mode="r+")
+        data[:] = -1
+        loaded["i01"]["swath_definition"].get_longitude_array()[:] = 0
+        assert (loaded["i01"].get_data_array() == -1).all()
+        del data, loaded
+        assert _file_hash(fn) == orig_hash
+        reloaded = SwathScene.load(fn)
+        numpy.testing.assert_array_equal(reloaded["i01"].get_data_array(), scene["i01"].get_data_array())
+
+    @pytest.mark.parametrize("shape", [(0, 10), (3, 12, 10)])
+    def test_empty_and_3d_arrays(self, tmpdir, shape):
+        scene = _swath_scene(tmpdir)
+        data = numpy.arange(int(numpy.prod(shape)), dtype=numpy.float64).reshape(shape)
+        scene["i01"]["swath_data"] = data
+        scene["i01"]["data_type"] = numpy.float64
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        scene.save(fn)
+        loaded = SwathScene.load(fn)
+        loaded_data = loaded["i01"]["swath_data"]
+        assert loaded_data.shape == shape
+        assert loaded_data.dtype == numpy.float64
+        numpy.testing.assert_array_equal(loaded_data, data)
+        numpy.testing.assert_array_equal(loaded["i02"].get_data_array(), scene["i02"].get_data_array())
+
+    def test_load_wrong_class(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        _swath_scene(tmpdir).save(fn)
+        with pytest.raises(ValueError):
+            GriddedScene.load(fn)
+        with pytest.raises(ValueError):
+            BaseP2GObject.load(fn, object_class=SwathProduct)
+
+    def test_not_a_package(self, tmpdir):
+        fn = tmpdir.join("bad.p2g")
+        fn.write_binary(b"NOTAPKG!" + b"\x00" * 64)
+        with pytest.raises(ValueError):
+            scene_package.load_package(str(fn))
+
+    def test_json_footer(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        _swath_scene(tmpdir).save(fn)
+        footer = _footer(fn)
+        assert footer["object"]["__class__"] == "SwathScene"
+        product = footer["object"]["i02"]
+        assert product["__class__"] == "SwathProduct"
+        assert product["begin_time"] == "2020-01-01T12:00:00"
+        assert product["data_type"] == "real4"
+        assert product["swath_data"] == {"__array__": 3}
+        assert footer["objects"][0]["swath_name"] == "test_swath"
+        assert footer["arrays"][3][1:] == [numpy.dtype(numpy.float32).str, [12, 10]]
+
+    def test_load_not_a_p2g_object(self, tmpdir):
+        fn = str(tmpdir.join("swath_scene.p2g"))
+        _swath_scene(tmpdir).save(fn)
+        with open(fn, "rb") as package_file:
+            contents = package_file.read()
+        fn = str(tmpdir.join("bad_class.p2g"))
+        with open(fn, "wb") as package_file:
+            package_file.write(contents.replace(b'"SwathScene"', b'"collections.OrderedDict"'))
+        with pytest.raises(ValueError):
+            scene_package.load_package(fn)
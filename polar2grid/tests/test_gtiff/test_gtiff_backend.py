@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test streaming rescaled blocks to GeoTIFF files.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+from datetime import datetime
+
+import numpy
+import pytest
+
+from polar2grid.core.containers import GriddedProduct, GridDefinition
+
+gdal = pytest.importorskip("osgeo.gdal")
+from polar2grid import gtiff_backend  # noqa: E402
+
+LOG = logging.getLogger(__name__)
+
+ROWS = 300
+COLS = 170
+
+RESCALE_CONFIG = """
+[rescale:default]
+method=linear
+
+[rescale:test_linear]
+data_kind=test_linear
+method=linear
+min_in=200.0
+max_in=300.0
+
+[rescale:test_true_color]
+data_kind=test_true_color
+method=lookup
+min_in=0.0
+max_in=120.0
+separate_rgb=False
+"""
+
+
+def _rescale_config(tmpdir):
+    fn = str(tmpdir.join("test_rescale.ini"))
+    with open(fn, "w") as config_file:
+        config_file.write(RESCALE_CONFIG)
+    return fn
+
+
+def _gridded_product(data_kind, num_bands=None):
+    grid_def = GridDefinition(
+        grid_name="test_lcc",
+        proj4_definition="+proj=lcc +datum=WGS84 +ellps=WGS84 +lat_0=25 +lat_1=25 +lon_0=-95 +units=m +no_defs",
+        height=ROWS, width=COLS, cell_width=1000.0, cell_height=-1000.0, origin_x=-115000.0, origin_y=1075000.0,
+    )
+    shape = (ROWS, COLS) if num_bands is None else (num_bands, ROWS, COLS)
+    data = numpy.linspace(180.0, 320.0, int(numpy.prod(shape))).astype(numpy.float32).reshape(shape)
+    if data_kind == "test_true_color":
+        data = (data - 200.0) * 0.9
+    data[..., :20, :40] = numpy.nan
+    data[..., 150, :] = numpy.nan
+    return GriddedProduct(
+        product_name="test_product", satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+        end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind=data_kind, units="1",
+        grid_data=data, grid_definition=grid_def, fill_value=numpy.nan,
+    )
+
+
+def _read_geotiff(fn):
+    gtiff = gdal.Open(fn)
+    data = gtiff.ReadAsArray()
+    metadata = gtiff.GetMetadata()
+    nodata = [gtiff.GetRasterBand(idx + 1).GetNoDataValue() for idx in range(gtiff.RasterCount)]
+    return data, metadata, nodata
+
+
+class TestStreamBlocks(object):
+    @pytest.mark.parametrize(("data_kind", "num_bands", "streamed"), [
+        ("test_linear", None, True),
+        ("test_linear", 3, True),
+        ("test_true_color", 3, False),
+        ("unknown_kind", None, False),
+    ])
+    @pytest.mark.parametrize("gtiff_kwargs", [
+        {"min_block_rows": 64},
+        {"min_block_rows": 1, "tiled": True, "blockxsize": 64, "blockysize": 32},
+    ])
+    def test_streamed_matches_in_memory(self, tmpdir, monkeypatch, data_kind, num_bands, streamed, gtiff_kwargs):
+        block_calls = []
+        create_from_blocks = gtiff_backend.create_geotiff_from_blocks
+
+        def _counting_create(*args, **kwargs):
+            block_calls.append(args)
+            return create_from_blocks(*args, **kwargs)
+        monkeypatch.setattr(gtiff_backend, "create_geotiff_from_blocks", _counting_create)
+
+        backend = gtiff_backend.Backend(rescale_configs=[_rescale_config(tmpdir)])
+        outputs = {}
+        for stream_blocks in (True, False):
+            fn = str(tmpdir.join("stream_{}.tif".format(stream_blocks)))
+            backend.create_output_from_product(_gridded_product(data_kind, num_bands), output_pattern=fn,
+                                               stream_blocks=stream_blocks, **gtiff_kwargs)
+            outputs[stream_blocks] = _read_geotiff(fn)
+        assert len(block_calls) == (1 if streamed else 0)
+
+        streamed_data, streamed_meta, streamed_nodata = outputs[True]
+        memory_data, memory_meta, memory_nodata = outputs[False]
+        assert streamed_data.shape == ((ROWS, COLS) if num_bands is None else (num_bands, ROWS, COLS))
+        assert streamed_data.dtype == memory_data.dtype
+        assert len(numpy.unique(memory_data)) > 2
+        numpy.testing.assert_array_equal(streamed_data, memory_data)
+        assert streamed_meta == memory_meta
+        assert streamed_nodata == memory_nodata
+
+    def test_float_output_not_rescaled(self, tmpdir):
+        backend = gtiff_backend.Backend(rescale_configs=[_rescale_config(tmpdir)])
+        product = _gridded_product("test_linear")
+        fn = str(tmpdir.join("float.tif"))
+        backend.create_output_from_product(product, output_pattern=fn, data_type=numpy.float32, min_block_rows=7)
+        numpy.testing.assert_array_equal(_read_geotiff(fn)[0], product.get_data_array())
+
+
+class TestCreateFromBlocks(object):
+    @pytest.mark.parametrize("min_block_rows", [1, 7, 256, 1000])
+    def test_rows_requested(self, tmpdir, min_block_rows):
+        data = numpy.arange(ROWS * COLS, dtype=numpy.uint16).reshape((ROWS, COLS))
+        requested = []
+
+        def _get_block(band_idx, row_start, row_end):
+            requested.append((band_idx, row_start, row_end))
+            return data[row_start:row_end].copy()
+
+        fn = str(tmpdir.join("blocks.tif"))
+        gtiff = gtiff_backend.create_geotiff_from_blocks(
+            _get_block, 1, ROWS, COLS, fn, "+proj=latlong +datum=WGS84 +ellps=WGS84 +no_defs",
+            (0.0, 1.0, 0.0, 0.0, 0.0, -1.0), etype=gdal.GDT_UInt16, min_block_rows=min_block_rows)
+        del gtiff
+        numpy.testing.assert_array_equal(_read_geotiff(fn)[0], data)
+        assert requested[0][1] == 0 and requested[-1][2] == ROWS
+        assert all(prev[2] == cur[1] for prev, cur in zip(requested[:-1], requested[1:]))
+        assert all(end - start >= min(min_block_rows, ROWS - start) for _, start, end in requested)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the ATMS limb correction in the MIRS frontend.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.mirs import mirs2swath
+
+LOG = logging.getLogger(__name__)
+
+
+def _limb_correction_reference(datasets, dmean, coeffs, amean, nchx, nchanx):
+    """Previous per channel, per FOV, per input channel limb correction."""
+    all_new_ds = []
+    coeff_sum = numpy.zeros(datasets.shape[1], dtype=datasets[0].dtype)
+    for channel_idx in range(datasets.shape[0]):
+        ds = datasets[channel_idx]
+        new_ds = ds.copy()
+        all_new_ds.append(new_ds)
+        for fov_idx in range(96):
+            coeff_sum[:] = 0
+            for k in range(nchx[channel_idx]):
+                coef = coeffs[channel_idx, fov_idx, nchanx[channel_idx, k]] * (
+                    datasets[nchanx[channel_idx, k], :, fov_idx] -
+                    amean[nchanx[channel_idx, k], fov_idx, channel_idx])
+                coeff_sum += coef
+            new_ds[:, fov_idx] = coeff_sum + dmean[channel_idx]
+    return numpy.array(all_new_ds)
+
+
+def _brightness_temperatures(rows=45, seed=0):
+    rng = numpy.random.RandomState(seed)
+    bt = rng.uniform(180.0, 300.0, (22, rows, 96)).astype(numpy.float32)
+    bt[3, rows // 7, 10] = numpy.nan
+    bt[:, rows // 2, 50] = numpy.nan
+    return bt
+
+
+@pytest.fixture
+def limb_cache(tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join("limb_cache"))
+    monkeypatch.setattr(mirs2swath, "LIMB_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(mirs2swath, "_limb_coefficients", {})
+    return cache_dir
+
+
+class TestATMSLimbCorrection(object):
+    @pytest.mark.parametrize("coeff_file", [mirs2swath.LIMB_SEA_FILE, mirs2swath.LIMB_LAND_FILE])
+    @pytest.mark.parametrize(("rows", "nprocs"), [(45, 1), (45, 4), (3, 4), (1, 1)])
+    def test_matches_reference(self, limb_cache, coeff_file, rows, nprocs):
+        bt = _brightness_temperatures(rows=rows)
+        coeff_results = mirs2swath.read_atms_limb_correction_coefficients(coeff_file)
+        expected = _limb_correction_reference(bt, *coeff_results)
+        result = mirs2swath.apply_atms_limb_correction(bt, *coeff_results, nprocs=nprocs)
+        assert result.shape == bt.shape
+        assert result.dtype == bt.dtype
+        numpy.testing.assert_array_equal(numpy.isnan(result), numpy.isnan(expected))
+        numpy.testing.assert_allclose(result, expected, rtol=0, atol=2e-4)
+        # the input isn't modified
+        numpy.testing.assert_array_equal(bt, _brightness_temperatures(rows=rows))
+
+
+class TestLimbCoefficientCache(object):
+    def test_npz_round_trip(self, limb_cache, monkeypatch):
+        with open(os.path.join(os.path.dirname(mirs2swath.__file__), "limball_atmssea.txt")) as coeff_file:
+            expected = mirs2swath.parse_atms_limb_correction_coefficients(coeff_file.read())
+        first = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        cache_files = os.listdir(limb_cache)
+        assert len(cache_files) == 1 and cache_files[0].endswith(".npz")
+        # the same file is only read from disk once per process
+        assert mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE) is first
+
+        def _fail_parse(coeff_str):
+            raise AssertionError("coefficients should have been loaded from the cache")
+        monkeypatch.setattr(mirs2swath, "parse_atms_limb_correction_coefficients", _fail_parse)
+        monkeypatch.setattr(mirs2swath, "_limb_coefficients", {})
+        cached = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        assert cached is not first
+        for name, exp_arr, first_arr, cached_arr in zip(mirs2swath.LIMB_COEFF_NAMES, expected, first, cached):
+            assert cached_arr.dtype == exp_arr.dtype, name
+            numpy.testing.assert_array_equal(first_arr, exp_arr)
+            numpy.testing.assert_array_equal(cached_arr, exp_arr)
+        assert os.listdir(limb_cache) == cache_files
+
+    def test_different_files_cached_separately(self, limb_cache):
+        sea = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        land = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_LAND_FILE)
+        assert len(os.listdir(limb_cache)) == 2
+        assert not numpy.array_equal(sea[1], land[1])
+
+    def test_corrupt_cache_reparsed(self, limb_cache):
+        first = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        cache_fn = os.path.join(limb_cache, os.listdir(limb_cache)[0])
+        with open(cache_fn, "wb") as cache_file:
+            cache_file.write(b"not an npz file")
+        mirs2swath._limb_coefficients.clear()
+        reparsed = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        for first_arr, reparsed_arr in zip(first, reparsed):
+            numpy.testing.assert_array_equal(reparsed_arr, first_arr)
+        with numpy.load(cache_fn) as cache_file:
+            numpy.testing.assert_array_equal(cache_file["coeffs"], first[1])
+
+    def test_cache_disabled(self, tmpdir, monkeypatch):
+        monkeypatch.setattr(mirs2swath, "LIMB_CACHE_DIR", "")
+        monkeypatch.setattr(mirs2swath, "_limb_coefficients", {})
+        monkeypatch.chdir(tmpdir)
+        coeff_results = mirs2swath.read_atms_limb_correction_coefficients(mirs2swath.LIMB_SEA_FILE)
+        assert len(coeff_results) == len(mirs2swath.LIMB_COEFF_NAMES)
+        assert not tmpdir.listdir()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the MODIS brightness temperature calculations.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.modis import bt
+
+LOG = logging.getLogger(__name__)
+
+EMISSIVE_BANDS = list(range(20, 26)) + list(range(27, 37))
+# maximum difference (Kelvin) between the lookup table and exact brightness temperatures
+LUT_TOLERANCE = 1e-3
+
+
+def _band_radiances(platform, band, units, min_bt=100.0, max_bt=450.0, num=100001):
+    """Radiances for brightness temperatures reaching past both ends of the lookup table plus invalid radiances."""
+    C = bt._coeffs(platform, bt._band_offset(band))
+    temps = numpy.linspace(min_bt, max_bt, num) * C.tcs + C.tci
+    if units == "micron":
+        rad = bt.micron_planck(1.0e+4 / C.cwn, temps)
+    else:
+        rad = bt.wnum_planck(C.cwn, temps)
+    return numpy.concatenate([rad, [0.0, -1.0, numpy.nan]]).astype(numpy.float32)
+
+
+class TestBrightShiftLUT(object):
+    @pytest.mark.parametrize("units", ["micron", "wavenumber"])
+    @pytest.mark.parametrize("platform", ["Aqua", "Terra"])
+    @pytest.mark.parametrize("band", EMISSIVE_BANDS)
+    def test_error_bound(self, band, platform, units):
+        rad = _band_radiances(platform, band, units)
+        exact = bt.bright_shift(platform, rad, band, units=units)
+        lut = bt.bright_shift(platform, rad, band, units=units, use_lut=True)
+        assert lut.dtype == numpy.float32
+        numpy.testing.assert_array_equal(numpy.isnan(lut), numpy.isnan(exact))
+        max_error = numpy.nanmax(numpy.abs(lut - exact))
+        LOG.info("Band %d %s %s LUT max error: %gK", band, platform, units, max_error)
+        assert max_error < LUT_TOLERANCE
+
+    def test_planck_inverse(self):
+        C = bt._coeffs("Aqua", bt._band_offset(31))
+        temps = numpy.linspace(150.0, 400.0, 11)
+        numpy.testing.assert_allclose(bt.micron_bt(1.0e+4 / C.cwn, bt.micron_planck(1.0e+4 / C.cwn, temps)), temps)
+        numpy.testing.assert_allclose(bt.wnum_bt(C.cwn, bt.wnum_planck(C.cwn, temps)), temps)
+
+    def test_in_place(self):
+        rad = _band_radiances("Terra", 31, "micron").reshape((4, -1))
+        exact = bt.bright_shift("Terra", rad, 31)
+        result = bt.bright_shift("Terra", rad, 31, use_lut=True, out=rad)
+        assert result is rad
+        assert numpy.nanmax(numpy.abs(rad - exact)) < LUT_TOLERANCE
+
+    def test_cached(self):
+        assert bt.get_bright_shift_lut("Aqua", 20) is bt.get_bright_shift_lut("Aqua", 20)
+        assert bt.get_bright_shift_lut("Aqua", 20) is not bt.get_bright_shift_lut("Terra", 20)
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        rng = numpy.random.RandomState(0)
+        rad = rng.uniform(0.5, 12.0, (2030, 1354)).astype(numpy.float32)
+        bt.get_bright_shift_lut("Aqua", 31)
+        start = time.perf_counter()
+        exact = bt.bright_shift("Aqua", rad, 31)
+        exact_time = time.perf_counter() - start
+        start = time.perf_counter()
+        lut = bt.bright_shift("Aqua", rad, 31, use_lut=True)
+        lut_time = time.perf_counter() - start
+        LOG.info("Band 31 brightness temperatures for %d pixels: exact %.4fs, LUT %.4fs", rad.size, exact_time,
+                 lut_time)
+        assert numpy.abs(lut - exact).max() < LUT_TOLERANCE
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the MODIS 250m and 500m geolocation interpolation.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.modis import modis_geo_interp_250
+
+LOG = logging.getLogger(__name__)
+
+# maximum difference (degrees) between the batched and per scan interpolation
+GEO_TOLERANCE = 2e-5
+
+
+def _modis_geolocation(num_scans, partial_rows=0, num_cols=40, lat0=50.0, dtype=numpy.float64):
+    """1km-like swath crossing the anti-meridian with some bow-tie between the rows of each scan."""
+    rows = numpy.arange(num_scans * modis_geo_interp_250.ROWS_PER_SCAN + partial_rows)[:, None]
+    cols = numpy.arange(num_cols)[None, :]
+    scan_row = rows % modis_geo_interp_250.ROWS_PER_SCAN - 4.5
+    lons = 179.8 + 0.014 * cols + 0.001 * rows + 0.0002 * scan_row * (cols - num_cols / 2.)
+    lats = lat0 - 0.009 * rows + 0.002 * cols + 0.00005 * scan_row * numpy.abs(cols - num_cols / 2.)
+    lons = (lons + 180.) % 360. - 180.
+    # invalid pixel in the middle scan
+    invalid_row = modis_geo_interp_250.ROWS_PER_SCAN * (num_scans // 2) + 3
+    lons[invalid_row, 5] = numpy.nan
+    lats[invalid_row, 5] = numpy.nan
+    return lons.astype(dtype), lats.astype(dtype)
+
+
+def _assert_geo_close(actual, expected):
+    numpy.testing.assert_array_equal(numpy.isnan(actual), numpy.isnan(expected))
+    diff = numpy.abs(actual - expected)
+    # longitudes on either side of the anti-meridian
+    diff = numpy.minimum(diff, 360. - diff)
+    assert numpy.nanmax(diff) < GEO_TOLERANCE
+
+
+class TestInterpolateGeolocation(object):
+    @pytest.mark.parametrize("res_factor", [4, 2])
+    @pytest.mark.parametrize("dtype", [numpy.float32, numpy.float64])
+    @pytest.mark.parametrize("lat0", [-70.0, 0.0, 50.0, 85.0])
+    @pytest.mark.parametrize(("num_scans", "partial_rows", "scans_per_block"), [
+        (7, 0, 3),
+        (7, 3, 3),
+        (4, 0, modis_geo_interp_250.SCANS_PER_BLOCK),
+        (1, 6, 1),
+    ])
+    def test_matches_per_scan(self, res_factor, dtype, lat0, num_scans, partial_rows, scans_per_block):
+        lons, lats = _modis_geolocation(num_scans, partial_rows=partial_rows, lat0=lat0, dtype=dtype)
+        new_lons, new_lats = modis_geo_interp_250.interpolate_geolocation_cartesian(
+            lons, lats, res_factor=res_factor, scans_per_block=scans_per_block)
+        exp_lons, exp_lats = modis_geo_interp_250.interpolate_geolocation_cartesian(
+            lons, lats, res_factor=res_factor, method="per_scan")
+
+        assert new_lons.shape == new_lats.shape == (lons.shape[0] * res_factor, lons.shape[1] * res_factor)
+        assert new_lons.dtype == new_lats.dtype == dtype
+        # the per scan method leaves the rows of a partial scan uninitialized
+        scan_rows = num_scans * modis_geo_interp_250.ROWS_PER_SCAN * res_factor
+        _assert_geo_close(new_lons[:scan_rows], exp_lons[:scan_rows])
+        _assert_geo_close(new_lats[:scan_rows], exp_lats[:scan_rows])
+        assert numpy.isnan(new_lons[scan_rows:]).all()
+        assert numpy.isnan(new_lats[scan_rows:]).all()
+        # the invalid pixel only affects the interpolated pixels around it
+        assert 0 < numpy.isnan(new_lons[:scan_rows]).sum() <= (2 * res_factor + 2) ** 2
+
+    def test_block_size_independent(self):
+        lons, lats = _modis_geolocation(9, partial_rows=4)
+        expected = modis_geo_interp_250.interpolate_geolocation_cartesian(lons, lats, scans_per_block=9)
+        for scans_per_block in [1, 2, 4, 8, 100]:
+            result = modis_geo_interp_250.interpolate_geolocation_cartesian(lons, lats,
+                                                                             scans_per_block=scans_per_block)
+            for new_arr, exp_arr in zip(result, expected):
+                numpy.testing.assert_array_equal(new_arr, exp_arr)
+
+    def test_unknown_method(self):
+        lons, lats = _modis_geolocation(1)
+        with pytest.raises(ValueError):
+            modis_geo_interp_250.interpolate_geolocation_cartesian(lons, lats, method="bicubic")
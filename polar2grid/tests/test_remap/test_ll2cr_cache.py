@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the persistent ll2cr and nearest neighbor result cache.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import logging
+
+import numpy
+import pytest
+
+from polar2grid.core.containers import SwathDefinition
+from polar2grid.remap import ll2cr_cache
+
+LOG = logging.getLogger(__name__)
+
+
+def _swath_def(lon_offset=0.0, lat_offset=0.0, fill_value=numpy.nan, swath_name="test_swath"):
+    lons, lats = numpy.meshgrid(numpy.linspace(-100., -90., 10), numpy.linspace(30., 40., 12))
+    return SwathDefinition(
+        swath_name=swath_name,
+        longitude=(lons + lon_offset).astype(numpy.float32),
+        latitude=(lats + lat_offset).astype(numpy.float32),
+        data_type=numpy.float32,
+        swath_rows=12,
+        swath_columns=10,
+        fill_value=fill_value,
+    )
+
+
+def _grid_def(**kwargs):
+    grid_def = {
+        "grid_name": "test_grid",
+        "proj4_definition": "+proj=latlong +datum=WGS84 +ellps=WGS84 +no_defs",
+        "cell_width": 0.1,
+        "cell_height": -0.1,
+        "width": None,
+        "height": None,
+        "origin_x": None,
+        "origin_y": None,
+    }
+    grid_def.update(kwargs)
+    return grid_def
+
+
+def _write_files(tmpdir, prefix, *arrays):
+    filenames = []
+    for idx, arr in enumerate(arrays):
+        fn = str(tmpdir.join("%s_%d.dat" % (prefix, idx)))
+        arr.tofile(fn)
+        filenames.append(fn)
+    return filenames
+
+
+def _ll2cr_result(seed, size=120):
+    rng = numpy.random.RandomState(seed)
+    return rng.uniform(0, 100, size).astype(numpy.float32), rng.uniform(0, 100, size).astype(numpy.float32)
+
+
+def _completed_grid():
+    return _grid_def(width=100, height=120, origin_x=-100.0, origin_y=40.0)
+
+
+class TestSizes(object):
+    @pytest.mark.parametrize(("size_str", "num_bytes"), [
+        ("4G", 4 * 1024 ** 3), ("500m", 500 * 1024 ** 2), ("1.5K", 1536), ("2GB", 2 * 1024 ** 3), ("100", 100),
+        (2048, 2048),
+    ])
+    def test_parse_size(self, size_str, num_bytes):
+        assert ll2cr_cache.parse_size(size_str) == num_bytes
+
+    @pytest.mark.parametrize(("num_bytes", "size_str"), [
+        (100, "100B"), (1536, "1.5K"), (4 * 1024 ** 3, "4.0G"), (3 * 1024 ** 4, "3.0T"),
+    ])
+    def test_format_size(self, num_bytes, size_str):
+        assert ll2cr_cache.format_size(num_bytes) == size_str
+        assert ll2cr_cache.parse_size(size_str) == num_bytes
+
+
+class TestLL2CRCacheKey(object):
+    def test_same_inputs_same_key(self, tmpdir):
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        # the swath name isn't part of the key, only the geolocation data
+        assert cache.get_key(_swath_def(), _grid_def()) == \
+            cache.get_key(_swath_def(swath_name="other_swath"), _grid_def(grid_name="other_name"))
+
+    @pytest.mark.parametrize(("swath_kwargs", "grid_kwargs"), [
+        ({"lon_offset": 1e-4}, {}),
+        ({"lat_offset": 1e-4}, {}),
+        ({"fill_value": -999.0}, {}),
+        ({}, {"cell_width": 0.2}),
+        ({}, {"proj4_definition": "+proj=eqc +datum=WGS84 +ellps=WGS84 +no_defs"}),
+        ({}, {"width": 100, "height": 120, "origin_x": -100.0, "origin_y": 40.0}),
+    ])
+    def test_key_changes(self, tmpdir, swath_kwargs, grid_kwargs):
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        base_key = cache.get_key(_swath_def(), _grid_def())
+        assert cache.get_key(_swath_def(**swath_kwargs), _grid_def(**grid_kwargs)) != base_key
+
+
+class TestLL2CRCache(object):
+    def test_miss_and_hit(self, tmpdir):
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        key = cache.get_key(_swath_def(), _grid_def())
+        cols_fn = str(tmpdir.join("ll2cr_cols.dat"))
+        rows_fn = str(tmpdir.join("ll2cr_rows.dat"))
+        assert cache.get(key, cols_fn, rows_fn) is None
+        assert not os.path.exists(cols_fn) and not os.path.exists(rows_fn)
+
+        cols, rows = _ll2cr_result(0)
+        put_cols_fn, put_rows_fn = _write_files(tmpdir, "result", cols, rows)
+        cache.put(key, put_cols_fn, put_rows_fn, _completed_grid(), 95, swath_name="test_swath")
+        meta = cache.get(key, cols_fn, rows_fn)
+        assert meta is not None
+        assert meta["points_in_grid"] == 95
+        assert meta["width"] == 100 and meta["origin_y"] == 40.0
+        assert meta["swath_name"] == "test_swath"
+        numpy.testing.assert_array_equal(numpy.fromfile(cols_fn, dtype=numpy.float32), cols)
+        numpy.testing.assert_array_equal(numpy.fromfile(rows_fn, dtype=numpy.float32), rows)
+
+    def test_partial_entry_is_miss(self, tmpdir):
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        key = cache.get_key(_swath_def(), _grid_def())
+        cache.put(key, *_write_files(tmpdir, "result", *_ll2cr_result(0)), grid_definition=_completed_grid(),
+                  points_in_grid=95)
+        os.remove(cache._data_paths(key)[1])
+        cols_fn = str(tmpdir.join("ll2cr_cols.dat"))
+        rows_fn = str(tmpdir.join("ll2cr_rows.dat"))
+        assert cache.get(key, cols_fn, rows_fn) is None
+        assert not os.path.exists(cols_fn) and not os.path.exists(rows_fn)
+
+    def test_lru_eviction(self, tmpdir):
+        entry_size = 2 * 120 * 4
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")), max_size=2 * entry_size)
+        keys = ["entry_a", "entry_b", "entry_c"]
+        for idx, key in enumerate(keys[:2]):
+            cache.put(key, *_write_files(tmpdir, key, *_ll2cr_result(idx)), grid_definition=_completed_grid(),
+                      points_in_grid=95)
+        # make 'entry_a' older than 'entry_b' then use it so 'entry_b' is the least recently used
+        os.utime(cache._meta_path("entry_a"), (1000, 1000))
+        os.utime(cache._meta_path("entry_b"), (2000, 2000))
+        assert cache.get("entry_a", str(tmpdir.join("a_cols.dat")), str(tmpdir.join("a_rows.dat"))) is not None
+        assert [key for key, _, _ in cache.entries()] == ["entry_a", "entry_b"]
+        assert cache.total_size() == 2 * entry_size
+
+        cache.put("entry_c", *_write_files(tmpdir, "entry_c", *_ll2cr_result(2)),
+                  grid_definition=_completed_grid(), points_in_grid=95)
+        assert sorted(key for key, _, _ in cache.entries()) == ["entry_a", "entry_c"]
+        assert not any(os.path.exists(fp) for fp in cache._data_paths("entry_b"))
+        assert cache.total_size() == 2 * entry_size
+
+        assert cache.prune(max_size=entry_size) == 1
+        assert cache.clear() == 1
+        assert cache.entries() == []
+
+    def test_entries_not_modified_through_working_files(self, tmpdir):
+        cache = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        cols_fn = str(tmpdir.join("ll2cr_cols.dat"))
+        rows_fn = str(tmpdir.join("ll2cr_rows.dat"))
+        first_cols, first_rows = _ll2cr_result(0)
+        first_cols.tofile(cols_fn)
+        first_rows.tofile(rows_fn)
+        cache.put("entry_a", cols_fn, rows_fn, _completed_grid(), 95)
+
+        # a second entry using the same working filenames replaces the files instead of writing in to them
+        second_cols, second_rows = _ll2cr_result(1)
+        assert cache.get("entry_b", cols_fn, rows_fn) is None
+        second_cols.tofile(cols_fn)
+        second_rows.tofile(rows_fn)
+        cache.put("entry_b", cols_fn, rows_fn, _completed_grid(), 95)
+
+        # getting an entry in to working files linked to another entry doesn't modify that entry
+        assert cache.get("entry_a", cols_fn, rows_fn) is not None
+        assert cache.get("entry_b", str(tmpdir.join("b_cols.dat")), str(tmpdir.join("b_rows.dat"))) is not None
+        for key, (cols, rows) in (("entry_a", (first_cols, first_rows)), ("entry_b", (second_cols, second_rows))):
+            cached_cols_fn, cached_rows_fn = cache._data_paths(key)
+            numpy.testing.assert_array_equal(numpy.fromfile(cached_cols_fn, dtype=numpy.float32), cols)
+            numpy.testing.assert_array_equal(numpy.fromfile(cached_rows_fn, dtype=numpy.float32), rows)
+        numpy.testing.assert_array_equal(numpy.fromfile(cols_fn, dtype=numpy.float32), first_cols)
+
+
+class TestNearestIndexCache(object):
+    def _good_mask(self):
+        good_mask = numpy.ones((12, 10), dtype=numpy.bool_)
+        good_mask[3, 4] = False
+        return good_mask
+
+    def test_precomputed_swath_hash(self, tmpdir):
+        cache = ll2cr_cache.NearestIndexCache(str(tmpdir.join("cache")))
+        swath_def = _swath_def()
+        swath_hash = ll2cr_cache.swath_geolocation_hash(swath_def)
+        assert cache.get_key(swath_def, _grid_def(), 2.0, self._good_mask()) == \
+            cache.get_key(swath_def, _grid_def(), 2.0, self._good_mask(), swath_hash=swath_hash)
+        ll2cr = ll2cr_cache.LL2CRCache(str(tmpdir.join("cache")))
+        assert ll2cr.get_key(swath_def, _grid_def()) == ll2cr.get_key(swath_def, _grid_def(), swath_hash=swath_hash)
+
+    def test_key_changes(self, tmpdir):
+        cache = ll2cr_cache.NearestIndexCache(str(tmpdir.join("cache")))
+        good_mask = self._good_mask()
+        base_key = cache.get_key(_swath_def(), _grid_def(), 2.0, good_mask)
+        other_mask = good_mask.copy()
+        other_mask[7, 1] = False
+        other_keys = [
+            cache.get_key(_swath_def(lon_offset=1e-4), _grid_def(), 2.0, good_mask),
+            cache.get_key(_swath_def(lat_offset=1e-4), _grid_def(), 2.0, good_mask),
+            cache.get_key(_swath_def(fill_value=-999.0), _grid_def(), 2.0, good_mask),
+            cache.get_key(_swath_def(), _grid_def(cell_width=0.2), 2.0, good_mask),
+            cache.get_key(_swath_def(), _grid_def(), 3.0, good_mask),
+            cache.get_key(_swath_def(), _grid_def(), 2.0, other_mask),
+        ]
+        assert base_key not in other_keys
+        assert len(set(other_keys)) == len(other_keys)
+        # ll2cr entries in the same directory never share a key with nearest neighbor entries
+        assert ll2cr_cache.LL2CRCache(str(tmpdir.join("cache"))).get_key(_swath_def(), _grid_def()) != base_key
+
+    def test_miss_and_hit(self, tmpdir):
+        cache = ll2cr_cache.NearestIndexCache(str(tmpdir.join("cache")))
+        key = cache.get_key(_swath_def(), _grid_def(), 2.0, self._good_mask())
+        index_fn = str(tmpdir.join("nearest_index.dat"))
+        assert cache.get(key, index_fn) is None
+
+        index = numpy.arange(100 * 120, dtype=numpy.int32)
+        index.tofile(index_fn)
+        cache.put(key, index_fn, _completed_grid(), 2.0, swath_name="test_swath")
+        # replace the working file the same way the remapper does before using the cache
+        os.remove(index_fn)
+        meta = cache.get(key, index_fn)
+        assert meta["kind"] == "nearest"
+        assert meta["distance_upper_bound"] == 2.0
+        assert meta["size"] == index.nbytes
+        numpy.testing.assert_array_equal(numpy.fromfile(index_fn, dtype=numpy.int32), index)
+
+
+class TestRemapperGeolocationHash(object):
+    def test_hash_once_per_swath(self, tmpdir, monkeypatch):
+        from polar2grid.remap import remap
+        hashed = []
+
+        def _counting_hash(swath_definition):
+            hashed.append(swath_definition["swath_name"])
+            return ll2cr_cache.swath_geolocation_hash(swath_definition)
+        monkeypatch.setattr(remap, "swath_geolocation_hash", _counting_hash)
+
+        remapper = remap.Remapper(ll2cr_cache_dir=str(tmpdir.join("cache")))
+        swath_def = _swath_def()
+        first_hash = remapper._geolocation_hash(swath_def)
+        assert remapper._geolocation_hash(swath_def) == first_hash
+        assert remapper._geolocation_hash(_swath_def(lat_offset=1.0, swath_name="other_swath")) != first_hash
+        assert hashed == ["test_swath", "other_swath"]
+
+        # swath names can be reused by the next scene
+        remapper._clear_ll2cr_cache()
+        assert remapper._geolocation_hash(_swath_def(lon_offset=1.0)) != first_hash
+        assert hashed == ["test_swath", "other_swath", "test_swath"]
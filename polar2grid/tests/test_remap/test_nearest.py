@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the tiled nearest neighbor resampling.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+
+import numpy
+import pytest
+from scipy.spatial import cKDTree
+
+from polar2grid.remap import nearest
+
+LOG = logging.getLogger(__name__)
+
+
+def _kdtree_index_reference(cols_array, rows_array, good_mask, grid_rows, grid_cols, distance_upper_bound):
+    """Nearest swath index for every grid cell from one KDTree of the whole swath."""
+    good_indexes = numpy.flatnonzero(good_mask)
+    tree = cKDTree(numpy.column_stack((cols_array[good_indexes], rows_array[good_indexes])))
+    grid_y, grid_x = numpy.mgrid[:grid_rows, :grid_cols]
+    query_points = numpy.column_stack((grid_x.ravel(), grid_y.ravel()))
+    _, idx = tree.query(query_points, distance_upper_bound=distance_upper_bound)
+    result = numpy.full(idx.shape, good_mask.size, dtype=nearest.INDEX_DTYPE)
+    found = idx < good_indexes.size
+    result[found] = good_indexes[idx[found]]
+    return result.reshape((grid_rows, grid_cols))
+
+
+def _swath_points(grid_rows, grid_cols, num_points=2000, seed=42):
+    """Random swath column and row points covering and extending past the grid with some masked points."""
+    rng = numpy.random.RandomState(seed)
+    cols_array = rng.uniform(-5, grid_cols + 5, num_points)
+    rows_array = rng.uniform(-5, grid_rows + 5, num_points)
+    good_mask = rng.uniform(size=num_points) > 0.2
+    # leave an empty region so some grid cells are past the search distance from every valid point
+    hole = (cols_array > grid_cols * 0.5) & (cols_array < grid_cols * 0.8) & (rows_array > grid_rows * 0.5) & \
+        (rows_array < grid_rows * 0.8)
+    good_mask[hole] = False
+    return cols_array, rows_array, good_mask
+
+
+class TestNearestIndex(object):
+    @pytest.mark.parametrize(("grid_rows", "grid_cols", "tile_size"), [
+        (40, 60, 1024),
+        (40, 60, 16),
+        (37, 53, 16),
+        (37, 53, 7),
+        (37, 53, 1),
+    ])
+    @pytest.mark.parametrize("distance_upper_bound", [1.5, 3.0])
+    def test_matches_kdtree(self, grid_rows, grid_cols, tile_size, distance_upper_bound):
+        cols_array, rows_array, good_mask = _swath_points(grid_rows, grid_cols)
+        expected = _kdtree_index_reference(cols_array, rows_array, good_mask, grid_rows, grid_cols,
+                                           distance_upper_bound)
+        result = nearest.nearest_index(cols_array, rows_array, good_mask, grid_rows, grid_cols,
+                                       distance_upper_bound, tile_size=tile_size)
+        assert result.dtype == nearest.INDEX_DTYPE
+        # the test data must exercise the distance cutoff and masked input pixels
+        assert (expected == good_mask.size).any()
+        unmasked = _kdtree_index_reference(cols_array, rows_array, numpy.ones_like(good_mask), grid_rows, grid_cols,
+                                           distance_upper_bound)
+        assert (unmasked != expected).any()
+        numpy.testing.assert_array_equal(result, expected)
+
+    def test_masked_points_never_used(self):
+        cols_array, rows_array, good_mask = _swath_points(37, 53)
+        result = nearest.nearest_index(cols_array, rows_array, good_mask, 37, 53, 3.0, tile_size=8)
+        used = result[result < good_mask.size]
+        assert used.size
+        assert good_mask[used].all()
+
+    def test_no_valid_points(self):
+        cols_array, rows_array, good_mask = _swath_points(20, 30)
+        good_mask[:] = False
+        result = nearest.nearest_index(cols_array, rows_array, good_mask, 20, 30, 3.0, tile_size=8)
+        assert (result == good_mask.size).all()
+
+    def test_memmap_output(self, tmpdir):
+        cols_array, rows_array, good_mask = _swath_points(37, 53)
+        fn = str(tmpdir.join("nearest_index.dat"))
+        result = nearest.nearest_index(cols_array, rows_array, good_mask, 37, 53, 3.0, output_index=fn, tile_size=16)
+        assert isinstance(result, numpy.memmap)
+        result.flush()
+        expected = _kdtree_index_reference(cols_array, rows_array, good_mask, 37, 53, 3.0)
+        on_disk = numpy.fromfile(fn, dtype=nearest.INDEX_DTYPE).reshape((37, 53))
+        numpy.testing.assert_array_equal(on_disk, expected)
+
+
+class TestNearestGather(object):
+    @pytest.mark.parametrize("rows_per_block", [1, 7, 1024])
+    @pytest.mark.parametrize(("dtype", "fill_value"), [
+        (numpy.float32, numpy.nan),
+        (numpy.float64, -999.0),
+        (numpy.int16, -1),
+    ])
+    def test_matches_fancy_index(self, dtype, fill_value, rows_per_block):
+        cols_array, rows_array, good_mask = _swath_points(37, 53)
+        index_array = _kdtree_index_reference(cols_array, rows_array, good_mask, 37, 53, 3.0)
+        input_array = numpy.arange(good_mask.size).astype(dtype)
+        output_array = numpy.empty((37, 53), dtype=dtype)
+        valid_points = nearest.nearest_gather(index_array, input_array, fill_value, output_array,
+                                              rows_per_block=rows_per_block)
+
+        found = index_array < good_mask.size
+        expected = numpy.full((37, 53), fill_value, dtype=dtype)
+        expected[found] = input_array[index_array[found]]
+        numpy.testing.assert_array_equal(output_array, expected)
+        assert valid_points == numpy.count_nonzero(found)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test lazy (in-memory) remapping against file based remapping.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import logging
+from datetime import datetime
+
+import numpy
+import pytest
+import dask.array as da
+
+from polar2grid.core.containers import SwathDefinition, SwathProduct, SwathScene
+from polar2grid.remap.remap import Remapper
+from polar2grid.tests.test_remap import create_test_longitude, create_test_latitude
+
+LOG = logging.getLogger(__name__)
+
+ROWS = 32
+COLS = 40
+ROWS_PER_SCAN = 16
+GRID_NAME = "p2g_test_fit"
+
+
+def _grid_config(tmpdir):
+    fn = str(tmpdir.join("test_grids.conf"))
+    with open(fn, "w") as conf_file:
+        conf_file.write("%s, proj4, +proj=latlong +datum=WGS84 +ellps=WGS84 +no_defs, None, None, 0.25, -0.25, "
+                        "None, None\n" % (GRID_NAME,))
+    return fn
+
+
+def _add_swath_product(scene, tmpdir, lazy, product_name, swath_name="test_swath", lon_offset=0.0, seed=0):
+    """Add a product to `scene` with its own swath data and the geolocation of `swath_name`."""
+    lons = create_test_longitude(-100.0 + lon_offset, -90.0 + lon_offset, (ROWS, COLS), twist_factor=0.01)
+    lats = create_test_latitude(40.0, 30.0, (ROWS, COLS), twist_factor=-0.01)
+    data = numpy.linspace(200.0, 300.0, ROWS * COLS).astype(numpy.float32).reshape((ROWS, COLS))
+    data += numpy.random.RandomState(seed).uniform(-5.0, 5.0, data.shape).astype(numpy.float32)
+    data[5 + seed, 7] = numpy.nan
+    arrays = {"longitude": lons, "latitude": lats, "swath_data": data}
+    if lazy:
+        arrays = {k: da.from_array(v, chunks=(ROWS_PER_SCAN, COLS)) for k, v in arrays.items()}
+    else:
+        for k, v in list(arrays.items()):
+            prefix = product_name if k == "swath_data" else swath_name
+            fn = str(tmpdir.join("%s_%s.dat" % (prefix, k)))
+            v.tofile(fn)
+            arrays[k] = fn
+
+    swath_def = SwathDefinition(
+        swath_name=swath_name, longitude=arrays["longitude"], latitude=arrays["latitude"],
+        data_type=numpy.float32, swath_rows=ROWS, swath_columns=COLS, fill_value=numpy.nan)
+    scene[product_name] = SwathProduct(
+        product_name=product_name, satellite="npp", instrument="viirs", begin_time=datetime(2020, 1, 1, 12),
+        end_time=datetime(2020, 1, 1, 12, 5), data_type=numpy.float32, data_kind="btemp", units="K",
+        swath_data=arrays["swath_data"], swath_definition=swath_def, fill_value=numpy.nan,
+        rows_per_scan=ROWS_PER_SCAN)
+    return scene
+
+
+def _swath_scene(tmpdir, lazy):
+    return _add_swath_product(SwathScene(), tmpdir, lazy, "test_bt")
+
+
+def _remap(tmpdir, lazy, remap_method):
+    remapper = Remapper(grid_configs=[_grid_config(tmpdir)], ll2cr_cache_dir=None, remap_workers=1,
+                        lazy_remap=lazy)
+    gridded_scene = remapper.remap_scene(_swath_scene(tmpdir, lazy), GRID_NAME, remap_method=remap_method)
+    gridded_product = gridded_scene["test_bt"]
+    return gridded_product["grid_definition"], numpy.array(gridded_product.get_data_array())
+
+
+class TestLazyRemap(object):
+    @pytest.mark.parametrize("remap_method", ["ewa", "nearest"])
+    def test_lazy_matches_files(self, tmpdir, monkeypatch, remap_method):
+        monkeypatch.chdir(tmpdir)
+        file_grid_def, file_data = _remap(tmpdir.mkdir("files"), False, remap_method)
+        lazy_grid_def, lazy_data = _remap(tmpdir.mkdir("lazy"), True, remap_method)
+
+        for k in ("width", "height", "origin_x", "origin_y", "cell_width", "cell_height"):
+            assert lazy_grid_def[k] == file_grid_def[k]
+        assert numpy.isfinite(file_data).any()
+        numpy.testing.assert_array_equal(lazy_data, file_data)
+
+
+class TestRemapWorkers(object):
+    @pytest.mark.parametrize("remap_method", ["ewa", "nearest"])
+    def test_workers_match_serial(self, tmpdir, monkeypatch, caplog, remap_method):
+        caplog.set_level(logging.DEBUG, logger="polar2grid.remap.remap")
+        grid_configs = [_grid_config(tmpdir)]
+        results = {}
+        for remap_workers in (1, 2):
+            work_dir = tmpdir.mkdir("workers_%d" % (remap_workers,))
+            monkeypatch.chdir(work_dir)
+            scene = SwathScene()
+            # two geolocation groups, one of them with two products
+            _add_swath_product(scene, work_dir, False, "bt_a", swath_name="swath_a", seed=0)
+            _add_swath_product(scene, work_dir, False, "bt_b", swath_name="swath_a", seed=1)
+            _add_swath_product(scene, work_dir, False, "bt_c", swath_name="swath_c", lon_offset=4.0, seed=2)
+            remapper = Remapper(grid_configs=grid_configs, ll2cr_cache_dir=None, remap_workers=remap_workers)
+            gridded_scene = remapper.remap_scene(scene, GRID_NAME, remap_method=remap_method)
+            results[remap_workers] = {product_name: (product["grid_definition"],
+                                                     numpy.array(product.get_data_array()))
+                                      for product_name, product in gridded_scene.items()}
+            assert ("Remapping 2 geolocation groups with 2 workers" in caplog.text) == (remap_workers == 2)
+            # ll2cr results from the workers and the parent are cleaned up
+            assert not [fn for fn in os.listdir(str(work_dir)) if fn.startswith("ll2cr_")]
+            del gridded_scene
+
+        assert sorted(results[2].keys()) == sorted(results[1].keys()) == ["bt_a", "bt_b", "bt_c"]
+        for product_name, (serial_grid_def, serial_data) in results[1].items():
+            worker_grid_def, worker_data = results[2][product_name]
+            for k in ("width", "height", "origin_x", "origin_y", "cell_width", "cell_height"):
+                assert worker_grid_def[k] == serial_grid_def[k]
+            assert numpy.isfinite(serial_data).any()
+            numpy.testing.assert_array_equal(worker_data, serial_data)
@@ -54,6 +54,8 @@ from polar2grid.readers import normalize_satellite_name
 
 LOG = logging.getLogger(__name__)
 ORBIT_TRANSITION_THRESHOLD = timedelta(seconds=10)
+# Default number of rows read at a time when streaming variables that have no per-granule scaling factors
+STREAM_ROWS = 768
 
 
 class HDF5Reader(object):
@@ -162,42 +164,48 @@ class VIIRSSDRReader(BaseFileReader):
         return value
 
     def scale_swath_data(self, data, scaling_factors):
-        num_grans = int(len(scaling_factors) / 2)
-        gran_size = int(data.shape[0] / num_grans)
-        scaling_mask = numpy.zeros(data.shape)
-        for i in range(num_grans):
-            start_idx = i * gran_size
-            end_idx = start_idx + gran_size
-            m = scaling_factors[i*2]
-            b = scaling_factors[i*2 + 1]
-            if m <= -999 or b <= -999:
-                scaling_mask[start_idx:end_idx] = 1
-            else:
-                data[start_idx:end_idx] = m * data[start_idx:end_idx] + b
-
-        scaling_mask = scaling_mask.astype(numpy.bool)
-        return data, scaling_mask
+        """Scale `data` in place using the (factor, offset) pair for each granule.
 
-    def get_swath_data(self, item, dtype=numpy.float32, fill=numpy.nan):
-        """Retrieve the item asked for then set it to the specified data type, scale it, and mask it.
+        Granules with a factor or offset of -999 or less are left unscaled and marked in the returned boolean mask.
+
+        :param data: Floating point data whose rows are split evenly between the granules
+        :param scaling_factors: Flat sequence of (factor, offset) pairs, one pair per granule
+        :returns: (data, scaling_mask)
         """
-        var_info = self.file_type_info.get(item)
-        data = self[var_info.var_path].value.astype(dtype)
+        factors = numpy.asarray(scaling_factors, dtype=data.dtype).reshape(-1, 2)
+        num_grans = factors.shape[0]
+        if num_grans == 0:
+            return data, numpy.zeros(data.shape, dtype=numpy.bool_)
+        gran_size = int(data.shape[0] / num_grans)
+        m = factors[:, 0]
+        b = factors[:, 1]
+        bad_grans = (m <= -999) | (b <= -999)
+        m = numpy.where(bad_grans, 1, m).astype(data.dtype)
+        b = numpy.where(bad_grans, 0, b).astype(data.dtype)
+
+        # per-row factors broadcast over the remaining dimensions
+        row_shape = (num_grans * gran_size,) + (1,) * (data.ndim - 1)
+        scaled_data = data[:num_grans * gran_size]
+        scaled_data *= numpy.repeat(m, gran_size).reshape(row_shape)
+        scaled_data += numpy.repeat(b, gran_size).reshape(row_shape)
+
+        scaling_mask = numpy.zeros(data.shape, dtype=numpy.bool_)
+        scaling_mask[:num_grans * gran_size] = numpy.repeat(bad_grans, gran_size).reshape(row_shape)
+        return data, scaling_mask
 
-        # Get the scaling factors
-        scaling_factors = None
-        try:
-            scaling_factors = list(self[var_info.scaling_path][:])
-        except KeyError:
-            LOG.debug("No scaling factors for %s", item)
+    def _mask_and_scale(self, var_info, data, qflag_data, scaling_factors, fill):
+        """Mask and scale a block of unscaled data in place.
 
-        mask = numpy.zeros(data.shape, dtype=numpy.bool)
+        :param var_info: `FileVar` for the variable being loaded
+        :param data: Unscaled data, already converted to the output data type
+        :param qflag_data: Quality flags matching `data` or `None`
+        :param scaling_factors: Flat list of (factor, offset) pairs for each granule in `data` or `None`
+        """
+        mask = numpy.zeros(data.shape, dtype=numpy.bool_)
 
         # Filter with quality flags
-        if var_info.qflag1 is not None:
-            qflag_data = self[var_info.qflag1][:]
-            if var_info.qflag1_mask is not None:
-                mask |= (qflag_data & var_info.qflag1_mask) != var_info.qflag1_eq
+        if qflag_data is not None and var_info.qflag1_mask is not None:
+            mask |= (qflag_data & var_info.qflag1_mask) != var_info.qflag1_eq
 
         # Get the mask for the data (based on unscaled data)
         if scaling_factors is not None and var_info.scaling_mask_func is not None:
@@ -211,9 +219,56 @@ class VIIRSSDRReader(BaseFileReader):
             mask |= scaling_mask
 
         data[mask] = fill
-
         return data
 
+    def _get_scaling_factors(self, item, var_info):
+        try:
+            return list(self[var_info.scaling_path][:])
+        except KeyError:
+            LOG.debug("No scaling factors for %s", item)
+            return None
+
+    def get_swath_data(self, item, dtype=numpy.float32, fill=numpy.nan):
+        """Retrieve the item asked for then set it to the specified data type, scale it, and mask it.
+        """
+        var_info = self.file_type_info.get(item)
+        data = self[var_info.var_path][:].astype(dtype)
+        scaling_factors = self._get_scaling_factors(item, var_info)
+        qflag_data = self[var_info.qflag1][:] if var_info.qflag1 is not None else None
+        return self._mask_and_scale(var_info, data, qflag_data, scaling_factors, fill)
+
+    def get_swath_shape(self, item):
+        var_info = self.file_type_info.get(item)
+        return self[var_info.var_path].shape
+
+    def iter_swath_data(self, item, dtype=numpy.float32, fill=numpy.nan, rows_per_block=STREAM_ROWS):
+        """Retrieve the item one granule at a time, scaled and masked the same way as `get_swath_data`.
+
+        Aggregated files are split on their per-granule scaling factors. If the variable is not scaled the file is
+        read `rows_per_block` rows at a time.
+        """
+        var_info = self.file_type_info.get(item)
+        var = self[var_info.var_path]
+        qflag_var = self[var_info.qflag1] if var_info.qflag1 is not None else None
+        scaling_factors = self._get_scaling_factors(item, var_info)
+        num_rows = var.shape[0]
+        if scaling_factors is not None:
+            num_grans = int(len(scaling_factors) / 2)
+            gran_rows = int(num_rows / num_grans) if num_grans else 0
+            blocks = [(idx * gran_rows, (idx + 1) * gran_rows, scaling_factors[idx * 2:idx * 2 + 2])
+                      for idx in range(num_grans) if gran_rows]
+            if num_grans * gran_rows < num_rows:
+                # rows left over when the rows don't split evenly between granules aren't scaled by get_swath_data
+                blocks.append((num_grans * gran_rows, num_rows, []))
+        else:
+            blocks = [(start_idx, start_idx + rows_per_block, None)
+                      for start_idx in range(0, num_rows, rows_per_block)]
+
+        for start_idx, end_idx, gran_factors in blocks:
+            data = var[start_idx:end_idx].astype(dtype)
+            qflag_data = qflag_var[start_idx:end_idx] if qflag_var is not None else None
+            yield self._mask_and_scale(var_info, data, qflag_data, gran_factors, fill)
+
 
 class VIIRSSDRMultiReader(BaseMultiFileReader):
     """Helper class to wrap multiple VIIRS SDR Files and assist in reading them.
@@ -252,6 +307,10 @@ class VIIRSSDRMultiReader(BaseMultiFileReader):
 
         return orbit_rows
 
+    def get_swath_shape(self, item):
+        """Shape of the concatenated swath for `item` found from the orbit rows and the first file."""
+        return (sum(self.get_orbit_rows(item)),) + tuple(self.file_readers[0].get_swath_shape(item)[1:])
+
     def __getitem__(self, item):
         val = super(VIIRSSDRMultiReader, self).__getitem__(item)
         if item == K_MOONILLUM:
@@ -46,6 +46,7 @@ __docformat__ = "restructuredtext en"
 
 import logging
 import numpy
+from scipy.special import erf
 from polar2grid.core.histogram import local_histogram_equalization, histogram_equalization
 
 # from mpl_toolkits.basemap import maskoceans
@@ -54,6 +55,11 @@ LOG = logging.getLogger(__name__)
 
 DEFAULT_HIGH_ANGLE = 100
 DEFAULT_LOW_ANGLE  = 88
+# default rows of the swath processed at a time by the dynamic DNB scaling
+DYNAMIC_DNB_ROWS = 256
+# Update from Curtis Seaman, increase max radiance curve until less than 0.5% is saturated
+DYNAMIC_DNB_SATURATION_LIMIT = 0.005
+DYNAMIC_DNB_SATURATION_STEP = 1.1
 
 
 def mask_helper(arr, fill_value):
@@ -278,3 +284,79 @@ def dnb_scale(img, fillValue=-999.0, solarZenithAngle=None,
     
     return out
 
+
+def _dynamic_dnb_curves(solarZenithAngle, lunarZenithAngle, moonIlluminationFraction):
+    """Minimum and maximum radiance curves of the dynamic DNB scaling from Steve Miller and Curtis Seaman.
+
+    maxval = 10.^(-1.7 - (((2.65+moon_factor1+moon_factor2))*(1+erf((solar_zenith-95.)/(5.*sqrt(2.0))))))
+    minval = 10.^(-4. - ((2.95+moon_factor2)*(1+erf((solar_zenith-95.)/(5.*sqrt(2.0))))))
+    """
+    moon_factor1 = 0.7 * (1.0 - moonIlluminationFraction)
+    moon_factor2 = 0.0022 * lunarZenithAngle
+    erf_portion = 1 + erf((solarZenithAngle - 95.0) / (5.0 * numpy.sqrt(2.0)))
+    max_val = numpy.power(10, -1.7 - (2.65 + moon_factor1 + moon_factor2) * erf_portion)
+    min_val = numpy.power(10, -4.0 - (2.95 + moon_factor2) * erf_portion)
+    return min_val, max_val
+
+
+def dynamic_dnb_saturation_factor(img, solarZenithAngle, lunarZenithAngle, moonIlluminationFraction,
+                                  scratch=None, rows_per_block=DYNAMIC_DNB_ROWS):
+    """Factor the maximum radiance curve of the dynamic DNB scaling is multiplied by to limit saturation.
+
+    The original method multiplied the maximum radiance curve by `DYNAMIC_DNB_SATURATION_STEP` and counted the
+    saturated pixels again until no more than `DYNAMIC_DNB_SATURATION_LIMIT` of the image was saturated. Instead the
+    ratio of every pixel to the curve is computed once and the largest ratio that must not be saturated is found by
+    partially sorting the ratios, the factor is the smallest power of the step reaching that ratio.
+
+    :param scratch: array with the shape of `img` that can be overwritten with the ratios (ex. the output array)
+    """
+    if scratch is None:
+        scratch = numpy.empty(img.shape, dtype=numpy.float32)
+    for row_start in range(0, img.shape[0], rows_per_block):
+        row_slice = slice(row_start, row_start + rows_per_block)
+        _, max_val = _dynamic_dnb_curves(solarZenithAngle[row_slice], lunarZenithAngle[row_slice],
+                                         moonIlluminationFraction)
+        numpy.divide(img[row_slice], max_val, out=scratch[row_slice], casting="same_kind")
+    ratios = scratch.reshape(-1)
+    # invalid pixels are never saturated, fmax moves NaNs to the start of the sorted order
+    numpy.fmax(ratios, -numpy.inf, out=ratios)
+    max_saturated = int(DYNAMIC_DNB_SATURATION_LIMIT * ratios.size)
+    if max_saturated >= ratios.size:
+        return 1.0
+    kth = ratios.size - max_saturated - 1
+    ratios.partition(kth)
+    required_factor = float(ratios[kth])
+    if required_factor == numpy.inf:
+        raise ValueError("DNB radiances must be finite to correct saturation")
+
+    factor = 1.0
+    while factor < required_factor:
+        factor *= DYNAMIC_DNB_SATURATION_STEP
+    LOG.debug("Dynamic DNB saturation correction factor: %f", factor)
+    return factor
+
+
+def dynamic_dnb_scale(img, solarZenithAngle, lunarZenithAngle, moonIlluminationFraction, saturation_factor=1.0,
+                      out=None, rows_per_block=DYNAMIC_DNB_ROWS):
+    """Scale DNB radiances between the dynamic minimum and maximum radiance curves and take the square root.
+
+    scaled_radiance = (radiance - minval) / (maxval - minval)
+    radiance = sqrt(scaled_radiance)
+
+    The image is processed `rows_per_block` rows at a time so no temporary arrays the size of the image are created.
+
+    :param saturation_factor: Factor to multiply the maximum radiance curve by (see `dynamic_dnb_saturation_factor`)
+    """
+    if out is None:
+        out = numpy.empty_like(img)
+    for row_start in range(0, img.shape[0], rows_per_block):
+        row_slice = slice(row_start, row_start + rows_per_block)
+        min_val, max_val = _dynamic_dnb_curves(solarZenithAngle[row_slice], lunarZenithAngle[row_slice],
+                                               moonIlluminationFraction)
+        if saturation_factor != 1.0:
+            max_val *= saturation_factor
+        inner_sqrt = (img[row_slice] - min_val) / (max_val - min_val)
+        # clip negative values to 0 before the sqrt
+        inner_sqrt[inner_sqrt < 0] = 0
+        numpy.sqrt(inner_sqrt, out=out[row_slice])
+    return out
@@ -204,14 +204,13 @@ import sys
 import logging
 import numpy
 import os
-from scipy.special import erf
 
 from polar2grid.core import containers, histogram, roles
 from polar2grid.core.frontend_utils import ProductDict, GeoPairDict
 from . import guidebook
 # FIXME: Actually use the Geo Readers
 from .io import VIIRSSDRMultiReader, HDF5Reader
-from .prescale import adaptive_dnb_scale, dnb_scale
+from .prescale import adaptive_dnb_scale, dnb_scale, dynamic_dnb_scale, dynamic_dnb_saturation_factor
 
 LOG = logging.getLogger(__name__)
 
@@ -1039,25 +1038,13 @@ class Frontend(roles.FrontendRole):
             # scaled_radiance = (radiance - minval) / (maxval - minval)
             # radiance = sqrt(scaled_radiance)
 
-            moon_factor1 = 0.7 * (1.0 - moon_illum_fraction)
-            moon_factor2 = 0.0022 * lza_data
-            erf_portion = 1 + erf((sza_data - 95.0) / (5.0 * numpy.sqrt(2.0)))
-            max_val = numpy.power(10, -1.7 - (2.65 + moon_factor1 + moon_factor2) * erf_portion)
-            min_val = numpy.power(10, -4.0 - (2.95 + moon_factor2) * erf_portion)
-
-            # Update from Curtis Seaman, increase max radiance curve until less than 0.5% is saturated
+            saturation_factor = 1.0
             if self.dnb_saturation_correction:
-                saturation_pct = float(numpy.count_nonzero(dnb_data > max_val)) / dnb_data.size
-                LOG.debug("Dynamic DNB saturation percentage: %f", saturation_pct)
-                while saturation_pct > 0.005:
-                    max_val *= 1.1
-                    saturation_pct = float(numpy.count_nonzero(dnb_data > max_val)) / dnb_data.size
-                    LOG.debug("Dynamic DNB saturation percentage: %f", saturation_pct)
-
-            inner_sqrt = (dnb_data - min_val) / (max_val - min_val)
-            # clip negative values to 0 before the sqrt
-            inner_sqrt[inner_sqrt < 0] = 0
-            numpy.sqrt(inner_sqrt, out=output_data)
+                # output_data is overwritten by the scaling so it can hold the saturation ratios
+                saturation_factor = dynamic_dnb_saturation_factor(dnb_data, sza_data, lza_data, moon_illum_fraction,
+                                                                  scratch=output_data)
+            dynamic_dnb_scale(dnb_data, sza_data, lza_data, moon_illum_fraction,
+                              saturation_factor=saturation_factor, out=output_data)
 
             one_swath = self.create_secondary_swath_object(product_name, swath_definition, filename,
                                                            dnb_product["data_type"], products_created)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the VIIRS SDR file reading helpers.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+
+import numpy
+import pytest
+
+from datetime import datetime, timedelta
+
+from polar2grid.core.frontend_utils import BaseFileReader, BaseMultiFileReader
+from polar2grid.viirs.guidebook import FileVar
+from polar2grid.viirs.io import VIIRSSDRReader, VIIRSSDRMultiReader
+
+LOG = logging.getLogger(__name__)
+
+# 16 M-band granules (48 scans of 16 rows by 3200 columns each)
+M_GRANULE_SHAPE = (768, 3200)
+NUM_GRANULES = 16
+
+
+def _loop_scale_swath_data(data, scaling_factors):
+    """Original per-granule loop implementation of `VIIRSSDRReader.scale_swath_data` used as a reference."""
+    num_grans = int(len(scaling_factors) / 2)
+    gran_size = int(data.shape[0] / num_grans)
+    scaling_mask = numpy.zeros(data.shape)
+    for i in range(num_grans):
+        start_idx = i * gran_size
+        end_idx = start_idx + gran_size
+        m = scaling_factors[i*2]
+        b = scaling_factors[i*2 + 1]
+        if m <= -999 or b <= -999:
+            scaling_mask[start_idx:end_idx] = 1
+        else:
+            data[start_idx:end_idx] = m * data[start_idx:end_idx] + b
+
+    scaling_mask = scaling_mask.astype(numpy.bool_)
+    return data, scaling_mask
+
+
+def _create_m_band_cube(num_grans=NUM_GRANULES, gran_shape=M_GRANULE_SHAPE):
+    rs = numpy.random.RandomState(42)
+    data = rs.randint(0, 65528, size=(num_grans * gran_shape[0], gran_shape[1])).astype(numpy.float32)
+    scaling_factors = []
+    for i in range(num_grans):
+        scaling_factors.extend(numpy.float32(x) for x in (rs.uniform(0.001, 0.01), rs.uniform(-5., 5.)))
+    # a couple of granules without valid scaling factors
+    scaling_factors[2:4] = [numpy.float32(-999.5), numpy.float32(-999.5)]
+    scaling_factors[-1] = numpy.float32(-999.5)
+    return data, scaling_factors
+
+
+def _reader():
+    # scale_swath_data doesn't use any file information
+    return VIIRSSDRReader.__new__(VIIRSSDRReader)
+
+
+class TestScaleSwathData(object):
+    def test_matches_loop_small(self):
+        data, scaling_factors = _create_m_band_cube(num_grans=6, gran_shape=(16, 20))
+        exp_data, exp_mask = _loop_scale_swath_data(data.copy(), scaling_factors)
+        new_data, new_mask = _reader().scale_swath_data(data, scaling_factors)
+        assert new_mask.dtype == numpy.bool_
+        numpy.testing.assert_array_equal(new_mask, exp_mask)
+        numpy.testing.assert_array_equal(new_data[~new_mask], exp_data[~exp_mask])
+
+    def test_scales_in_place(self):
+        data, scaling_factors = _create_m_band_cube(num_grans=4, gran_shape=(16, 20))
+        new_data, _ = _reader().scale_swath_data(data, scaling_factors)
+        assert new_data is data
+
+    @pytest.mark.benchmark
+    def test_benchmark_m_band(self):
+        """Compare the vectorized scaling against the original loop on a 16 granule M-band cube."""
+        data, scaling_factors = _create_m_band_cube()
+        loop_data = data.copy()
+        t0 = time.perf_counter()
+        exp_data, exp_mask = _loop_scale_swath_data(loop_data, scaling_factors)
+        loop_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new_data, new_mask = _reader().scale_swath_data(data, scaling_factors)
+        vec_time = time.perf_counter() - t0
+        LOG.info("scale_swath_data on %r: loop %.3fs, vectorized %.3fs", data.shape, loop_time, vec_time)
+        numpy.testing.assert_array_equal(new_mask, exp_mask)
+        numpy.testing.assert_array_equal(new_data[~new_mask], exp_data[~exp_mask])
+
+
+class _FakeFileHandle(dict):
+    """In-memory stand-in for an `HDF5Reader` mapping variable paths to arrays."""
+    def __init__(self, filename, *args, **kwargs):
+        super(_FakeFileHandle, self).__init__(*args, **kwargs)
+        self.filename = filename
+        self.filepath = "/" + filename
+
+
+_FILE_TYPE_INFO = {
+    "radiance": FileVar("radiance_var", scaling_path="radiance_factors_var", qflag1="qf_var", qflag1_mask=3,
+                        qflag1_eq=0),
+    "unscaled": FileVar("unscaled_var"),
+}
+
+
+def _fake_sdr_reader(file_idx, num_rows, num_grans, num_cols=20):
+    rs = numpy.random.RandomState(file_idx)
+    radiance = rs.randint(0, 65536, size=(num_rows, num_cols)).astype(numpy.uint16)
+    # fill values that are masked before scaling
+    radiance[rs.uniform(size=radiance.shape) < 0.05] = 65533
+    qflags = (rs.uniform(size=radiance.shape) < 0.05).astype(numpy.uint8)
+    factors = []
+    for _ in range(num_grans):
+        factors.extend(numpy.float32(x) for x in (rs.uniform(0.001, 0.01), rs.uniform(-5., 5.)))
+    if num_grans > 1:
+        factors[2:4] = [numpy.float32(-999.5), numpy.float32(-999.5)]
+    unscaled = rs.uniform(-10, 10, size=(num_rows, num_cols)).astype(numpy.float32)
+    unscaled[rs.uniform(size=unscaled.shape) < 0.05] = -999.3
+    handle = _FakeFileHandle("fake_%d.h5" % (file_idx,), {
+        "radiance_var": radiance,
+        "radiance_factors_var": numpy.array(factors, dtype=numpy.float32),
+        "qf_var": qflags,
+        "unscaled_var": unscaled,
+    })
+    reader = VIIRSSDRReader.__new__(VIIRSSDRReader)
+    BaseFileReader.__init__(reader, handle, _FILE_TYPE_INFO)
+    reader.begin_time = datetime(2020, 1, 1) + timedelta(seconds=85 * file_idx)
+    reader.end_time = reader.begin_time + timedelta(seconds=85)
+    return reader
+
+
+def _fake_sdr_multi_reader(file_shapes):
+    multi_reader = VIIRSSDRMultiReader.__new__(VIIRSSDRMultiReader)
+    BaseMultiFileReader.__init__(multi_reader, _FILE_TYPE_INFO, VIIRSSDRReader)
+    multi_reader.file_readers = [_fake_sdr_reader(idx, num_rows, num_grans)
+                                 for idx, (num_rows, num_grans) in enumerate(file_shapes)]
+    return multi_reader
+
+
+class TestIterSwathData(object):
+    @pytest.mark.parametrize("num_rows,num_grans", [(48, 3), (53, 3), (2, 3), (16, 1)])
+    def test_matches_get_swath_data(self, num_rows, num_grans):
+        reader = _fake_sdr_reader(0, num_rows, num_grans)
+        exp = reader.get_swath_data("radiance")
+        blocks = list(reader.iter_swath_data("radiance"))
+        assert sum(block.shape[0] for block in blocks) == num_rows
+        numpy.testing.assert_array_equal(numpy.concatenate(blocks), exp)
+
+    def test_leftover_rows_unscaled(self):
+        reader = _fake_sdr_reader(0, 50, 3)
+        blocks = list(reader.iter_swath_data("radiance"))
+        assert [block.shape[0] for block in blocks] == [16, 16, 16, 2]
+        raw = reader.file_handle["radiance_var"][48:].astype(numpy.float32)
+        valid = ~numpy.isnan(blocks[-1])
+        numpy.testing.assert_array_equal(blocks[-1][valid], raw[valid])
+
+    @pytest.mark.parametrize("rows_per_block", [1, 7, 768, 2000])
+    def test_unscaled_blocks(self, rows_per_block):
+        reader = _fake_sdr_reader(0, 1600, 1)
+        blocks = list(reader.iter_swath_data("unscaled", rows_per_block=rows_per_block))
+        assert len(blocks) == -(-1600 // rows_per_block)
+        numpy.testing.assert_array_equal(numpy.concatenate(blocks), reader.get_swath_data("unscaled"))
+
+
+class TestWriteVarToFlatBinary(object):
+    @pytest.mark.parametrize("item", ["radiance", "unscaled"])
+    def test_streamed_matches_appended(self, item, tmpdir):
+        multi_reader = _fake_sdr_multi_reader([(48, 3), (53, 3), (32, 2)])
+        streamed_fn = str(tmpdir.join("streamed.dat"))
+        appended_fn = str(tmpdir.join("appended.dat"))
+        streamed_shape = multi_reader.write_var_to_flat_binary(item, streamed_fn)
+        # original implementation reading each file completely and appending it
+        appended_shape = multi_reader._append_var_to_flat_binary(item, appended_fn, numpy.float32)
+        assert tuple(streamed_shape) == tuple(appended_shape) == (133, 20)
+        with open(streamed_fn, "rb") as streamed_file, open(appended_fn, "rb") as appended_file:
+            assert streamed_file.read() == appended_file.read()
+        exp = numpy.concatenate([fr.get_swath_data(item) for fr in multi_reader.file_readers])
+        numpy.testing.assert_array_equal(numpy.fromfile(streamed_fn, dtype=numpy.float32).reshape(exp.shape), exp)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# Copyright (C) 2026 Space Science and Engineering Center (SSEC),
+# University of Wisconsin-Madison.
+#
+#     This program is free software: you can redistribute it and/or modify
+#     it under the terms of the GNU General Public License as published by
+#     the Free Software Foundation, either version 3 of the License, or
+#     (at your option) any later version.
+#
+#     This program is distributed in the hope that it will be useful,
+#     but WITHOUT ANY WARRANTY; without even the implied warranty of
+#     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#     GNU General Public License for more details.
+#
+#     You should have received a copy of the GNU General Public License
+#     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# This file is part of the polar2grid software package. Polar2grid takes
+# satellite observation data, remaps it, and writes it to a file format for
+# input into another program.
+# Documentation: http://www.ssec.wisc.edu/software/polar2grid/
+"""Test the VIIRS DNB prescaling functions.
+
+:organization: Space Science and Engineering Center (SSEC)
+:copyright:    Copyright (c) 2026 University of Wisconsin SSEC. All rights reserved.
+:date:         Oct 2026
+:license:      GNU GPLv3
+
+"""
+__docformat__ = "restructuredtext en"
+
+import logging
+
+import numpy
+import pytest
+from scipy.special import erf
+
+from polar2grid.viirs import prescale
+
+LOG = logging.getLogger(__name__)
+
+
+def _dynamic_dnb_reference(dnb_data, sza_data, lza_data, moon_illum_fraction, saturation_correction=True):
+    """Previous whole-swath dynamic DNB scaling from the VIIRS frontend.
+
+    :returns: (scaled data, number of times the maximum radiance curve was increased)
+    """
+    moon_factor1 = 0.7 * (1.0 - moon_illum_fraction)
+    moon_factor2 = 0.0022 * lza_data
+    erf_portion = 1 + erf((sza_data - 95.0) / (5.0 * numpy.sqrt(2.0)))
+    max_val = numpy.power(10, -1.7 - (2.65 + moon_factor1 + moon_factor2) * erf_portion)
+    min_val = numpy.power(10, -4.0 - (2.95 + moon_factor2) * erf_portion)
+
+    steps = 0
+    if saturation_correction:
+        saturation_pct = float(numpy.count_nonzero(dnb_data > max_val)) / dnb_data.size
+        while saturation_pct > 0.005:
+            max_val *= 1.1
+            steps += 1
+            saturation_pct = float(numpy.count_nonzero(dnb_data > max_val)) / dnb_data.size
+
+    inner_sqrt = (dnb_data - min_val) / (max_val - min_val)
+    inner_sqrt[inner_sqrt < 0] = 0
+    return numpy.sqrt(inner_sqrt), steps
+
+
+def _dnb_swath(seed=0, rows=96, cols=130, bright_fraction=0.02, bright_scale=1e3):
+    """Night time DNB radiances crossing the terminator with some bright (saturating) pixels."""
+    rng = numpy.random.RandomState(seed)
+    sza = numpy.repeat(numpy.linspace(85.0, 115.0, rows)[:, None], cols, axis=1).astype(numpy.float32)
+    lza = rng.uniform(20.0, 150.0, (rows, cols)).astype(numpy.float32)
+    dnb = (10 ** rng.uniform(-10.0, -7.0, (rows, cols))).astype(numpy.float32)
+    bright = rng.uniform(size=dnb.shape) < bright_fraction
+    dnb[bright] *= bright_scale * rng.uniform(1.0, 10.0, numpy.count_nonzero(bright)).astype(numpy.float32)
+    return dnb, sza, lza
+
+
+def _steps(factor):
+    return int(round(numpy.log(factor) / numpy.log(prescale.DYNAMIC_DNB_SATURATION_STEP)))
+
+
+class TestDynamicDNBSaturationFactor(object):
+    @pytest.mark.parametrize(("swath_kwargs", "moon_illum_fraction"), [
+        ({}, 0.0),
+        ({}, 0.9),
+        ({"bright_fraction": 0.2, "bright_scale": 1e5}, 0.5),
+        ({"seed": 3, "bright_fraction": 0.004}, 0.5),
+        ({"seed": 4, "bright_fraction": 0.0}, 0.5),
+    ])
+    @pytest.mark.parametrize("rows_per_block", [1, 17, 256])
+    def test_matches_reference(self, swath_kwargs, moon_illum_fraction, rows_per_block):
+        dnb, sza, lza = _dnb_swath(**swath_kwargs)
+        expected, expected_steps = _dynamic_dnb_reference(dnb, sza, lza, moon_illum_fraction)
+        factor = prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, moon_illum_fraction,
+                                                        rows_per_block=rows_per_block)
+        assert _steps(factor) == expected_steps
+        result = prescale.dynamic_dnb_scale(dnb, sza, lza, moon_illum_fraction, saturation_factor=factor,
+                                            rows_per_block=rows_per_block)
+        numpy.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-7)
+
+    def test_invalid_and_negative_pixels(self):
+        dnb, sza, lza = _dnb_swath(bright_fraction=0.05)
+        dnb[:10] = numpy.nan
+        dnb[20:25] = -1e-9
+        expected_output, expected_steps = _dynamic_dnb_reference(dnb, sza, lza, 0.5)
+        factor = prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5)
+        assert expected_steps > 0
+        assert _steps(factor) == expected_steps
+        result = prescale.dynamic_dnb_scale(dnb, sza, lza, 0.5, saturation_factor=factor)
+        numpy.testing.assert_array_equal(numpy.isnan(result), numpy.isnan(dnb))
+        # negative radiances are below the minimum curve
+        assert (result[20:25] == 0).all()
+        numpy.testing.assert_allclose(result, expected_output, rtol=1e-5, atol=1e-7)
+
+    def test_all_invalid_never_saturated(self):
+        dnb, sza, lza = _dnb_swath()
+        dnb[:] = numpy.nan
+        assert prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5) == 1.0
+        dnb[:] = 1e-12
+        assert prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5) == 1.0
+        assert _dynamic_dnb_reference(dnb, sza, lza, 0.5)[1] == 0
+
+    def test_scratch_overwritten(self):
+        dnb, sza, lza = _dnb_swath()
+        dnb_orig = dnb.copy()
+        scratch = numpy.empty_like(dnb)
+        factor = prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5, scratch=scratch)
+        assert factor == prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5)
+        numpy.testing.assert_array_equal(dnb, dnb_orig)
+        # the scratch array can be the output of the scaling
+        result = prescale.dynamic_dnb_scale(dnb, sza, lza, 0.5, saturation_factor=factor, out=scratch)
+        assert result is scratch
+        numpy.testing.assert_allclose(result, _dynamic_dnb_reference(dnb, sza, lza, 0.5)[0], rtol=1e-5, atol=1e-7)
+
+    def test_infinite_radiance(self):
+        dnb, sza, lza = _dnb_swath(bright_fraction=0.0)
+        dnb[:5] = numpy.inf
+        with pytest.raises(ValueError):
+            prescale.dynamic_dnb_saturation_factor(dnb, sza, lza, 0.5)
+
+
+class TestDynamicDNBScale(object):
+    @pytest.mark.parametrize("saturation_factor", [1.0, 1.1 ** 7])
+    @pytest.mark.parametrize("rows_per_block", [1, 5, 96, 1000])
+    def test_blocks_match_full_array(self, saturation_factor, rows_per_block):
+        dnb, sza, lza = _dnb_swath()
+        dnb[3, 4] = numpy.nan
+        expected = prescale.dynamic_dnb_scale(dnb, sza, lza, 0.3, saturation_factor=saturation_factor,
+                                              rows_per_block=dnb.shape[0])
+        min_val, max_val = prescale._dynamic_dnb_curves(sza, lza, 0.3)
+        max_val = max_val * saturation_factor if saturation_factor != 1.0 else max_val
+        full = (dnb - min_val) / (max_val - min_val)
+        full[full < 0] = 0
+        numpy.testing.assert_array_equal(expected, numpy.sqrt(full))
+        result = prescale.dynamic_dnb_scale(dnb, sza, lza, 0.3, saturation_factor=saturation_factor,
+                                            rows_per_block=rows_per_block)
+        assert result.dtype == dnb.dtype
+        numpy.testing.assert_array_equal(result, expected)